@@ -0,0 +1,296 @@
+"""Concurrent runner for orchestrator dispatch/collect/notify actions.
+
+Jobs run on a thread pool under a global limit and optional per-kind limits
+(``kind`` is the dispatch role, ``"collect"`` or ``"notify"``).  Each job
+carries ordering keys (task ids, pane ids): a job never starts while an
+earlier job sharing one of its keys is still queued or running, so the
+actions of one task keep their submission order while unrelated tasks
+proceed in parallel.
+
+Jobs only do I/O.  Finished jobs are handed back through ``drain()`` so the
+caller applies their effects (state updates, logging) on its own thread.
+
+``gated`` jobs are skipped when an earlier job of the same ``batch`` that
+touched one of their keys reported failure via ``fails_batch`` -- the
+"collect failed, so do not dispatch that task" rule of one transition.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+JobFn = Callable[[], Any]
+FailurePredicate = Callable[[Any], bool]
+
+
+class ActionJob:
+    __slots__ = (
+        "job_id",
+        "kind",
+        "keys",
+        "batch",
+        "gated",
+        "context",
+        "fn",
+        "fails_batch",
+        "result",
+        "error",
+        "skipped",
+        "skipped_by",
+        "submitted_at",
+        "started_at",
+        "finished_at",
+    )
+
+    def __init__(
+        self,
+        job_id: int,
+        kind: str,
+        keys: Tuple[str, ...],
+        fn: JobFn,
+        *,
+        batch: Optional[int],
+        gated: bool,
+        fails_batch: Optional[FailurePredicate],
+        context: Dict[str, Any],
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.keys = keys
+        self.fn = fn
+        self.batch = batch
+        self.gated = gated
+        self.fails_batch = fails_batch
+        self.context = context
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.skipped = False
+        # job_id of the failed batch job that caused the skip (0: failure recorded via mark_batch_failed).
+        self.skipped_by: Optional[int] = None
+        self.submitted_at = time.monotonic()
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    @property
+    def queue_wait_sec(self) -> float:
+        return max(self.started_at - self.submitted_at, 0.0) if self.started_at else 0.0
+
+    @property
+    def run_sec(self) -> float:
+        return max(self.finished_at - self.started_at, 0.0) if self.started_at else 0.0
+
+    def __repr__(self) -> str:
+        return f"ActionJob(id={self.job_id}, kind={self.kind!r}, keys={self.keys!r})"
+
+
+class ActionExecutor:
+    """Keyed, limit-aware job scheduler; all public methods are thread-safe."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        kind_limits: Optional[Dict[str, int]] = None,
+        on_finish: Optional[Callable[[], None]] = None,
+    ):
+        """``on_finish`` runs on the job thread after each job lands in ``drain()``."""
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.on_finish = on_finish
+        self.kind_limits = {str(kind): max(1, int(limit)) for kind, limit in (kind_limits or {}).items()}
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="yb-action")
+        self._cond = threading.Condition()
+        self._pending: List[ActionJob] = []
+        self._running: Dict[int, ActionJob] = {}
+        self._running_by_kind: Dict[str, int] = {}
+        self._completed: List[ActionJob] = []
+        self._failed_keys: Dict[int, Dict[str, int]] = {}
+        self._batch_open: Dict[int, int] = {}
+        self._batch_sealed: Set[int] = set()
+        self._next_job_id = 1
+        self._next_batch = 1
+        self._closed = False
+
+    def new_batch(self) -> int:
+        with self._cond:
+            batch = self._next_batch
+            self._next_batch += 1
+            return batch
+
+    def submit(
+        self,
+        kind: str,
+        keys: Iterable[str],
+        fn: JobFn,
+        *,
+        batch: Optional[int] = None,
+        gated: bool = False,
+        fails_batch: Optional[FailurePredicate] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> ActionJob:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("action executor is shut down")
+            job = ActionJob(
+                self._next_job_id,
+                str(kind),
+                tuple(dict.fromkeys(key for key in keys if key)),
+                fn,
+                batch=batch,
+                gated=gated,
+                fails_batch=fails_batch,
+                context=dict(context or {}),
+            )
+            self._next_job_id += 1
+            if batch is not None:
+                self._batch_open[batch] = self._batch_open.get(batch, 0) + 1
+            self._pending.append(job)
+            self._schedule_locked()
+            return job
+
+    def _kind_has_room(self, kind: str) -> bool:
+        limit = self.kind_limits.get(kind)
+        return limit is None or self._running_by_kind.get(kind, 0) < limit
+
+    def _schedule_locked(self) -> None:
+        if not self._pending:
+            return
+        busy_keys: Set[str] = set()
+        for running in self._running.values():
+            busy_keys.update(running.keys)
+
+        still_pending: List[ActionJob] = []
+        for job in self._pending:
+            runnable = (
+                len(self._running) < self.max_concurrency
+                and self._kind_has_room(job.kind)
+                and busy_keys.isdisjoint(job.keys)
+            )
+            # Keys of a job left waiting stay busy so later jobs on them cannot overtake it.
+            busy_keys.update(job.keys)
+            if not runnable:
+                still_pending.append(job)
+                continue
+            job.started_at = time.monotonic()
+            self._running[job.job_id] = job
+            self._running_by_kind[job.kind] = self._running_by_kind.get(job.kind, 0) + 1
+            self._pool.submit(self._run, job)
+        self._pending = still_pending
+
+    def _run(self, job: ActionJob) -> None:
+        with self._cond:
+            failed = self._failed_keys.get(job.batch) if job.batch is not None else None
+            if job.gated and failed:
+                for key in job.keys:
+                    if key in failed:
+                        job.skipped = True
+                        job.skipped_by = failed[key]
+                        break
+        if not job.skipped:
+            try:
+                job.result = job.fn()
+            except BaseException as exc:  # reported through drain(); the pool must not swallow it
+                job.error = exc
+        job.finished_at = time.monotonic()
+
+        with self._cond:
+            if job.batch is not None and not job.skipped and job.fails_batch is not None:
+                try:
+                    failed_job = job.error is not None or bool(job.fails_batch(job.result))
+                except Exception:
+                    failed_job = True
+                if failed_job:
+                    failed_keys = self._failed_keys.setdefault(job.batch, {})
+                    for key in job.keys:
+                        failed_keys.setdefault(key, job.job_id)
+            self._running.pop(job.job_id, None)
+            self._running_by_kind[job.kind] = self._running_by_kind.get(job.kind, 1) - 1
+            if job.batch is not None:
+                remaining = self._batch_open.get(job.batch, 1) - 1
+                if remaining > 0:
+                    self._batch_open[job.batch] = remaining
+                else:
+                    self._batch_open.pop(job.batch, None)
+                    if job.batch in self._batch_sealed:
+                        self._forget_batch_locked(job.batch)
+            self._completed.append(job)
+            self._schedule_locked()
+            self._cond.notify_all()
+        if self.on_finish is not None:
+            self.on_finish()
+
+    def _forget_batch_locked(self, batch: int) -> None:
+        self._batch_sealed.discard(batch)
+        self._failed_keys.pop(batch, None)
+
+    def mark_batch_failed(self, batch: int, keys: Iterable[str]) -> None:
+        """Record a failure detected outside a job (e.g. a lock that could not be taken)."""
+        with self._cond:
+            failed_keys = self._failed_keys.setdefault(batch, {})
+            for key in keys:
+                if key:
+                    failed_keys.setdefault(key, 0)
+
+    def batch_failed(self, batch: int, keys: Iterable[str]) -> bool:
+        with self._cond:
+            failed = self._failed_keys.get(batch)
+            return bool(failed) and any(key in failed for key in keys)
+
+    def close_batch(self, batch: int) -> None:
+        """No more jobs will join ``batch``; its failures are forgotten once its jobs finish."""
+        with self._cond:
+            if self._batch_open.get(batch):
+                self._batch_sealed.add(batch)
+            else:
+                self._forget_batch_locked(batch)
+
+    def drain(self) -> List[ActionJob]:
+        """Finished jobs since the last call, in completion order."""
+        with self._cond:
+            completed = self._completed
+            self._completed = []
+            return completed
+
+    def in_flight(self) -> int:
+        with self._cond:
+            return len(self._pending) + len(self._running)
+
+    def counts(self) -> Dict[str, int]:
+        with self._cond:
+            return {"pending": len(self._pending), "running": len(self._running)}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until some job has finished (and is waiting in ``drain``) or ``timeout`` passes."""
+        deadline = None if timeout is None else time.monotonic() + max(timeout, 0.0)
+        with self._cond:
+            while not self._completed:
+                if not self._pending and not self._running:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running; True when idle."""
+        deadline = None if timeout is None else time.monotonic() + max(timeout, 0.0)
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._cond:
+            self._closed = True
+        if wait:
+            self.wait_idle()
+        self._pool.shutdown(wait=wait)
+
+
+__all__ = ["ActionExecutor", "ActionJob"]
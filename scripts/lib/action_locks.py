@@ -0,0 +1,219 @@
+"""Non-blocking lock hierarchy for orchestrator dispatch/collect actions.
+
+Levels, always taken in this order and released in reverse:
+
+1. ``dispatch_collect`` -- shared by dispatches, exclusive for a collect
+   (a collect rewrites dashboard.md and resets finished workers' task files,
+   so it must not interleave with another process's dispatches).
+2. ``task-<task_id>`` -- one per task a dispatch touches.
+3. ``worker-<pane_id>`` -- the pane a dispatch types into.
+
+Dispatches for different tasks and workers therefore proceed in parallel;
+only a collect excludes everything.
+
+The locks are POSIX record locks (``fcntl.lockf``) on files in ``lock_dir``,
+which only exclude *other processes*; inside one orchestrator the holders of
+each name are refcounted.  Task and worker locks are re-entered, since the
+action executor already orders jobs by task/pane key, but the level-1 lock
+is not shared between modes: a local collect is busy while a local dispatch
+holds it and vice versa (a collect is keyed only on its own tasks, so the
+executor would otherwise run it next to dispatches for other workers).  The
+one exception is a dispatch ``gated_by`` the local collect lease -- one the
+executor runs after that collect -- which joins it and keeps the level-1
+lock shared once the collect is released.
+Nothing blocks; a busy lock is reported so the caller can retry later.
+With ``stats``, acquisitions, busy results and lease hold times are counted
+per level (``dispatch_collect``, ``task``, ``worker``).  Not thread-safe: leases are taken and released on the orchestrator's main
+thread.
+"""
+
+from __future__ import annotations
+
+import errno
+import fcntl
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .file_lock import LockStats
+
+ROOT_LOCK_NAME = "dispatch_collect"
+LEASE_KIND_DISPATCH = "dispatch"
+LEASE_KIND_COLLECT = "collect"
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+_REOPEN_ATTEMPTS = 3
+
+
+def _lock_token(value: str) -> str:
+    return _UNSAFE_NAME_CHARS.sub("_", str(value)) or "_"
+
+
+def _stats_name(name: str) -> str:
+    return name.partition("-")[0]
+
+
+class ActionLease:
+    """The locks one action holds; hand it back to ``ActionLocks.release``."""
+
+    __slots__ = ("kind", "locks", "acquired_at")
+
+    def __init__(self, kind: str, locks: List[Tuple[str, bool]]):
+        self.kind = kind
+        self.locks = locks
+        self.acquired_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"ActionLease(kind={self.kind!r}, locks={self.locks!r})"
+
+
+class _HeldLock:
+    __slots__ = ("fd", "path", "shared", "exclusive")
+
+    def __init__(self, fd: int, path: str):
+        self.fd = fd
+        self.path = path
+        self.shared = 0
+        self.exclusive = 0
+
+
+class ActionLocks:
+    def __init__(self, lock_dir: str, stats: Optional[LockStats] = None):
+        self.lock_dir = lock_dir
+        self.stats = stats
+        self._held: Dict[str, _HeldLock] = {}
+
+    def acquire_dispatch(
+        self,
+        task_ids: Iterable[str],
+        worker: str = "",
+        gated_by: Optional[ActionLease] = None,
+    ) -> Tuple[Optional[ActionLease], str]:
+        """``(lease, "")`` or ``(None, busy detail)``; nothing is held on failure.
+
+        ``gated_by`` is a held local collect lease this dispatch is ordered after.
+        """
+        wanted = [(ROOT_LOCK_NAME, False)]
+        wanted.extend((f"task-{_lock_token(task_id)}", True) for task_id in sorted({str(t) for t in task_ids if t}))
+        if worker:
+            wanted.append((f"worker-{_lock_token(worker)}", True))
+        join_collect = gated_by is not None and gated_by.kind == LEASE_KIND_COLLECT and bool(gated_by.locks)
+        return self._acquire_all(LEASE_KIND_DISPATCH, wanted, join_collect=join_collect)
+
+    def acquire_collect(self) -> Tuple[Optional[ActionLease], str]:
+        return self._acquire_all(LEASE_KIND_COLLECT, [(ROOT_LOCK_NAME, True)])
+
+    def release(self, lease: Optional[ActionLease]) -> None:
+        if lease is None:
+            return
+        hold_sec = time.monotonic() - lease.acquired_at
+        for name, exclusive in reversed(lease.locks):
+            self._release_one(name, exclusive)
+            if self.stats is not None:
+                self.stats.record_release(_stats_name(name), hold_sec)
+        lease.locks = []
+
+    def held(self) -> Dict[str, str]:
+        """Locks this process holds: name -> ``"shared"`` or ``"exclusive"``."""
+        return {name: "exclusive" if lock.exclusive else "shared" for name, lock in self._held.items()}
+
+    def close(self) -> None:
+        for name in list(self._held):
+            held = self._held.pop(name)
+            self._close(name, held, unlink=name != ROOT_LOCK_NAME)
+
+    def _acquire_all(
+        self, kind: str, wanted: List[Tuple[str, bool]], *, join_collect: bool = False
+    ) -> Tuple[Optional[ActionLease], str]:
+        taken: List[Tuple[str, bool]] = []
+        for name, exclusive in wanted:
+            error = self._acquire_one(name, exclusive, join_collect=join_collect)
+            if error:
+                for taken_name, taken_exclusive in reversed(taken):
+                    self._release_one(taken_name, taken_exclusive)
+                if self.stats is not None:
+                    self.stats.record_acquire(_stats_name(name), 0.0, acquired=False, contended=True)
+                return None, error
+            taken.append((name, exclusive))
+        if self.stats is not None:
+            for name, _ in taken:
+                self.stats.record_acquire(_stats_name(name), 0.0, acquired=True, contended=False)
+        return ActionLease(kind, taken), ""
+
+    def _acquire_one(self, name: str, exclusive: bool, *, join_collect: bool = False) -> str:
+        held = self._held.get(name)
+        if held is None:
+            held, error = self._open_locked(name, exclusive)
+            if held is None:
+                return error
+            self._held[name] = held
+        elif exclusive and held.shared:
+            return f"{name} lock busy (held shared by a dispatch in this process): {held.path}"
+        elif not exclusive and held.exclusive and not join_collect:
+            return f"{name} lock busy (held exclusive by a collect in this process): {held.path}"
+        if exclusive:
+            held.exclusive += 1
+        else:
+            held.shared += 1
+        return ""
+
+    def _release_one(self, name: str, exclusive: bool) -> None:
+        held = self._held.get(name)
+        if held is None:
+            return
+        if exclusive:
+            held.exclusive = max(0, held.exclusive - 1)
+        else:
+            held.shared = max(0, held.shared - 1)
+        if held.exclusive or held.shared:
+            if not held.exclusive:
+                # Only local dispatches remain: let other processes' dispatches back in.
+                self._try_lock(held.fd, exclusive=False)
+            return
+        del self._held[name]
+        # The root lock is shared, so another process may still hold the same inode.
+        self._close(name, held, unlink=name != ROOT_LOCK_NAME)
+
+    def _open_locked(self, name: str, exclusive: bool) -> Tuple[Optional[_HeldLock], str]:
+        os.makedirs(self.lock_dir, exist_ok=True)
+        path = os.path.join(self.lock_dir, f"{name}.lock")
+        for _ in range(_REOPEN_ATTEMPTS):
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+            if not self._try_lock(fd, exclusive=exclusive):
+                os.close(fd)
+                return None, f"{name} lock busy: {path}"
+            # The previous holder may have unlinked the file between our open and lock.
+            try:
+                same_file = os.fstat(fd).st_ino == os.stat(path).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                return _HeldLock(fd, path), ""
+            os.close(fd)
+        return None, f"{name} lock busy (lock file churn): {path}"
+
+    @staticmethod
+    def _try_lock(fd: int, *, exclusive: bool) -> bool:
+        try:
+            fcntl.lockf(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        except OSError as exc:
+            if exc.errno in (errno.EACCES, errno.EAGAIN):
+                return False
+            raise
+        return True
+
+    @staticmethod
+    def _close(name: str, held: _HeldLock, *, unlink: bool) -> None:
+        if unlink:
+            try:
+                os.unlink(held.path)
+            except OSError:
+                pass
+        try:
+            os.close(held.fd)
+        except OSError:
+            pass
+
+
+__all__ = ["ActionLease", "ActionLocks", "LEASE_KIND_COLLECT", "LEASE_KIND_DISPATCH", "ROOT_LOCK_NAME"]
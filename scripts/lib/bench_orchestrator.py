@@ -0,0 +1,504 @@
+"""Load test: the full orchestrator cycle against a scripted fake tmux.
+
+Builds a throwaway repo with N worker panes and M tasks under one command
+and drives ``SessionRunner.run_cycle`` through the whole
+planner -> architect -> implementer -> reviewer -> quality-gate flow.
+``_capture_pane_tail``, ``notify_oyabun`` and the dispatch/collect runners
+are swapped for in-process fakes: a dispatch makes the target role "finish"
+by queueing its completion signal on the task's worker pane, and each pane
+shows one signal at a time, the way a worker shows one task's output.
+Every ``--rework-every``-th task is sent back once by the quality gate.
+
+After every cycle the bench waits for the action executor to drain, so a
+run is deterministic for given parameters; the numbers are the
+orchestrator's own cost (state I/O, parsing, transitions, locking), with
+no tmux or agent latency in them.
+
+Reported per run: accepted signals/sec, emit -> ``_apply_transition``
+latency percentiles, and state/event file growth.  ``--output`` stores the
+runs as JSON; ``--compare`` checks them against a stored baseline.
+
+Run:
+    yb bench orchestrator [--workers 4,8,16] [--tasks 40] [--output FILE] [--compare FILE]
+    python3 -m scripts.lib.bench_orchestrator ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch  # noqa: E402
+from lib.session_registry import SessionSpec  # noqa: E402
+
+BENCH_NAME = "orchestrator"
+CMD_ID = "cmd_bench"
+FAKE_TMUX_SESSION = "yb-bench"
+DEFAULT_MAX_REGRESSION = 0.20
+
+
+def _task_id(index: int) -> str:
+    return f"{CMD_ID}_task_{index:04d}"
+
+
+def _worker_id(index: int) -> str:
+    return f"worker_{index:03d}"
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class FakeCrew:
+    """Scripted workers behind a fake tmux: dispatches queue signals, captures show them."""
+
+    def __init__(self, workers: Dict[str, str], assignments: Dict[str, str], scripts: Dict[str, List[Dict[str, Any]]]):
+        self.workers = workers
+        self.assignments = assignments
+        self._scripts = scripts
+        self._lock = threading.Lock()
+        self._outbox: List[Tuple[str, Dict[str, Any]]] = []
+        self._pending: Dict[str, List[Dict[str, Any]]] = {pane: [] for pane in workers.values()}
+        self._showing: Dict[str, str] = {pane: "" for pane in workers.values()}
+        self._shown: Dict[str, bool] = {pane: True for pane in workers.values()}
+        self._ts_ms = int(time.time() * 1000)
+        self.emitted_at: Dict[int, float] = {}
+        self.dispatches = 0
+        self.collects = 0
+        self.notifies = 0
+        self.script_errors: List[str] = []
+
+    # -- fakes installed into yb_orchestrator --------------------------------
+
+    def capture_pane_tail(self, tmux_session: str, pane_id: str) -> Optional[str]:
+        with self._lock:
+            pending = self._pending.get(pane_id)
+            if pending is None:
+                return None
+            # A worker's next output replaces the screen only after the previous one was seen.
+            if self._shown[pane_id] and pending:
+                signal = pending.pop(0)
+                self._showing[pane_id] = f"$ yb run-worker\n{json.dumps(signal, ensure_ascii=False)}\n"
+                self._shown[pane_id] = False
+            else:
+                self._shown[pane_id] = True
+            return self._showing[pane_id]
+
+    def notify_oyabun(self, session: str, oyabun_pane: str, message: str) -> bool:
+        with self._lock:
+            self.notifies += 1
+        return True
+
+    def run_dispatch(
+        self,
+        repo_root: str,
+        session_id: str,
+        target_role: str,
+        task_id: str,
+        cmd_id: str,
+        dispatch_mode: str,
+    ) -> Tuple[int, List[str], str]:
+        with self._lock:
+            self.dispatches += 1
+            if target_role == orch.ROLE_PLANNER:
+                task_ids = sorted(self._scripts)
+            else:
+                task_ids = [task_id]
+            for target in task_ids:
+                self._outbox.append((target, target_role))
+        return 0, ["fake-dispatch", target_role, task_id], ""
+
+    def run_collect(self, repo_root: str, session_id: str, lock_stats: Any = None, *_attempt: int) -> Tuple[int, List[str], str]:
+        with self._lock:
+            self.collects += 1
+        return 0, ["fake-collect"], ""
+
+    # -- driver side ----------------------------------------------------------
+
+    def emit(self, task_id: str, signal: Dict[str, Any]) -> None:
+        self._ts_ms += 1
+        signal = dict(signal, ts_ms=self._ts_ms)
+        self.emitted_at[self._ts_ms] = time.perf_counter()
+        self._pending[self.workers[self.assignments[task_id]]].append(signal)
+
+    def deliver(self) -> int:
+        """Turn the cycle's dispatches into queued completion signals, in task order."""
+        with self._lock:
+            outbox, self._outbox = sorted(self._outbox), []
+            for task_id, dispatched_role in outbox:
+                script = self._scripts.get(task_id)
+                if not script:
+                    self.script_errors.append(f"unexpected dispatch role={dispatched_role} task={task_id}")
+                    continue
+                signal = script.pop(0)
+                expected = signal["role"]
+                if dispatched_role not in (expected, orch.ROLE_PLANNER):
+                    self.script_errors.append(
+                        f"task={task_id} dispatched role={dispatched_role} but script expected {expected}"
+                    )
+                self.emit(task_id, signal)
+            return len(outbox)
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._outbox and all(not pending for pending in self._pending.values()) and all(
+                self._shown.values()
+            )
+
+
+def _task_script(task_id: str, worker_id: str, rework: bool) -> List[Dict[str, Any]]:
+    base = {"task_id": task_id, "cmd_id": CMD_ID, "worker_id": worker_id}
+    implement = dict(base, role=orch.ROLE_IMPLEMENTER, mission="completed", status="done")
+    review = dict(
+        base,
+        role=orch.ROLE_REVIEWER,
+        mission="completed",
+        status="done",
+        findings=[],
+        recommendation="approve",
+    )
+    approve = dict(base, role=orch.ROLE_QUALITY_GATE, mission="completed", result="approve", reason="bench")
+    script = [
+        dict(base, role=orch.ROLE_ARCHITECT, mission="completed", status="design_ready"),
+        implement,
+        review,
+    ]
+    if rework:
+        script += [
+            dict(base, role=orch.ROLE_QUALITY_GATE, mission="completed", result="rework", reason="bench rework"),
+            implement,
+            review,
+        ]
+    script.append(approve)
+    return script
+
+
+def _write_fixture(repo_root: str, workers: int, tasks: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+    yb_dir = os.path.join(repo_root, ".yamibaito")
+    tasks_dir = os.path.join(yb_dir, "queue", "tasks")
+    os.makedirs(tasks_dir)
+    pane_map = {_worker_id(index): f"0.{index}" for index in range(1, workers + 1)}
+    assignments = {_task_id(index): _worker_id(index % workers + 1) for index in range(tasks)}
+    for task_id, worker_id in assignments.items():
+        with open(os.path.join(tasks_dir, f"{task_id}.yaml"), "w", encoding="utf-8") as fh:
+            fh.write(
+                "schema_version: 1\n"
+                "task:\n"
+                f"  task_id: {task_id}\n"
+                f"  parent_cmd_id: {CMD_ID}\n"
+                f"  assigned_to: {worker_id}\n"
+                "  status: assigned\n"
+                "  needs_architect: true\n"
+                "  routing_policy: v2\n"
+            )
+    with open(os.path.join(yb_dir, "panes.json"), "w", encoding="utf-8") as fh:
+        json.dump(
+            {"session": FAKE_TMUX_SESSION, "oyabun": "0.0", "work_dir": repo_root, "workers": pane_map},
+            fh,
+            indent=2,
+        )
+    return pane_map, assignments
+
+
+@contextlib.contextmanager
+def _patched(crew: FakeCrew, applied_at: Dict[int, float], verbose: bool) -> Iterator[None]:
+    original_apply = orch._apply_transition
+
+    def timed_apply(sm, logger, **kwargs):
+        ts_ms = kwargs.get("signal_dict", {}).get("ts_ms")
+        if isinstance(ts_ms, int):
+            applied_at.setdefault(ts_ms, time.perf_counter())
+        return original_apply(sm, logger, **kwargs)
+
+    replacements = {
+        "_capture_pane_tail": crew.capture_pane_tail,
+        "notify_oyabun": crew.notify_oyabun,
+        "_run_dispatch": crew.run_dispatch,
+        "_run_collect": crew.run_collect,
+        "_apply_transition": timed_apply,
+    }
+    if not verbose:
+        replacements["_log"] = lambda level, message: None
+    saved = {name: getattr(orch, name) for name in replacements}
+    for name, value in replacements.items():
+        setattr(orch, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(orch, name, value)
+
+
+def _dir_bytes(path: str, prefix: str) -> int:
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith(prefix) and entry.is_file():
+                total += entry.stat().st_size
+    return total
+
+
+def run_once(
+    *,
+    workers: int,
+    tasks: int,
+    rework_every: int,
+    state_backend: str,
+    max_cycles: int,
+    event_log_buffer_events: int = orch.DEFAULT_EVENT_LOG_BUFFER_EVENTS,
+    event_log_writer: str = orch.EVENT_LOG_WRITER_SYNC,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    repo_root = tempfile.mkdtemp(prefix="yb_bench_")
+    try:
+        pane_map, assignments = _write_fixture(repo_root, workers, tasks)
+        scripts = {
+            task_id: _task_script(task_id, worker_id, rework_every > 0 and index % rework_every == 0)
+            for index, (task_id, worker_id) in enumerate(sorted(assignments.items()))
+        }
+        crew = FakeCrew(pane_map, assignments, scripts)
+        applied_at: Dict[int, float] = {}
+        first_task = _task_id(0)
+        crew.emit(
+            first_task,
+            {
+                "task_id": first_task,
+                "cmd_id": CMD_ID,
+                "role": orch.ROLE_PLANNER,
+                "mission": "completed",
+                "status": orch.STATUS_TASKS_READY,
+                "task_count": tasks,
+                "worker_id": assignments[first_task],
+            },
+        )
+
+        config = orch._load_runtime_config(repo_root)
+        config["state_backend"] = state_backend
+        config["event_log_buffer_events"] = event_log_buffer_events
+        config["event_log_writer"] = event_log_writer
+        spec = SessionSpec(repo_root=repo_root, mode=orch.MODE_V2)
+        with _patched(crew, applied_at, verbose):
+            runner = orch.SessionRunner(spec, config)
+            cycles = 0
+            started = time.perf_counter()
+            try:
+                while cycles < max_cycles:
+                    runner.run_cycle()
+                    cycles += 1
+                    runner.executor.wait_idle()
+                    crew.deliver()
+                    if crew.idle() and not runner.executor.in_flight() and not runner.collects.pending():
+                        break
+                elapsed = time.perf_counter() - started
+            finally:
+                runner.shutdown()
+
+        task_state = runner.sm.state.get("taskState") or {}
+        done = sum(1 for entry in task_state.values() if isinstance(entry, dict) and entry.get("phase") == "done")
+        latencies = sorted(
+            (applied_at[ts_ms] - crew.emitted_at[ts_ms]) * 1000.0 for ts_ms in applied_at if ts_ms in crew.emitted_at
+        )
+        state_dir = runner.state_dir
+        state_bytes = _dir_bytes(state_dir, "orchestrator-state")
+        io_stats = runner.sm.io_stats
+        event_stats = runner.logger.io_stats
+        return {
+            "workers": workers,
+            "tasks": tasks,
+            "rework_every": rework_every,
+            "state_backend": state_backend,
+            "event_log_buffer_events": event_log_buffer_events,
+            "event_log_writer": event_log_writer,
+            "cycles": cycles,
+            "elapsed_sec": round(elapsed, 4),
+            "signals": len(latencies),
+            "signals_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+            "tasks_done": done,
+            "dispatches": crew.dispatches,
+            "notifies": crew.notifies,
+            "script_errors": crew.script_errors[:20],
+            "transition_latency_ms": {
+                "p50": round(_percentile(latencies, 0.50), 3),
+                "p90": round(_percentile(latencies, 0.90), 3),
+                "p99": round(_percentile(latencies, 0.99), 3),
+                "max": round(latencies[-1], 3) if latencies else 0.0,
+            },
+            "state_bytes": state_bytes,
+            "state_bytes_per_task": round(state_bytes / tasks, 1) if tasks else 0.0,
+            "state_bytes_written": io_stats.get("bytes_written", 0),
+            "state_saves_written": io_stats.get("saves_written", 0),
+            "events_bytes": _dir_bytes(state_dir, "orchestrator-events"),
+            "events_logged": event_stats["events_logged"],
+            "events_appends": event_stats["appends"],
+        }
+    finally:
+        shutil.rmtree(repo_root, ignore_errors=True)
+
+
+def _run_key(run: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        run.get("workers"),
+        run.get("tasks"),
+        run.get("rework_every"),
+        run.get("state_backend"),
+        run.get("event_log_buffer_events"),
+        run.get("event_log_writer"),
+    )
+
+
+def compare(runs: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> Tuple[List[str], bool]:
+    """Report lines against a stored baseline; True when some run lost more than ``max_regression`` throughput."""
+    previous = {_run_key(run): run for run in baseline.get("runs", []) if isinstance(run, dict)}
+    lines: List[str] = []
+    regressed = False
+    for run in runs:
+        old = previous.get(_run_key(run))
+        label = f"workers={run['workers']} tasks={run['tasks']}"
+        if old is None:
+            lines.append(f"{label}: no baseline run")
+            continue
+        old_rate = float(old.get("signals_per_sec") or 0.0)
+        new_rate = float(run["signals_per_sec"])
+        change = (new_rate - old_rate) / old_rate if old_rate else 0.0
+        old_p90 = float((old.get("transition_latency_ms") or {}).get("p90") or 0.0)
+        new_p90 = run["transition_latency_ms"]["p90"]
+        flag = ""
+        if change < -max_regression:
+            regressed = True
+            flag = "  REGRESSION"
+        lines.append(
+            f"{label}: signals/s {old_rate:.1f} -> {new_rate:.1f} ({change:+.1%}), "
+            f"p90 latency {old_p90:.3f} -> {new_p90:.3f} ms, "
+            f"state bytes/task {old.get('state_bytes_per_task')} -> {run['state_bytes_per_task']}{flag}"
+        )
+    return lines, regressed
+
+
+def _print_runs(runs: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'workers':>7} {'tasks':>6} {'signals':>8} {'cycles':>7} {'elapsed_s':>10} {'signals/s':>10} "
+        f"{'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8} {'state_B':>9} {'B/task':>8} {'done':>6}"
+    )
+    for run in runs:
+        latency = run["transition_latency_ms"]
+        print(
+            f"{run['workers']:>7} {run['tasks']:>6} {run['signals']:>8} {run['cycles']:>7} "
+            f"{run['elapsed_sec']:>10.3f} {run['signals_per_sec']:>10.1f} {latency['p50']:>8.3f} "
+            f"{latency['p90']:>8.3f} {latency['p99']:>8.3f} {run['state_bytes']:>9} "
+            f"{run['state_bytes_per_task']:>8.1f} {run['tasks_done']:>6}"
+        )
+        for error in run["script_errors"]:
+            print(f"  script error: {error}", file=sys.stderr)
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        numbers = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got '{value}'")
+    if not numbers or min(numbers) < 1:
+        raise argparse.ArgumentTypeError(f"expected positive integers, got '{value}'")
+    return numbers
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator loop against a fake tmux")
+    parser.add_argument("--workers", type=_int_list, default=[4], help="worker panes, comma-separated for a sweep")
+    parser.add_argument("--tasks", type=_int_list, default=[40], help="tasks per run, comma-separated for a sweep")
+    parser.add_argument("--rework-every", type=int, default=5, help="every Nth task gets one rework loop (0: none)")
+    parser.add_argument(
+        "--state-backend",
+        default=orch.StateManager.BACKEND_JSON,
+        choices=orch.StateManager.VALID_BACKENDS,
+        help="orchestrator.state_backend to measure",
+    )
+    parser.add_argument(
+        "--event-log-buffer",
+        type=int,
+        default=orch.DEFAULT_EVENT_LOG_BUFFER_EVENTS,
+        help="orchestrator.event_log_buffer_events to measure (0: one append per event)",
+    )
+    parser.add_argument(
+        "--event-log-writer",
+        default=orch.EVENT_LOG_WRITER_SYNC,
+        choices=orch.VALID_EVENT_LOG_WRITERS,
+        help="orchestrator.event_log_writer to measure",
+    )
+    parser.add_argument("--max-cycles", type=int, default=100_000, help="stop a run after this many cycles")
+    parser.add_argument("--output", default="", help="write the results as JSON to this file")
+    parser.add_argument("--compare", default="", help="baseline results JSON from an earlier --output")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=DEFAULT_MAX_REGRESSION,
+        help="signals/sec drop vs. the baseline that fails --compare (default: 0.20)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="keep orchestrator log lines on stderr")
+    args = parser.parse_args(argv)
+
+    runs = [
+        run_once(
+            workers=workers,
+            tasks=tasks,
+            rework_every=max(0, args.rework_every),
+            state_backend=args.state_backend,
+            event_log_buffer_events=max(0, args.event_log_buffer),
+            event_log_writer=args.event_log_writer,
+            max_cycles=max(1, args.max_cycles),
+            verbose=args.verbose,
+        )
+        for tasks in args.tasks
+        for workers in args.workers
+    ]
+    _print_runs(runs)
+
+    result = {
+        "bench": BENCH_NAME,
+        "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+
+    exit_code = 0 if all(run["tasks_done"] == run["tasks"] and not run["script_errors"] for run in runs) else 1
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            print(f"cannot read baseline '{args.compare}': {exc}", file=sys.stderr)
+            return 2
+        lines, regressed = compare(runs, baseline, args.max_regression)
+        print("")
+        print(f"vs. {args.compare} ({baseline.get('created_at', '?')}):")
+        for line in lines:
+            print(f"  {line}")
+        if regressed:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Micro-benchmark: per-signal dedup cost, bounded list vs. SignalRing.
+
+Fills the history to ``max_signal_history`` and then measures the steady
+state (lookup + insert + eviction) the orchestrator pays for every accepted
+signal.  The list variant reproduces the previous StateManager logic.
+
+Run:
+    python3 -m scripts.lib.bench_signal_dedup [--signals N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.signal_ring import SignalRing
+
+HISTORY_SIZES = (2_000, 20_000, 100_000, 200_000)
+
+
+def _hashes(count: int, offset: int = 0) -> List[str]:
+    return [hashlib.sha256(str(offset + idx).encode("ascii")).hexdigest() for idx in range(count)]
+
+
+def _bench_list(history: List[str], incoming: List[str], max_signals: int) -> float:
+    processed = list(history)
+    start = time.perf_counter()
+    for sig_hash in incoming:
+        if sig_hash in processed:
+            continue
+        processed.append(sig_hash)
+        overflow = len(processed) - max_signals
+        if overflow > 0:
+            del processed[:overflow]
+    return time.perf_counter() - start
+
+
+def _bench_ring(history: List[str], incoming: List[str], max_signals: int) -> float:
+    processed = SignalRing(history, maxlen=max_signals)
+    start = time.perf_counter()
+    for sig_hash in incoming:
+        if sig_hash in processed:
+            continue
+        processed.append(sig_hash)
+    return time.perf_counter() - start
+
+
+def run(signals: int) -> List[Tuple[int, float, float]]:
+    incoming = _hashes(signals, offset=10_000_000)
+    results: List[Tuple[int, float, float]] = []
+    for size in HISTORY_SIZES:
+        history = _hashes(size)
+        list_sec = _bench_list(history, incoming, size)
+        ring_sec = _bench_ring(history, incoming, size)
+        results.append((size, list_sec / signals, ring_sec / signals))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark processed-signal dedup")
+    parser.add_argument("--signals", type=int, default=500, help="signals measured per history size")
+    args = parser.parse_args(argv)
+    signals = max(1, args.signals)
+
+    print(f"{'max_signal_history':>18} {'list us/signal':>15} {'ring us/signal':>15}")
+    for size, list_cost, ring_cost in run(signals):
+        print(f"{size:>18} {list_cost * 1e6:>15.2f} {ring_cost * 1e6:>15.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""Micro-benchmark: forward full-text extractor vs. reverse tail scan.
+
+Builds pane captures shaped like real worker output (code diffs full of
+braces, tool chatter, the signal JSON near the end) and times both
+extractors on them.  The "forward found" column shows whether the old
+extractor recovered the signal at all: a diff hunk cut off by the capture
+window leaves an unbalanced ``{`` that hides every later object from it.
+
+Run:
+    python3 -m scripts.lib.bench_signal_parser [--iterations N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.signal_parser import (
+    SIGNAL_SENTINEL,
+    _extract_json_object_from_text,
+    extract_last_json_object,
+)
+
+_DIFF_CHUNK = """\
+@@ -12,7 +12,9 @@ export function handler(req, res) {
+-  const body = { ok: false, errors: [] };
++  const body = { ok: true, data: { items: req.items.map((i) => ({ id: i.id })) } };
++  if (!req.user) { return res.status(401).json({ error: "unauthorized" }); }
+   for (const key of Object.keys(req.query)) { body[key] = req.query[key]; }
+   logger.info({ event: "handled", path: req.path, meta: { ms: 12 } });
+ }
+"""
+
+_SIGNAL = {
+    "mission": "completed",
+    "task_id": "task_0042",
+    "role": "implementer",
+    "status": "completed",
+    "summary": "handler updated; tests {unit} pass",
+    "files_changed": ["src/handler.ts", "src/handler.test.ts"],
+}
+
+
+def build_capture(lines: int, *, sentinel: bool = False, trailing_noise: int = 3) -> str:
+    body: List[str] = []
+    chunk = _DIFF_CHUNK.splitlines()
+    while len(body) < lines:
+        body.extend(chunk)
+    body = body[:lines]
+    prefix = f"{SIGNAL_SENTINEL} " if sentinel else ""
+    body.append(prefix + json.dumps(_SIGNAL, ensure_ascii=False))
+    body.extend(["", "> ", "  ? for shortcuts"][:trailing_noise])
+    return "\n".join(body)
+
+
+def _time(fn: Callable[[str], Optional[dict]], text: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(text)
+    return time.perf_counter() - start
+
+
+def run(iterations: int) -> List[Tuple[str, float, float, bool]]:
+    cases = [
+        ("capture 49 lines", build_capture(49)),
+        ("capture 50 (cut hunk)", build_capture(50)),
+        ("pipe window 196 lines", build_capture(196)),
+        ("scrollback 1995 lines", build_capture(1995)),
+        ("196 lines + YB_SIGNAL", build_capture(196, sentinel=True)),
+    ]
+    results: List[Tuple[str, float, float, bool]] = []
+    for name, text in cases:
+        if extract_last_json_object(text) != _SIGNAL:
+            raise SystemExit(f"reverse extractor missed the signal on case '{name}'")
+        forward_found = _extract_json_object_from_text(text) == _SIGNAL
+        forward = _time(_extract_json_object_from_text, text, iterations)
+        reverse = _time(extract_last_json_object, text, iterations)
+        results.append((name, forward, reverse, forward_found))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark signal JSON extraction")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+    iterations = max(1, args.iterations)
+
+    print(f"{'case':<24} {'forward us':>12} {'reverse us':>12} {'speedup':>8}  forward found")
+    for name, forward, reverse, forward_found in run(iterations):
+        fwd_us = forward / iterations * 1e6
+        rev_us = reverse / iterations * 1e6
+        speedup = forward / reverse if reverse > 0 else float("inf")
+        print(f"{name:<24} {fwd_us:>12.1f} {rev_us:>12.1f} {speedup:>7.1f}x  {'yes' if forward_found else 'no'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
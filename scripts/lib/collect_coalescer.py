@@ -0,0 +1,99 @@
+"""Merge collect requests raised close together into one collect run.
+
+A collect rescans every report and rewrites dashboard.md regardless of which
+task asked for it, so N requests in one orchestrator cycle (or within
+``window_sec`` of the first one) are folded into a single collect action
+whose ``task_ids`` lists every requester.  The caller attributes the outcome
+of that one run back to each of them.  Dispatches that must wait for a
+collect travel with it as ``followups``.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _request_task_ids(action: Dict[str, Any]) -> List[str]:
+    task_ids = [_text(item) for item in action.get("task_ids") or [] if _text(item)]
+    task_id = _text(action.get("task_id"))
+    if task_id and task_id not in task_ids:
+        task_ids.insert(0, task_id)
+    return task_ids
+
+
+class CollectCoalescer:
+    def __init__(self, window_sec: float = 0.0):
+        self.window_sec = max(0.0, float(window_sec))
+        self._requests: List[Dict[str, Any]] = []
+        self._followups: List[Dict[str, Any]] = []
+        self._first_at: Optional[float] = None
+
+    def add(self, action: Dict[str, Any], followups: Optional[List[Dict[str, Any]]] = None) -> None:
+        if self._first_at is None:
+            self._first_at = time.monotonic()
+        self._requests.append(dict(action))
+        self._followups.extend(dict(item) for item in followups or [])
+
+    def pending(self) -> int:
+        return len(self._requests)
+
+    def seconds_until_due(self, now: Optional[float] = None) -> Optional[float]:
+        if self._first_at is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._first_at + self.window_sec - now)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        remaining = self.seconds_until_due(now)
+        return remaining is not None and remaining <= 0
+
+    def take(self) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """The merged collect action and its follow-ups; None when nothing is pending."""
+        if not self._requests:
+            return None
+        requests, followups = self._requests, self._followups
+        self._requests, self._followups, self._first_at = [], [], None
+
+        task_ids: List[str] = []
+        reasons: List[str] = []
+        cmd_ids: Dict[str, str] = {}
+        attempts: List[int] = []
+        for request in requests:
+            for task_id in _request_task_ids(request):
+                if task_id not in task_ids:
+                    task_ids.append(task_id)
+            for task_id, cmd_id in (request.get("cmd_ids") or {}).items():
+                cmd_ids.setdefault(_text(task_id), _text(cmd_id))
+            cmd_id = _text(request.get("cmd_id"))
+            task_id = _text(request.get("task_id"))
+            if task_id and cmd_id:
+                cmd_ids.setdefault(task_id, cmd_id)
+            for reason in _text(request.get("reason")).split(","):
+                if reason.strip() and reason.strip() not in reasons:
+                    reasons.append(reason.strip())
+            try:
+                attempts.append(max(1, int(request.get("attempt") or 1)))
+            except (TypeError, ValueError):
+                attempts.append(1)
+
+        merged: Dict[str, Any] = {
+            "type": "collect",
+            "reason": ",".join(reasons),
+            "task_id": task_ids[0] if task_ids else "",
+            "cmd_id": cmd_ids.get(task_ids[0], "") if task_ids else "",
+            "task_ids": task_ids,
+            "cmd_ids": cmd_ids,
+            "coalesced": len(requests),
+        }
+        # A fresh request keeps its full retry budget even when merged with a retried one.
+        if min(attempts) > 1:
+            merged["attempt"] = min(attempts)
+        return merged, followups
+
+
+__all__ = ["CollectCoalescer"]
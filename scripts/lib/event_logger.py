@@ -1,4 +1,23 @@
-"""Append-only JSONL event logger for orchestrator runtime events."""
+"""Append-only JSONL event logger for orchestrator runtime events.
+
+By default every event is its own locked append (open, flock, write,
+close).  With ``buffer_events > 0`` events are serialized into memory and
+group-committed: one locked append when ``flush()`` is called (the
+orchestrator does so once per cycle and on shutdown), or earlier once the
+buffer holds ``buffer_events`` events, ``buffer_bytes`` bytes, or its
+oldest event is ``buffer_max_age_sec`` old.
+
+With ``background=True`` nothing is written on the caller's thread:
+``log()`` hands the serialized line to a bounded in-memory queue and a
+writer thread appends whatever has queued up in one locked write (retry
+back-off included), so a slow disk never stalls the orchestrator loop.
+When the queue holds ``queue_events`` lines, ``overflow`` decides:
+``block`` waits for room, ``drop_oldest`` discards the oldest queued line
+(counted), ``spill`` appends the line to ``<events>.spill`` without lock
+or retry.  Once spilling starts every later line is spilled too, until the
+writer has moved the whole spill file into the log after the lines queued
+before it, so the log keeps the order events were logged in.
+"""
 
 from __future__ import annotations
 
@@ -7,12 +26,23 @@ import fcntl
 import json
 import os
 import sys
+import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional
 
 _APPEND_RETRY_COUNT = 3
 _APPEND_RETRY_DELAY_SEC = 0.05
+DEFAULT_BUFFER_BYTES = 1024 * 1024
+DEFAULT_BUFFER_MAX_AGE_SEC = 1.0
+DEFAULT_QUEUE_EVENTS = 10000
+SPILL_SUFFIX = ".spill"
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_SPILL = "spill"
+VALID_OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL)
 
 
 class _PartialWriteError(OSError):
@@ -80,13 +110,78 @@ def _open_trusted_parent_dir_fd(parent_dir: str) -> int:
 
 
 class EventLogger:
-    def __init__(self, events_path: str):
+    def __init__(
+        self,
+        events_path: str,
+        *,
+        buffer_events: int = 0,
+        buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+        buffer_max_age_sec: float = DEFAULT_BUFFER_MAX_AGE_SEC,
+        background: bool = False,
+        queue_events: int = DEFAULT_QUEUE_EVENTS,
+        overflow: str = OVERFLOW_BLOCK,
+    ):
+        if overflow not in VALID_OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {overflow}")
         self.events_path = _normalize_and_validate_events_path(events_path)
         self._trusted_parent_dir = os.path.dirname(self.events_path)
         self._events_filename = os.path.basename(self.events_path)
         if not self._events_filename:
             raise ValueError("events_path must include a file name")
         self._trusted_parent_fd = _open_trusted_parent_dir_fd(self._trusted_parent_dir)
+        self.buffer_events = max(0, int(buffer_events))
+        self.buffer_bytes = max(1, int(buffer_bytes))
+        self.buffer_max_age_sec = max(0.0, float(buffer_max_age_sec))
+        self.queue_events = max(1, int(queue_events))
+        self.overflow = overflow
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._buffer_started = 0.0
+        self._io_stats: Dict[str, int] = {
+            "events_logged": 0,
+            "appends": 0,
+            "bytes_written": 0,
+            "events_dropped": 0,
+            "events_overflow_dropped": 0,
+            "events_spilled": 0,
+            "queue_blocked": 0,
+            "queue_high_water": 0,
+        }
+        self._queue: Deque[bytes] = deque()
+        self._writing = False
+        self._closing = False
+        self._spill_filename = self._events_filename + SPILL_SUFFIX
+        self._spill_lock = threading.Lock()
+        # True from the first spilled line until the writer has emptied the spill file.
+        self._spilling = False
+        self._writer: Optional[threading.Thread] = None
+        if background:
+            # A spill file left by an earlier process is folded back in (ahead of new lines) by the new writer.
+            try:
+                os.stat(self._spill_filename, dir_fd=self._trusted_parent_fd, follow_symlinks=False)
+                self._spilling = True
+            except FileNotFoundError:
+                pass
+            self._writer = threading.Thread(target=self._writer_loop, name="yb-event-writer", daemon=True)
+            self._writer.start()
+
+    @property
+    def buffered(self) -> bool:
+        return self.buffer_events > 0
+
+    @property
+    def background(self) -> bool:
+        return self._writer is not None
+
+    @property
+    def io_stats(self) -> Dict[str, int]:
+        """Cumulative counters (events logged, appends, bytes, losses, overflow) plus the current queue depth."""
+        with self._lock:
+            stats = dict(self._io_stats)
+            stats["queue_depth"] = len(self._queue)
+            return stats
 
     def _validate_runtime_path(self) -> None:
         normalized_path = os.path.abspath(os.path.normpath(self.events_path))
@@ -163,10 +258,168 @@ class EventLogger:
         if last_error is not None:
             raise last_error
 
+    def _write(self, payload: bytes, events: int) -> None:
+        try:
+            self._append_with_retry(payload)
+        except Exception:
+            self._io_stats["events_dropped"] += events
+            raise
+        self._io_stats["appends"] += 1
+        self._io_stats["bytes_written"] += len(payload)
+
+    def _enqueue_locked(self, line: bytes) -> None:
+        """Queue ``line`` for the writer thread, applying the overflow policy; caller holds ``_cond``."""
+        if self.overflow == OVERFLOW_SPILL and (self._spilling or len(self._queue) >= self.queue_events):
+            self._spill_locked(line)
+            return
+        if len(self._queue) >= self.queue_events:
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                self._queue.popleft()
+                self._io_stats["events_overflow_dropped"] += 1
+            else:
+                self._io_stats["queue_blocked"] += 1
+                while len(self._queue) >= self.queue_events and not self._closing:
+                    self._cond.wait()
+        self._queue.append(line)
+        self._io_stats["queue_high_water"] = max(self._io_stats["queue_high_water"], len(self._queue))
+        self._cond.notify_all()
+
+    def _spill_locked(self, line: bytes) -> None:
+        flags = os.O_APPEND | os.O_CREAT | os.O_WRONLY | os.O_NOFOLLOW
+        try:
+            with self._spill_lock:
+                fd = os.open(self._spill_filename, flags, 0o644, dir_fd=self._trusted_parent_fd)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except OSError as exc:
+            self._io_stats["events_dropped"] += 1
+            _warn(f"failed to spill event for '{self.events_path}': {exc}")
+            return
+        self._io_stats["events_spilled"] += 1
+        self._spilling = True
+        self._cond.notify_all()
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._spilling and not self._closing:
+                    self._cond.wait()
+                if not self._queue and not self._spilling:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                recover_spill = self._spilling
+                self._writing = True
+                self._cond.notify_all()
+            recovered = True
+            try:
+                if batch:
+                    self._write_from_writer(b"".join(batch), len(batch))
+                if recover_spill:
+                    recovered = self._recover_spill()
+            finally:
+                with self._cond:
+                    # Producers spill while holding ``_cond``: once the file is empty here they can
+                    # go back to the queue without overtaking a spilled line.
+                    if recover_spill and (not recovered or self._spill_is_empty()):
+                        self._spilling = False
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write_from_writer(self, payload: bytes, events: int) -> None:
+        try:
+            self._append_with_retry(payload)
+        except Exception as exc:
+            _warn(f"event writer dropped {events} event(s) for '{self.events_path}': {exc}")
+            with self._lock:
+                self._io_stats["events_dropped"] += events
+            return
+        with self._lock:
+            self._io_stats["appends"] += 1
+            self._io_stats["bytes_written"] += len(payload)
+
+    def _spill_is_empty(self) -> bool:
+        try:
+            st = os.stat(self._spill_filename, dir_fd=self._trusted_parent_fd, follow_symlinks=False)
+        except OSError:
+            return True
+        return st.st_size == 0
+
+    def _recover_spill(self) -> bool:
+        """Move the spill file's lines into the log; False when it could not be read."""
+        chunks: List[bytes] = []
+        try:
+            with self._spill_lock:
+                fd = os.open(self._spill_filename, os.O_RDWR | os.O_NOFOLLOW, dir_fd=self._trusted_parent_fd)
+                try:
+                    while True:
+                        chunk = os.read(fd, 1024 * 1024)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                    os.ftruncate(fd, 0)
+                finally:
+                    os.close(fd)
+        except FileNotFoundError:
+            return True
+        except OSError as exc:
+            # Give up on ordering rather than spin; the file is retried by the next writer.
+            _warn(f"failed to read spill file for '{self.events_path}': {exc}")
+            return False
+        data = b"".join(chunks)
+        if data:
+            self._write_from_writer(data, data.count(b"\n"))
+        return True
+
+    def flush(self, *, wait: bool = True) -> None:
+        """Write every buffered event in one locked append; a no-op when nothing is buffered.
+
+        The buffer is emptied before the write, so a failing disk loses at
+        most one batch instead of growing memory; the error is re-raised.
+        With the background writer this only wakes it, and with ``wait``
+        returns once everything queued so far has been written.
+        """
+        if self._writer is not None:
+            with self._cond:
+                self._cond.notify_all()
+                while wait and (self._queue or self._writing or self._spilling) and self._writer.is_alive():
+                    self._cond.wait(0.5)
+            return
+        with self._lock:
+            if not self._buffer:
+                return
+            events = len(self._buffer)
+            payload = b"".join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            try:
+                self._write(payload, events)
+            except Exception as exc:
+                _warn(f"failed to flush {events} buffered event(s) to '{self.events_path}': {exc}")
+                raise
+
     def close(self) -> None:
-        if self._trusted_parent_fd >= 0:
-            os.close(self._trusted_parent_fd)
-            self._trusted_parent_fd = -1
+        """Drain and stop the writer thread (if any), flush the buffer and release the directory fd."""
+        with self._cond:
+            writer = self._writer
+            self._closing = True
+            self._cond.notify_all()
+        if writer is not None:
+            writer.join()
+            with self._cond:
+                self._writer = None
+                leftover = list(self._queue)
+                self._queue.clear()
+            if leftover:
+                self._write_from_writer(b"".join(leftover), len(leftover))
+        try:
+            self.flush()
+        finally:
+            if self._trusted_parent_fd >= 0:
+                os.close(self._trusted_parent_fd)
+                self._trusted_parent_fd = -1
 
     def __del__(self) -> None:
         try:
@@ -206,11 +459,30 @@ class EventLogger:
             _warn(f"dropping unserializable event '{event_type}': {exc}")
             return
 
-        try:
-            self._append_with_retry((event_json + "\n").encode("utf-8"))
-        except Exception as exc:
-            _warn(f"failed to append event to '{self.events_path}': {exc}")
-            raise
+        line = (event_json + "\n").encode("utf-8")
+        with self._cond:
+            self._io_stats["events_logged"] += 1
+            if self._writer is not None and not self._closing:
+                self._enqueue_locked(line)
+                return
+            if not self.buffered:
+                try:
+                    self._write(line, 1)
+                except Exception as exc:
+                    _warn(f"failed to append event to '{self.events_path}': {exc}")
+                    raise
+                return
+            if not self._buffer:
+                self._buffer_started = time.monotonic()
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            due = (
+                len(self._buffer) >= self.buffer_events
+                or self._buffered_bytes >= self.buffer_bytes
+                or time.monotonic() - self._buffer_started >= self.buffer_max_age_sec
+            )
+        if due:
+            self.flush()
 
     def log_transition(
         self,
@@ -280,5 +552,24 @@ class EventLogger:
             },
         )
 
+    def log_lock_stats(self, lock: str, stats: Dict[str, Any], interval_sec: Optional[float] = None) -> None:
+        self.log(
+            "lock_stats",
+            details={
+                "lock": lock,
+                "interval_sec": interval_sec,
+                **stats,
+            },
+        )
+
 
-__all__ = ["EventLogger"]
+__all__ = [
+    "DEFAULT_BUFFER_BYTES",
+    "DEFAULT_BUFFER_MAX_AGE_SEC",
+    "DEFAULT_QUEUE_EVENTS",
+    "OVERFLOW_BLOCK",
+    "OVERFLOW_DROP_OLDEST",
+    "OVERFLOW_SPILL",
+    "VALID_OVERFLOW_POLICIES",
+    "EventLogger",
+]
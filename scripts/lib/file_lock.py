@@ -0,0 +1,234 @@
+"""Blocking ``flock`` waits with a timeout, plus per-lock contention stats.
+
+``flock`` has no timed variant, and polling ``LOCK_NB`` either burns wakeups
+or adds up to one poll interval of latency after the holder lets go.
+``FileLock.acquire`` tries ``LOCK_NB`` once and, if the lock is busy, parks a
+daemon helper thread in a blocking ``flock`` on a duplicate descriptor while
+the caller waits on a condition for at most ``timeout_sec``.  The kernel
+wakes the helper the moment the holder releases.  A helper that is still
+blocked when the caller gives up keeps waiting and drops the lock as soon
+as it gets it; the caller's descriptor is closed, so nothing is leaked but
+the thread itself until then.
+
+``LockStats`` aggregates wait time, hold time and contention per lock name;
+the orchestrator writes its periodic ``take_report`` to the event log.  With
+a ``MetricsRegistry`` it also feeds per-lock wait/hold histograms.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from .metrics import MetricsRegistry
+
+Number = Union[int, float]
+
+_REOPEN_ATTEMPTS = 3
+
+
+def _try_flock(fd: int, operation: int) -> bool:
+    try:
+        fcntl.flock(fd, operation | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _wait_flock(fd: int, operation: int, timeout_sec: float) -> Tuple[bool, bool]:
+    """``(acquired, contended)``.  On timeout ``fd`` must be closed, not retried:
+    an abandoned helper unlocks the shared open file description when it wins."""
+    if _try_flock(fd, operation):
+        return True, False
+    if timeout_sec <= 0:
+        return False, True
+
+    waiter_fd = os.dup(fd)
+    cond = threading.Condition()
+    outcome: Dict[str, object] = {"acquired": False, "abandoned": False, "error": None}
+
+    def wait() -> None:
+        try:
+            fcntl.flock(waiter_fd, operation)
+        except OSError as exc:
+            with cond:
+                outcome["error"] = exc
+                cond.notify_all()
+            os.close(waiter_fd)
+            return
+        with cond:
+            abandoned = bool(outcome["abandoned"])
+            if not abandoned:
+                outcome["acquired"] = True
+                cond.notify_all()
+        if abandoned:
+            fcntl.flock(waiter_fd, fcntl.LOCK_UN)
+        os.close(waiter_fd)
+
+    threading.Thread(target=wait, name="flock-wait", daemon=True).start()
+    with cond:
+        cond.wait_for(lambda: outcome["acquired"] or outcome["error"] is not None, timeout=timeout_sec)
+        if outcome["error"] is not None:
+            raise outcome["error"]  # type: ignore[misc]
+        if not outcome["acquired"]:
+            outcome["abandoned"] = True
+            return False, True
+    return True, True
+
+
+class LockStats:
+    """Thread-safe wait/hold/contention totals per lock name.
+
+    ``snapshot`` is cumulative for the process; ``take_report`` returns only
+    the names touched since the previous report and starts a new interval.
+    """
+
+    _FIELDS = ("acquired", "contended", "failed", "wait_ms_total", "wait_ms_max", "hold_ms_total", "hold_ms_max")
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None) -> None:
+        self._lock = threading.Lock()
+        self._metrics = metrics
+        self._totals: Dict[str, Dict[str, Number]] = {}
+        self._interval: Dict[str, Dict[str, Number]] = {}
+
+    def _entries(self, name: str):
+        for table in (self._totals, self._interval):
+            entry = table.get(name)
+            if entry is None:
+                entry = table[name] = {field: 0 for field in self._FIELDS}
+            yield entry
+
+    def record_acquire(self, name: str, wait_sec: float, *, acquired: bool, contended: bool) -> None:
+        wait_ms = round(max(0.0, wait_sec) * 1000.0, 3)
+        with self._lock:
+            for entry in self._entries(name):
+                entry["acquired" if acquired else "failed"] += 1
+                if contended:
+                    entry["contended"] += 1
+                entry["wait_ms_total"] = round(entry["wait_ms_total"] + wait_ms, 3)
+                entry["wait_ms_max"] = max(entry["wait_ms_max"], wait_ms)
+        if self._metrics is not None:
+            labels = {"lock": name}
+            self._metrics.observe("lock_wait_seconds", max(0.0, wait_sec), labels=labels)
+            if contended:
+                self._metrics.incr("lock_contended_total", labels=labels)
+            if not acquired:
+                self._metrics.incr("lock_timeouts_total", labels=labels)
+
+    def record_release(self, name: str, hold_sec: float) -> None:
+        hold_ms = round(max(0.0, hold_sec) * 1000.0, 3)
+        with self._lock:
+            for entry in self._entries(name):
+                entry["hold_ms_total"] = round(entry["hold_ms_total"] + hold_ms, 3)
+                entry["hold_ms_max"] = max(entry["hold_ms_max"], hold_ms)
+        if self._metrics is not None:
+            self._metrics.observe("lock_hold_seconds", max(0.0, hold_sec), labels={"lock": name})
+
+    def snapshot(self) -> Dict[str, Dict[str, Number]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._totals.items()}
+
+    def take_report(self) -> Dict[str, Dict[str, Number]]:
+        with self._lock:
+            report, self._interval = self._interval, {}
+        return report
+
+
+class FileLock:
+    """One ``flock``-ed file; a fresh descriptor per ``acquire``.
+
+    The file is left in place on release unless ``unlink=True``; a waiter
+    that locked a file unlinked under it notices the inode change and
+    reopens.
+    """
+
+    def __init__(self, path: str, *, name: Optional[str] = None, stats: Optional[LockStats] = None):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.stats = stats
+        self.fd: Optional[int] = None
+        self.waited_sec = 0.0
+        self._acquired_at = 0.0
+
+    @property
+    def held(self) -> bool:
+        return self.fd is not None
+
+    def acquire(self, timeout_sec: float = 0.0, *, shared: bool = False) -> bool:
+        if self.fd is not None:
+            raise RuntimeError(f"lock already held: {self.path}")
+        operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        start = time.monotonic()
+        deadline = start + max(0.0, timeout_sec)
+        acquired = contended = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        for _ in range(_REOPEN_ATTEMPTS):
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                acquired, waited = _wait_flock(fd, operation, deadline - time.monotonic())
+            except BaseException:
+                os.close(fd)
+                raise
+            contended = contended or waited
+            if acquired and self._same_file(fd):
+                self.fd = fd
+                break
+            os.close(fd)
+            if not acquired:
+                break
+            acquired = False
+        now = time.monotonic()
+        self.waited_sec = now - start
+        if self.stats is not None:
+            self.stats.record_acquire(self.name, self.waited_sec, acquired=acquired, contended=contended)
+        if acquired:
+            self._acquired_at = now
+        return acquired
+
+    def release(self, *, unlink: bool = False) -> None:
+        fd, self.fd = self.fd, None
+        if fd is None:
+            return
+        if self.stats is not None:
+            self.stats.record_release(self.name, time.monotonic() - self._acquired_at)
+        if unlink:
+            try:
+                if os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                    os.unlink(self.path)
+            except OSError:
+                pass
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError:
+            pass
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def _same_file(self, fd: int) -> bool:
+        try:
+            return os.fstat(fd).st_ino == os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return False
+
+
+def is_flock_held(path: str) -> bool:
+    """Whether some other open file description holds ``path`` locked."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        if not _try_flock(fd, fcntl.LOCK_SH):
+            return True
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+__all__ = ["FileLock", "LockStats", "is_flock_held"]
@@ -0,0 +1,213 @@
+"""Wait for changes inside a directory (inotify when available, stat polling otherwise).
+
+inotify is reached through ctypes so no third-party package is needed; on
+non-Linux hosts, or when the syscalls fail, ``DirectoryWatcher`` compares
+(size, mtime_ns) snapshots of the files in each directory instead.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+DEFAULT_EVENT_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+DEFAULT_POLL_INTERVAL_SEC = 0.2
+
+_LIBC: Optional[ctypes.CDLL] = None
+_LIBC_LOADED = False
+
+
+def _warn(message: str) -> None:
+    print(f"warning: fs_watch: {message}", file=sys.stderr)
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    global _LIBC, _LIBC_LOADED
+    if _LIBC_LOADED:
+        return _LIBC
+    _LIBC_LOADED = True
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_init1.restype = ctypes.c_int
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_add_watch.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        return None
+    _LIBC = libc
+    return libc
+
+
+def _snapshot(path: str) -> Dict[str, Tuple[int, int]]:
+    entries: Dict[str, Tuple[int, int]] = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                entries[entry.name] = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return entries
+
+
+class DirectoryWatcher:
+    """Block until something in the watched directories changes or the timeout expires."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        event_mask: int = DEFAULT_EVENT_MASK,
+        poll_interval_sec: float = DEFAULT_POLL_INTERVAL_SEC,
+        use_inotify: bool = True,
+    ):
+        self.paths: List[str] = []
+        self.event_mask = event_mask
+        self.poll_interval_sec = max(0.01, float(poll_interval_sec))
+        self._fd = self._open_inotify() if use_inotify else -1
+        self._last_snapshot: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self.add_path(path)
+
+    @staticmethod
+    def _open_inotify() -> int:
+        libc = _load_libc()
+        if libc is None:
+            return -1
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            _warn(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}; using polling")
+            return -1
+        return fd
+
+    def add_path(self, path: str) -> None:
+        """Also watch ``path`` (idempotent; the directory is created if missing)."""
+        if path in self.paths:
+            return
+        os.makedirs(path, exist_ok=True)
+        self.paths.append(path)
+        if self._fd >= 0:
+            libc = _load_libc()
+            wd = -1
+            if libc is not None:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(path), ctypes.c_uint32(self.event_mask))
+            if wd >= 0:
+                return
+            _warn(f"inotify_add_watch failed for '{path}': {os.strerror(ctypes.get_errno())}; using polling")
+            os.close(self._fd)
+            self._fd = -1
+        for watched in self.paths:
+            self._last_snapshot.setdefault(watched, _snapshot(watched))
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._fd >= 0
+
+    def fileno(self) -> int:
+        """The inotify descriptor for an external ``select`` (-1 when polling)."""
+        return self._fd
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                return
+
+    def wait(self, timeout_sec: float) -> bool:
+        """Return True as soon as a change is seen, False on timeout."""
+        timeout_sec = max(0.0, float(timeout_sec))
+        if self._fd >= 0:
+            try:
+                readable, _, _ = select.select([self._fd], [], [], timeout_sec)
+            except (OSError, ValueError):
+                readable = []
+            if readable:
+                self._drain()
+                return True
+            return False
+
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            current = {path: _snapshot(path) for path in self.paths}
+            if current != self._last_snapshot:
+                self._last_snapshot = current
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval_sec, remaining))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def wait_any(
+    watchers: Sequence[DirectoryWatcher],
+    timeout_sec: float,
+    *,
+    extra_fds: Iterable[int] = (),
+) -> Tuple[List[DirectoryWatcher], List[int]]:
+    """Block on many watchers (and other readable fds) at once.
+
+    Returns the watchers that saw a change and the ready ``extra_fds``; both
+    empty on timeout.  inotify watchers share one ``select``; polling
+    watchers are checked between short ``select`` slices.
+    """
+    extra = [fd for fd in extra_fds if fd >= 0]
+    by_fd = {watcher.fileno(): watcher for watcher in watchers if watcher.using_inotify}
+    polling = [watcher for watcher in watchers if not watcher.using_inotify]
+    deadline = time.monotonic() + max(0.0, float(timeout_sec))
+    while True:
+        remaining = max(0.0, deadline - time.monotonic())
+        if polling:
+            remaining = min(remaining, min(watcher.poll_interval_sec for watcher in polling))
+        try:
+            readable, _, _ = select.select(list(by_fd) + extra, [], [], remaining)
+        except (OSError, ValueError):
+            readable = []
+        changed = [by_fd[fd] for fd in readable if fd in by_fd]
+        for watcher in changed:
+            watcher._drain()
+        changed.extend(watcher for watcher in polling if watcher.wait(0))
+        ready = [fd for fd in readable if fd in extra]
+        if changed or ready or time.monotonic() >= deadline:
+            return changed, ready
+
+
+__all__ = ["DirectoryWatcher", "DEFAULT_EVENT_MASK", "DEFAULT_POLL_INTERVAL_SEC", "wait_any"]
@@ -0,0 +1,128 @@
+"""In-process counters, gauges and histograms for the orchestrator loop.
+
+Counters only ever grow for the lifetime of the process; gauges hold the
+latest observed value; histograms count observations into cumulative
+buckets.  Each metric may carry labels (``{"pane": "worker_001"}``); a
+labelled series is keyed as ``name{pane="worker_001"}``, the same form the
+Prometheus text export uses.  All are safe to update from worker threads.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+Number = Union[int, float]
+Labels = Optional[Mapping[str, str]]
+
+# Seconds: capture/save/action latencies run from sub-millisecond to minutes.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def series_key(name: str, labels: Labels = None) -> str:
+    """``name`` or ``name{k="v",...}`` with labels sorted by key."""
+    if not labels:
+        return name
+    body = ",".join(f'{key}="{_escape_label_value(str(value))}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{body}}}"
+
+
+def split_series_key(key: str) -> Tuple[str, str]:
+    """``(name, label_body)``; ``label_body`` is the text between the braces or empty."""
+    brace = key.find("{")
+    if brace < 0:
+        return key, ""
+    return key[:brace], key[brace + 1 : -1]
+
+
+class Histogram:
+    """Cumulative-bucket counts plus sum/count, as Prometheus histograms expose them."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """``[(upper_bound, observations <= bound), ...]`` without the ``+Inf`` bucket."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def copy(self) -> "Histogram":
+        clone = Histogram(self.buckets)
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.sum = self.sum
+        return clone
+
+
+class MetricsRegistry:
+    """Thread-safe series -> value store for counters, gauges and histograms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Number] = {}
+        self._gauges: Dict[str, Number] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def incr(self, name: str, amount: Number = 1, *, labels: Labels = None) -> None:
+        key = series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: Number, *, labels: Labels = None) -> None:
+        key = series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        *,
+        labels: Labels = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Add one observation; ``buckets`` only applies when the series is new."""
+        key = series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, *, labels: Labels = None) -> Number:
+        with self._lock:
+            return self._counters.get(series_key(name, labels), 0)
+
+    def counters(self) -> Dict[str, Number]:
+        with self._lock:
+            return dict(self._counters)
+
+    def gauges(self) -> Dict[str, Number]:
+        with self._lock:
+            return dict(self._gauges)
+
+    def histograms(self) -> Dict[str, Histogram]:
+        with self._lock:
+            return {key: histogram.copy() for key, histogram in self._histograms.items()}
+
+
+__all__ = ["DEFAULT_BUCKETS", "Histogram", "MetricsRegistry", "series_key", "split_series_key"]
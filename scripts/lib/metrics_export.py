@@ -0,0 +1,189 @@
+"""Prometheus text-format export of a ``MetricsRegistry``.
+
+Two surfaces, both optional: a file atomically rewritten once per cycle
+(for node_exporter's textfile collector or a plain ``cat``), and a local
+HTTP endpoint on a Unix socket that renders the live registry per request
+(``curl --unix-socket <path> http://localhost/metrics``).
+"""
+
+from __future__ import annotations
+
+import errno
+import math
+import os
+import re
+import socket
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import MetricsRegistry, split_series_key
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_PREFIX = "yb_"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+_INF_BUCKET = 'le="+Inf"'
+
+
+def _metric_name(prefix: str, name: str) -> str:
+    name = _INVALID_NAME_CHARS.sub("_", prefix + name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if bound != int(bound) else f"{int(bound)}.0"
+
+
+def _series(name: str, label_body: str, extra: str = "") -> str:
+    body = ",".join(part for part in (label_body, extra) if part)
+    return f"{name}{{{body}}}" if body else name
+
+
+def render_prometheus(metrics: MetricsRegistry, *, prefix: str = DEFAULT_PREFIX) -> str:
+    """Text exposition format 0.0.4, every metric name prefixed with ``prefix``."""
+    families: Dict[str, Tuple[str, List[str]]] = {}
+
+    def family(name: str, kind: str) -> List[str]:
+        entry = families.get(name)
+        if entry is None:
+            entry = families[name] = (kind, [])
+        return entry[1]
+
+    for key, value in sorted(metrics.counters().items()):
+        raw_name, labels = split_series_key(key)
+        name = _metric_name(prefix, raw_name)
+        family(name, "counter").append(f"{_series(name, labels)} {_format_value(value)}")
+    for key, value in sorted(metrics.gauges().items()):
+        raw_name, labels = split_series_key(key)
+        name = _metric_name(prefix, raw_name)
+        family(name, "gauge").append(f"{_series(name, labels)} {_format_value(value)}")
+    for key, histogram in sorted(metrics.histograms().items()):
+        raw_name, labels = split_series_key(key)
+        name = _metric_name(prefix, raw_name)
+        lines = family(name, "histogram")
+        for bound, count in histogram.cumulative():
+            le = f'le="{_format_bound(bound)}"'
+            lines.append(f"{_series(name + '_bucket', labels, le)} {count}")
+        lines.append(f"{_series(name + '_bucket', labels, _INF_BUCKET)} {histogram.count}")
+        lines.append(f"{_series(name + '_sum', labels)} {_format_value(histogram.sum)}")
+        lines.append(f"{_series(name + '_count', labels)} {histogram.count}")
+
+    out: List[str] = []
+    for name in sorted(families):
+        kind, lines = families[name]
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n" if out else ""
+
+
+def write_metrics_file(path: str, text: str) -> None:
+    """Replace ``path`` atomically so a scraper never reads a half-written file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".prom", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: "_MetricsServer"
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus(self.server.metrics, prefix=self.server.prefix).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return "unix"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+class _MetricsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, metrics: MetricsRegistry, prefix: str):
+        self.metrics = metrics
+        self.prefix = prefix
+        super().__init__(path, _MetricsHandler)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Unlink a socket left by a dead process; refuse to steal a live one."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError as exc:
+        if exc.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+            raise
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, f"metrics socket is in use: {path}")
+
+
+class MetricsEndpoint:
+    """HTTP ``GET /metrics`` on a Unix socket, served from a daemon thread."""
+
+    def __init__(self, path: str, metrics: MetricsRegistry, *, prefix: str = DEFAULT_PREFIX):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        _remove_stale_socket(path)
+        self._server = _MetricsServer(path, metrics, prefix)
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="yb-metrics-endpoint",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        thread.join()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+__all__ = ["CONTENT_TYPE", "MetricsEndpoint", "render_prometheus", "write_metrics_file"]
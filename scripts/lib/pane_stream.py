@@ -0,0 +1,149 @@
+"""Incremental reader for per-pane output streams written by ``tmux pipe-pane``.
+
+``yb start`` (with ``orchestrator.signal_source: pipe``) attaches
+``tmux pipe-pane -t <pane> 'cat >> <stream_dir>/<worker_id>.log'`` to every
+worker pane.  ``PaneStreamReader`` remembers a byte offset per file, reads
+only what was appended since the last call, strips terminal control
+sequences, and keeps a bounded window of recent lines per pane so the signal
+extractor sees the same kind of text a ``capture-pane`` tail would give,
+without the 50-line scroll limit between polls.  Waiting for new bytes is
+left to ``fs_watch.DirectoryWatcher`` on the stream directory.
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import re
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Mapping
+
+STREAM_SUFFIX = ".log"
+STREAM_WINDOW_LINES = 200
+STREAM_SEED_BYTES = 64 * 1024
+STREAM_READ_MAX_BYTES = 4 * 1024 * 1024
+STREAM_ROTATE_BYTES = 8 * 1024 * 1024
+
+_ANSI_ESCAPE = re.compile(
+    r"\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"  # OSC ... BEL / ST
+    r"|\x1b\[[0-?]*[ -/]*[@-~]"  # CSI
+    r"|\x1b[@-Z\\-_]"  # two-byte escapes
+)
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+
+
+def strip_terminal_controls(text: str) -> str:
+    """Remove ANSI escape sequences and non-printing controls (keeps \\n and \\t)."""
+    return _CONTROL_CHARS.sub("", _ANSI_ESCAPE.sub("", text))
+
+
+def stream_path(stream_dir: str, worker_id: str) -> str:
+    return os.path.join(stream_dir, f"{worker_id}{STREAM_SUFFIX}")
+
+
+@dataclass(frozen=True)
+class PaneStreamUpdate:
+    worker_id: str
+    pane_id: str
+    text: str
+    bytes_read: int
+
+
+class _PaneStreamState:
+    __slots__ = ("offset", "inode", "partial", "lines")
+
+    def __init__(self) -> None:
+        self.offset = -1
+        self.inode = 0
+        self.partial = ""
+        self.lines: Deque[str] = collections.deque(maxlen=STREAM_WINDOW_LINES)
+
+
+class PaneStreamReader:
+    """Track append-only pane stream files and return only panes with new output."""
+
+    def __init__(self, stream_dir: str):
+        self.stream_dir = stream_dir
+        os.makedirs(stream_dir, exist_ok=True)
+        self._states: Dict[str, _PaneStreamState] = {}
+
+    def _read_new_bytes(self, path: str, state: _PaneStreamState) -> bytes:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return b""
+
+        if state.offset < 0 or st.st_ino != state.inode:
+            state.inode = st.st_ino
+            state.offset = max(0, st.st_size - STREAM_SEED_BYTES) if state.offset < 0 else 0
+            state.partial = ""
+        elif st.st_size < state.offset:
+            state.offset = 0
+            state.partial = ""
+
+        if st.st_size == state.offset:
+            return b""
+
+        to_read = min(st.st_size - state.offset, STREAM_READ_MAX_BYTES)
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(state.offset)
+                data = fh.read(to_read)
+        except OSError:
+            return b""
+        state.offset += len(data)
+
+        if state.offset >= STREAM_ROTATE_BYTES:
+            try:
+                if os.stat(path).st_size == state.offset:
+                    os.truncate(path, 0)
+                    state.offset = 0
+            except OSError:
+                pass
+        return data
+
+    def missing_streams(self, workers: Mapping[str, object]) -> List[str]:
+        """Worker ids whose stream file does not exist (``pipe-pane`` was never attached)."""
+        return [
+            str(worker_id)
+            for worker_id in sorted(workers.keys())
+            if not os.path.exists(stream_path(self.stream_dir, str(worker_id)))
+        ]
+
+    def read_updates(self, workers: Mapping[str, object]) -> List[PaneStreamUpdate]:
+        updates: List[PaneStreamUpdate] = []
+        for worker_id in sorted(workers.keys()):
+            pane_id = str(workers.get(worker_id) or "").strip()
+            if not pane_id:
+                continue
+            state = self._states.setdefault(str(worker_id), _PaneStreamState())
+            data = self._read_new_bytes(stream_path(self.stream_dir, str(worker_id)), state)
+            if not data:
+                continue
+
+            text = state.partial + strip_terminal_controls(data.decode("utf-8", errors="replace"))
+            pieces = text.split("\n")
+            state.partial = pieces.pop()
+            state.lines.extend(pieces)
+
+            window = list(state.lines)
+            if state.partial:
+                window.append(state.partial)
+            updates.append(
+                PaneStreamUpdate(
+                    worker_id=str(worker_id),
+                    pane_id=pane_id,
+                    text="\n".join(window),
+                    bytes_read=len(data),
+                )
+            )
+        return updates
+
+
+__all__ = [
+    "PaneStreamReader",
+    "PaneStreamUpdate",
+    "STREAM_SUFFIX",
+    "strip_terminal_controls",
+    "stream_path",
+]
@@ -0,0 +1,40 @@
+"""Adaptive wait between orchestrator cycles.
+
+Any activity in a cycle (changed pane output, actions submitted, running or
+finished, collects pending) snaps the interval to ``min_sec``.  Quiet cycles
+double it, up to ``active_max_sec`` while some task is still in a working
+phase and up to ``max_sec`` once nothing is in flight at all.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+
+class AdaptivePollInterval:
+    def __init__(
+        self,
+        min_sec: float,
+        max_sec: float,
+        *,
+        active_max_sec: Optional[float] = None,
+        factor: float = 2.0,
+    ):
+        self.min_sec = max(0.01, float(min_sec))
+        self.max_sec = max(self.min_sec, float(max_sec))
+        active_max = self.max_sec if active_max_sec is None else float(active_max_sec)
+        self.active_max_sec = min(self.max_sec, max(self.min_sec, active_max))
+        self.factor = max(1.0, float(factor))
+        self.interval = self.min_sec
+
+    def update(self, *, activity: bool, active_tasks: bool) -> float:
+        """Record one cycle's outcome and return the wait before the next one."""
+        if activity:
+            self.interval = self.min_sec
+        else:
+            ceiling = self.active_max_sec if active_tasks else self.max_sec
+            self.interval = min(ceiling, self.interval * self.factor)
+        return self.interval
+
+
+__all__ = ["AdaptivePollInterval"]
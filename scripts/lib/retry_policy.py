@@ -0,0 +1,49 @@
+"""Exponential backoff with jitter for orchestrator action retries.
+
+The orchestrator never sleeps between attempts: a failed action is parked in
+``state["pendingRetries"]`` with a due time from ``RetryPolicy.due_at`` and
+resubmitted by a later loop iteration once that time has passed.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Optional
+
+
+class RetryPolicy:
+    """Attempt ``n`` (1-based) waits ``min(max, base * 2**(n-1))`` plus up to ``jitter`` of that."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 4,
+        base_delay_sec: float = 1.0,
+        max_delay_sec: float = 60.0,
+        jitter: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay_sec = max(0.0, float(base_delay_sec))
+        self.max_delay_sec = max(self.base_delay_sec, float(max_delay_sec))
+        self.jitter = min(max(0.0, float(jitter)), 1.0)
+        self._rng = rng or random.Random()
+
+    def should_retry(self, attempt: int) -> bool:
+        """True when another attempt is allowed after ``attempt`` failed."""
+        return attempt < self.max_attempts
+
+    def delay_for(self, attempt: int) -> float:
+        exponent = min(max(attempt, 1) - 1, 30)
+        delay = min(self.max_delay_sec, self.base_delay_sec * (2 ** exponent))
+        if self.jitter:
+            delay += delay * self.jitter * self._rng.random()
+        return min(delay, self.max_delay_sec)
+
+    def due_at(self, attempt: int, *, now: Optional[float] = None) -> float:
+        """Wall-clock epoch seconds (it is persisted across restarts) for the next attempt."""
+        return (time.time() if now is None else now) + self.delay_for(attempt)
+
+
+__all__ = ["RetryPolicy"]
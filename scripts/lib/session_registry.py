@@ -0,0 +1,190 @@
+"""Sessions served by the orchestrator supervisor (``yb_orchestrator.py --supervise``).
+
+One JSON file per session under ``<root>/sessions``; registering or
+unregistering is an atomic file write/unlink, so any process can add a
+crew while the supervisor runs.  The registering process holds an ``flock``
+on its entry for as long as it lives; ``entries`` removes entries nobody
+holds, so a killed or crashed owner (or a reboot) does not leave a session
+behind.  The supervisor rescans the directory when its ``signature``
+changes and periodically to notice owners that went away.  ``root`` defaults to ``$YB_SUPERVISOR_DIR`` or
+``~/.yamibaito/supervisor``.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+SUPERVISOR_DIR_ENV = "YB_SUPERVISOR_DIR"
+SESSIONS_DIRNAME = "sessions"
+SUPERVISOR_LOCK_FILENAME = "supervisor.lock"
+SUPERVISOR_LOG_FILENAME = "supervisor.log"
+
+_UNSAFE_KEY_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _warn(message: str) -> None:
+    print(f"warning: session_registry: {message}", file=sys.stderr)
+
+
+def default_registry_dir() -> str:
+    return os.environ.get(SUPERVISOR_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".yamibaito", "supervisor")
+
+
+@dataclass(frozen=True)
+class SessionSpec:
+    repo_root: str
+    session_id: str = ""
+    mode: str = ""
+    state_dir: str = ""
+    poll_interval_sec: Optional[int] = None
+    signal_source: str = ""
+
+    @property
+    def key(self) -> str:
+        """Stable file name: readable repo/session plus a hash of the full repo path."""
+        digest = hashlib.sha1(os.path.abspath(self.repo_root).encode("utf-8")).hexdigest()[:8]
+        name = _UNSAFE_KEY_CHARS.sub("_", os.path.basename(os.path.abspath(self.repo_root))) or "repo"
+        session = _UNSAFE_KEY_CHARS.sub("_", self.session_id)
+        return f"{name}_{digest}_{session}" if session else f"{name}_{digest}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "SessionSpec":
+        if not isinstance(data, dict) or not isinstance(data.get("repo_root"), str) or not data["repo_root"]:
+            raise ValueError("session entry needs a repo_root")
+        poll_interval = data.get("poll_interval_sec")
+        return cls(
+            repo_root=data["repo_root"],
+            session_id=str(data.get("session_id") or ""),
+            mode=str(data.get("mode") or ""),
+            state_dir=str(data.get("state_dir") or ""),
+            poll_interval_sec=int(poll_interval) if isinstance(poll_interval, (int, float)) else None,
+            signal_source=str(data.get("signal_source") or ""),
+        )
+
+
+class SessionRegistry:
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or default_registry_dir())
+        self.sessions_dir = os.path.join(self.root, SESSIONS_DIRNAME)
+        self.lock_path = os.path.join(self.root, SUPERVISOR_LOCK_FILENAME)
+        self.log_path = os.path.join(self.root, SUPERVISOR_LOG_FILENAME)
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        # key -> locked fd of the entry this process registered.
+        self._owned: Dict[str, int] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.sessions_dir, f"{key}.json")
+
+    def register(self, spec: SessionSpec) -> str:
+        """Write ``spec``'s entry and keep it locked until ``unregister`` or process exit."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.sessions_dir)
+        try:
+            # Locked before it becomes visible, so the supervisor never sees it unowned.
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            with os.fdopen(fd, "w", encoding="utf-8", closefd=False) as fh:
+                json.dump(spec.to_dict(), fh, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path(spec.key))
+        except BaseException:
+            os.close(fd)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._release(spec.key)
+        self._owned[spec.key] = fd
+        return spec.key
+
+    def unregister(self, key: str) -> bool:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            return False
+        finally:
+            self._release(key)
+        return True
+
+    def owns(self, key: str) -> bool:
+        """Whether the entry for ``key`` is still the one this process registered."""
+        fd = self._owned.get(key)
+        if fd is None:
+            return False
+        try:
+            return os.fstat(fd).st_ino == os.stat(self._path(key)).st_ino
+        except OSError:
+            return False
+
+    def close(self) -> None:
+        """Drop the locks on entries this process registered (they become stale, not removed)."""
+        for key in list(self._owned):
+            self._release(key)
+
+    def _release(self, key: str) -> None:
+        fd = self._owned.pop(key, None)
+        if fd is not None:
+            os.close(fd)
+
+    def _remove_if_unowned(self, path: str) -> bool:
+        """Unlink ``path`` if no live process holds it; True when it was removed."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                if os.fstat(fd).st_ino != os.stat(path).st_ino:
+                    return False
+            except FileNotFoundError:
+                return False
+            os.unlink(path)
+            return True
+        finally:
+            os.close(fd)
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """Changes whenever an entry is added, replaced or removed."""
+        try:
+            st = os.stat(self.sessions_dir)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def entries(self) -> Dict[str, SessionSpec]:
+        specs: Dict[str, SessionSpec] = {}
+        try:
+            names = sorted(os.listdir(self.sessions_dir))
+        except OSError:
+            return specs
+        for name in names:
+            if not name.endswith(".json") or name.startswith("."):
+                continue
+            path = os.path.join(self.sessions_dir, name)
+            if self._remove_if_unowned(path):
+                _warn(f"removed session entry '{path}': its registering process is gone")
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    spec = SessionSpec.from_dict(json.load(fh))
+            except (OSError, ValueError) as exc:
+                _warn(f"ignoring session entry '{path}': {exc}")
+                continue
+            specs[name[: -len(".json")]] = spec
+        return specs
+
+
+__all__ = ["SessionRegistry", "SessionSpec", "default_registry_dir"]
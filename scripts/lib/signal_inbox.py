@@ -0,0 +1,170 @@
+"""File-drop inbox for structured orchestrator signals.
+
+Producers (agents, ``yb signal``) write one JSON object per file into
+``<queue_dir>/signals/`` using ``drop_signal`` (temp file + rename, so the
+orchestrator never sees a half-written file).  The orchestrator lists
+pending files in arrival order and, once the state they produced has been
+saved, moves them to ``signals/processed/`` (a file that is not a JSON object
+goes to ``signals/failed/`` right away).  ``prune_processed`` keeps the
+archive bounded.
+
+Usage from scripts under ORCH_ROOT:
+    sys.path.insert(0, os.path.join(ORCH_ROOT, "scripts"))
+    from lib.signal_inbox import drop_signal
+    drop_signal(os.path.join(queue_dir, "signals"), {"mission": "completed", ...})
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+INBOX_DIRNAME = "signals"
+PROCESSED_DIRNAME = "processed"
+FAILED_DIRNAME = "failed"
+SIGNAL_SUFFIX = ".json"
+PROCESSED_MAX_AGE_SEC = 24 * 60 * 60
+PROCESSED_MAX_FILES = 1000
+
+
+def _warn(message: str) -> None:
+    print(f"warning: signal_inbox: {message}", file=sys.stderr)
+
+
+def inbox_dir_for_queue(queue_dir: str) -> str:
+    return os.path.join(queue_dir, INBOX_DIRNAME)
+
+
+def drop_signal(inbox_dir: str, payload: Dict[str, Any]) -> str:
+    """Atomically write ``payload`` into the inbox and return the final path."""
+    if not isinstance(payload, dict):
+        raise ValueError("signal payload must be a JSON object")
+    os.makedirs(inbox_dir, exist_ok=True)
+
+    name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}{SIGNAL_SUFFIX}"
+    final_path = os.path.join(inbox_dir, name)
+    tmp_path = ""
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=inbox_dir,
+            prefix=".tmp-",
+            suffix=".part",
+            delete=False,
+        ) as fh:
+            tmp_path = fh.name
+            json.dump(payload, fh, ensure_ascii=False, separators=(",", ":"))
+            fh.write("\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, final_path)
+    except Exception:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        raise
+    return final_path
+
+
+class SignalInbox:
+    """Consume signal files from ``inbox_dir`` in arrival order."""
+
+    def __init__(self, inbox_dir: str):
+        self.inbox_dir = inbox_dir
+        self.processed_dir = os.path.join(inbox_dir, PROCESSED_DIRNAME)
+        self.failed_dir = os.path.join(inbox_dir, FAILED_DIRNAME)
+        os.makedirs(self.processed_dir, exist_ok=True)
+        os.makedirs(self.failed_dir, exist_ok=True)
+
+    def pending(self) -> List[str]:
+        entries: List[Tuple[int, str, str]] = []
+        try:
+            with os.scandir(self.inbox_dir) as it:
+                for entry in it:
+                    if entry.name.startswith(".") or not entry.name.endswith(SIGNAL_SUFFIX):
+                        continue
+                    try:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        mtime_ns = entry.stat(follow_symlinks=False).st_mtime_ns
+                    except OSError:
+                        continue
+                    entries.append((mtime_ns, entry.name, entry.path))
+        except FileNotFoundError:
+            return []
+        entries.sort()
+        return [path for _, _, path in entries]
+
+    @staticmethod
+    def read(path: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            return None, str(exc)
+        if not isinstance(payload, dict):
+            return None, "signal file is not a JSON object"
+        return payload, ""
+
+    def archive(self, path: str, *, ok: bool = True) -> str:
+        """Move a consumed signal file out of the inbox; returns the new path ("" on failure)."""
+        target_dir = self.processed_dir if ok else self.failed_dir
+        target = os.path.join(target_dir, os.path.basename(path))
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            return ""
+        except OSError as exc:
+            _warn(f"failed to archive signal file '{path}': {exc}")
+            return ""
+        return target
+
+    def prune_processed(
+        self,
+        *,
+        max_age_sec: float = PROCESSED_MAX_AGE_SEC,
+        max_files: int = PROCESSED_MAX_FILES,
+        now: Optional[float] = None,
+    ) -> int:
+        """Delete archived signals older than ``max_age_sec`` or beyond the newest ``max_files``."""
+        now = time.time() if now is None else now
+        entries: List[Tuple[float, str]] = []
+        try:
+            with os.scandir(self.processed_dir) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            entries.append((entry.stat(follow_symlinks=False).st_mtime, entry.path))
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            return 0
+        entries.sort(reverse=True)
+        removed = 0
+        for index, (mtime, path) in enumerate(entries):
+            if index < max_files and now - mtime <= max_age_sec:
+                continue
+            try:
+                os.unlink(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                _warn(f"failed to prune signal file '{path}': {exc}")
+        return removed
+
+
+__all__ = [
+    "INBOX_DIRNAME",
+    "SignalInbox",
+    "drop_signal",
+    "inbox_dir_for_queue",
+]
@@ -4,13 +4,21 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict, List, Optional, Tuple
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 _COMMON_REQUIRED_KEYS = ("mission", "task_id", "role")
 _ALLOWED_MISSIONS = {"completed", "error"}
 _ALLOWED_ROLES = {"planner", "architect", "implementer", "reviewer", "quality-gate"}
 _ALLOWED_REVIEW_DECISIONS = {"approve", "rework"}
 
+SIGNAL_SENTINEL = "YB_SIGNAL"
+SIGNAL_SCAN_TAIL_CHARS = 64 * 1024
+_SCAN_CHUNK_CHARS = 2048
+
+_SCAN_TOKENS = re.compile(r'[{}"\n]')
+_JSON_DECODER = json.JSONDecoder()
+
 
 def _to_text(value: Any) -> str:
     if value is None:
@@ -90,11 +98,117 @@ def _extract_json_object_from_text(text: str) -> Optional[dict]:
     return None
 
 
+def _is_escaped_quote(text: str, quote_idx: int) -> bool:
+    backslashes = 0
+    idx = quote_idx - 1
+    while idx >= 0 and text[idx] == "\\":
+        backslashes += 1
+        idx -= 1
+    return backslashes % 2 == 1
+
+
+def _extract_sentinel_object(text: str) -> Optional[dict]:
+    """Parse the last ``YB_SIGNAL {...}`` line, if any."""
+    search_end = len(text)
+    while True:
+        marker_idx = text.rfind(SIGNAL_SENTINEL, 0, search_end)
+        if marker_idx < 0:
+            return None
+        search_end = marker_idx
+        line_start = text.rfind("\n", 0, marker_idx) + 1
+        if text[line_start:marker_idx].strip():
+            continue
+        brace_idx = marker_idx + len(SIGNAL_SENTINEL)
+        while brace_idx < len(text) and text[brace_idx] in " \t:":
+            brace_idx += 1
+        if brace_idx >= len(text) or text[brace_idx] != "{":
+            continue
+        try:
+            parsed, _ = _JSON_DECODER.raw_decode(text, brace_idx)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+
+
+def _iter_tokens_reversed(text: str, window_start: int) -> Iterator[Tuple[int, str]]:
+    chunk_end = len(text)
+    while chunk_end > window_start:
+        chunk_start = max(window_start, chunk_end - _SCAN_CHUNK_CHARS)
+        tokens = [(m.start(), m.group()) for m in _SCAN_TOKENS.finditer(text, chunk_start, chunk_end)]
+        yield from reversed(tokens)
+        chunk_end = chunk_start
+
+
+def _extract_json_object_reverse(text: str, tail_chars: int = SIGNAL_SCAN_TAIL_CHARS) -> Optional[dict]:
+    """Scan brace/quote tokens backwards from the tail; stop at the first object that parses.
+
+    Only the last ``tail_chars`` characters are considered.  Top-level ranges are
+    found by depth counting from the end, so an unbalanced ``{`` earlier in the
+    pane (e.g. a truncated code diff) no longer hides a trailing signal.  A stray
+    ``"`` or ``}`` after the object (prompt or TUI text) leaves the backwards scan
+    unresolved; the window is then re-scanned forwards.
+    """
+    window_start = max(0, len(text) - tail_chars)
+    depth = 0
+    end_idx = -1
+    in_string = False
+    found: Optional[dict] = None
+    for idx, ch in _iter_tokens_reversed(text, window_start):
+        if ch == "\n":
+            if in_string:
+                # JSON strings never span lines, so the quote parity on this line is off.
+                break
+            if found is not None:
+                return found
+            continue
+        if ch == '"':
+            if _is_escaped_quote(text, idx):
+                continue
+            in_string = not in_string
+            continue
+        if in_string or found is not None:
+            continue
+
+        if ch == "}":
+            if depth == 0:
+                end_idx = idx
+            depth += 1
+            continue
+
+        if depth == 0:
+            continue
+        depth -= 1
+        if depth:
+            continue
+        try:
+            parsed = json.loads(text[idx : end_idx + 1])
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            # Trusted once the rest of its line shows balanced quotes.
+            found = parsed
+    else:
+        if not in_string:
+            if found is not None or depth == 0:
+                return found
+
+    return _extract_json_object_from_text(text[window_start:])
+
+
 def extract_last_json_object(text: str) -> Optional[dict]:
-    """Extract the latest JSON object from the trailing pane text."""
+    """Extract the latest JSON object from the trailing pane text.
+
+    A line of the form ``YB_SIGNAL {...}`` takes precedence over bare JSON;
+    otherwise the tail is scanned backwards for the last top-level object.
+    """
     if not isinstance(text, str) or not text.strip():
         return None
-    return _extract_json_object_from_text(text)
+    if SIGNAL_SENTINEL in text:
+        parsed = _extract_sentinel_object(text)
+        if parsed is not None:
+            return parsed
+    return _extract_json_object_reverse(text)
 
 
 def _require_status(signal_dict: Dict[str, Any], expected: str, role: str, mission: str, errors: List[str]) -> None:
@@ -250,6 +364,7 @@ def compute_sig_hash(signal_dict: dict, raw_json: str = "") -> str:
 
 
 __all__ = [
+    "SIGNAL_SENTINEL",
     "extract_last_json_object",
     "validate_signal",
     "normalize_timestamp",
@@ -0,0 +1,59 @@
+"""Bounded FIFO of processed signal hashes with O(1) membership and eviction.
+
+``StateManager`` keeps ``state["processedSignals"]`` as a ``SignalRing``: a
+``deque`` for arrival order plus a hash -> count index for lookups.  It
+iterates, compares and serializes (via ``to_list``) exactly like the bounded
+list it replaces, so the on-disk format is unchanged.
+"""
+
+from __future__ import annotations
+
+import collections
+from typing import Any, Deque, Dict, Iterable, Iterator, List
+
+
+class SignalRing:
+    __slots__ = ("maxlen", "_order", "_index")
+
+    def __init__(self, items: Iterable[str] = (), *, maxlen: int):
+        self.maxlen = max(1, int(maxlen))
+        self._order: Deque[str] = collections.deque()
+        self._index: Dict[str, int] = {}
+        for item in items:
+            self.append(item)
+
+    def append(self, sig_hash: str) -> None:
+        self._order.append(sig_hash)
+        self._index[sig_hash] = self._index.get(sig_hash, 0) + 1
+        while len(self._order) > self.maxlen:
+            evicted = self._order.popleft()
+            remaining = self._index[evicted] - 1
+            if remaining:
+                self._index[evicted] = remaining
+            else:
+                del self._index[evicted]
+
+    def to_list(self) -> List[str]:
+        return list(self._order)
+
+    def __contains__(self, sig_hash: object) -> bool:
+        return sig_hash in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SignalRing):
+            return self._order == other._order
+        if isinstance(other, (list, tuple)):
+            return list(self._order) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SignalRing({list(self._order)!r}, maxlen={self.maxlen})"
+
+
+__all__ = ["SignalRing"]
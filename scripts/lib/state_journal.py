@@ -0,0 +1,164 @@
+"""Append-only mutation journal backing ``StateManager(backend="journal")``.
+
+Each line is one JSON record with a monotonically increasing ``seq``.  A
+batch of records is written with a single ``write`` + ``fsync`` (group
+commit).  Compaction rotates the live journal to ``<path>.old`` so new
+records keep appending while a snapshot is written; once the snapshot is
+durable the rotated file is deleted.  A torn last line (crash or failed
+write mid-append) is terminated before the next batch, so it stays the
+only record lost.  Readers replay ``.old`` then the live
+file and skip records already covered by the snapshot's ``journal_seq``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ROTATED_SUFFIX = ".old"
+
+
+def _warn(message: str) -> None:
+    print(f"warning: state_journal: {message}", file=sys.stderr)
+
+
+def _fsync_dir(path: str) -> None:
+    flags = os.O_RDONLY
+    if hasattr(os, "O_DIRECTORY"):
+        flags |= os.O_DIRECTORY
+    dir_fd = os.open(path, flags)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _stat_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _ends_with_newline(fd: int) -> bool:
+    size = os.fstat(fd).st_size
+    return size == 0 or os.pread(fd, 1, size - 1) == b"\n"
+
+
+class StateJournal:
+    """Group-committed JSONL journal with rotate/discard support for compaction."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = path + ROTATED_SUFFIX
+        self._fd = -1
+        # False until the open file is known to end on a record boundary.
+        self._tail_clean = False
+
+    def _open(self) -> int:
+        if self._fd < 0:
+            created = not os.path.exists(self.path)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+            if created:
+                _fsync_dir(os.path.dirname(self.path) or ".")
+        return self._fd
+
+    def append(self, lines: Iterable[str]) -> int:
+        """Append pre-serialized records with one write and one fsync; returns bytes written."""
+        payload = "".join(f"{line}\n" for line in lines).encode("utf-8")
+        if not payload:
+            return 0
+        fd = self._open()
+        if not self._tail_clean and not _ends_with_newline(fd):
+            payload = b"\n" + payload
+        self._tail_clean = False
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            if written <= 0:
+                raise OSError("short write while appending state journal")
+            view = view[written:]
+        os.fsync(fd)
+        self._tail_clean = True
+        return len(payload)
+
+    def read_records(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    lines = fh.readlines()
+            except FileNotFoundError:
+                continue
+            except (OSError, UnicodeDecodeError) as exc:
+                _warn(f"failed to read journal '{path}': {exc}")
+                continue
+            for lineno, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn tail from a crash mid-append is expected; anything else is worth a note.
+                    if lineno != len(lines):
+                        _warn(f"skipping corrupt journal record {path}:{lineno}")
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+        return records
+
+    def rotate(self) -> None:
+        """Move the live journal aside so a snapshot can be written without blocking appends."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        if os.path.exists(self.rotated_path):
+            # A previous compaction failed before discarding; keep both generations in order.
+            with open(self.path, "rb") as src, open(self.rotated_path, "ab+") as dst:
+                if not _ends_with_newline(dst.fileno()):
+                    dst.write(b"\n")
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.unlink(self.path)
+            return
+        os.replace(self.path, self.rotated_path)
+
+    def discard_rotated(self) -> None:
+        try:
+            os.unlink(self.rotated_path)
+        except FileNotFoundError:
+            pass
+
+    def reset(self) -> None:
+        """Drop both generations (the caller has just written a complete snapshot)."""
+        self.close()
+        for path in (self.rotated_path, self.path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def signature(self) -> Tuple[Optional[Tuple[int, int, int]], Optional[Tuple[int, int, int]]]:
+        return (_stat_signature(self.rotated_path), _stat_signature(self.path))
+
+    def size_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+        self._tail_clean = False
+
+
+__all__ = ["StateJournal"]
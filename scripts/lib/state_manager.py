@@ -5,16 +5,24 @@ from __future__ import annotations
 import copy
 import json
 import os
+import sys
+import threading
 import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-try:
-    import fcntl
-except ImportError:  # pragma: no cover - non-POSIX fallback
-    fcntl = None
+from .file_lock import FileLock, LockStats, is_flock_held
+from .signal_ring import SignalRing
+from .state_journal import StateJournal
+from .state_sqlite import SqliteStateStore
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, SignalRing):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 @dataclass(frozen=True)
@@ -30,24 +38,85 @@ class LockAcquireResult:
 
 
 class StateManager:
-    """Manage orchestrator-state.json load/save and in-memory mutations."""
+    """Manage orchestrator-state.json load/save and in-memory mutations.
+
+    Mutating helpers bump an in-memory revision; ``save`` only rewrites the file
+    when that revision moved since the last load/save (or the file vanished).
+    Callers that edit ``state`` directly must call ``mark_dirty``.
+
+    With ``backend="journal"`` each mutation is also serialized as a small
+    record; ``save`` appends the cycle's records to ``orchestrator-state.journal``
+    with one fsync, and the full JSON file becomes a periodic snapshot written
+    by a background compaction thread.  ``load`` is snapshot + journal replay.
+
+    With ``backend="sqlite"`` the same records are applied as one transaction
+    to ``orchestrator-state.sqlite3`` (WAL mode, indexed tables); ``load`` only
+    re-reads when another connection committed.  An existing JSON state (and
+    journal) is migrated into an empty database on first open.
+    """
 
     STATE_FILENAME = "orchestrator-state.json"
+    JOURNAL_FILENAME = "orchestrator-state.journal"
+    SQLITE_FILENAME = "orchestrator-state.sqlite3"
+    MIGRATED_SUFFIX = ".migrated"
     LOCKS_DIRNAME = "orchestrator-locks"
     DEFAULT_LOCK_TIMEOUT_SEC = 0.0
-    DEFAULT_STALE_LOCK_TIMEOUT_SEC = 300.0
-    DEFAULT_LOCK_POLL_INTERVAL_SEC = 0.1
 
-    def __init__(self, state_dir: str, max_signals: int = 2000):
+    BACKEND_JSON = "json"
+    BACKEND_JOURNAL = "journal"
+    BACKEND_SQLITE = "sqlite"
+    VALID_BACKENDS = (BACKEND_JSON, BACKEND_JOURNAL, BACKEND_SQLITE)
+    JOURNAL_COMPACT_RECORDS = 2000
+    JOURNAL_COMPACT_BYTES = 1024 * 1024
+    JOURNAL_SEQ_KEY = "journal_seq"
+    _META_KEYS = ("schema_version", "mode", "poll_interval_sec", "version", "locks")
+
+    def __init__(
+        self,
+        state_dir: str,
+        max_signals: int = 2000,
+        backend: str = BACKEND_JSON,
+        lock_stats: Optional[LockStats] = None,
+    ):
+        if backend not in self.VALID_BACKENDS:
+            raise ValueError(f"unknown state backend: {backend}")
         self.state_dir = state_dir
         self.state_path = os.path.join(state_dir, self.STATE_FILENAME)
         self.locks_dir = os.path.join(state_dir, self.LOCKS_DIRNAME)
         self.max_signals = max(1, int(max_signals))
+        self.backend = backend
         self._state: Dict[str, Any] = self.get_default_state()
-        self._held_lock_tokens: Dict[str, str] = {}
+        self._held_locks: Dict[str, FileLock] = {}
+        self.lock_stats = lock_stats
+        self._revision = 0
+        self._saved_revision = 0
+        self._file_signature: Optional[Any] = None
+        self._io_stats: Dict[str, int] = {
+            "loads_read": 0,
+            "loads_skipped": 0,
+            "saves_written": 0,
+            "saves_skipped": 0,
+            "bytes_written": 0,
+            "fsyncs": 0,
+            "records_written": 0,
+            "compactions": 0,
+        }
+        self._journal: Optional[StateJournal] = None
+        self._journal_seq = 0
+        self._journal_records_since_compact = 0
+        self._pending_records: List[Dict[str, Any]] = []
+        self._meta_dirty = False
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+        self._store: Optional[SqliteStateStore] = None
+        if backend == self.BACKEND_JOURNAL:
+            self._journal = StateJournal(os.path.join(state_dir, self.JOURNAL_FILENAME))
 
         os.makedirs(self.state_dir, exist_ok=True)
         os.makedirs(self.locks_dir, exist_ok=True)
+        if backend == self.BACKEND_SQLITE:
+            self._store = SqliteStateStore(os.path.join(state_dir, self.SQLITE_FILENAME))
+            self._migrate_into_sqlite()
         self.load()
 
     @classmethod
@@ -59,6 +128,7 @@ class StateManager:
             "lastTimestampByTaskPane": {},
             "processedSignals": [],
             "taskState": {},
+            "pendingRetries": {},
             "locks": {
                 "dispatch": False,
                 "collect": False,
@@ -75,10 +145,16 @@ class StateManager:
 
         if not isinstance(normalized.get("lastTimestampByTaskPane"), dict):
             normalized["lastTimestampByTaskPane"] = {}
-        if not isinstance(normalized.get("processedSignals"), list):
-            normalized["processedSignals"] = []
+        processed = normalized.get("processedSignals")
+        if isinstance(processed, SignalRing):
+            processed = processed.to_list()
+        if not isinstance(processed, list):
+            processed = []
+        normalized["processedSignals"] = SignalRing(processed, maxlen=self.max_signals)
         if not isinstance(normalized.get("taskState"), dict):
             normalized["taskState"] = {}
+        if not isinstance(normalized.get("pendingRetries"), dict):
+            normalized["pendingRetries"] = {}
 
         locks = normalized.get("locks")
         if not isinstance(locks, dict):
@@ -90,6 +166,35 @@ class StateManager:
 
         return normalized
 
+    def mark_dirty(self) -> None:
+        self._revision += 1
+        self._meta_dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._revision != self._saved_revision
+
+    @property
+    def io_stats(self) -> Dict[str, int]:
+        """Cumulative load/save counters (bytes written, fsyncs, skipped saves)."""
+        return dict(self._io_stats)
+
+    def _stat_signature(self) -> Optional[Any]:
+        if self._store is not None:
+            return ("sqlite", self._store.data_version())
+        try:
+            st = os.stat(self.state_path)
+        except OSError:
+            snapshot_sig = None
+        else:
+            snapshot_sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._journal is None:
+            return snapshot_sig
+        journal_sig = self._journal.signature()
+        if snapshot_sig is None and journal_sig == (None, None):
+            return None
+        return (snapshot_sig, journal_sig)
+
     def _get_locks_table(self) -> Dict[str, bool]:
         locks = self._state.get("locks")
         if not isinstance(locks, dict):
@@ -102,14 +207,20 @@ class StateManager:
 
     def _set_lock_state(self, lock_name: str, is_locked: bool) -> None:
         locks = self._get_locks_table()
-        locks[lock_name] = bool(is_locked)
+        if locks.get(lock_name) is not bool(is_locked):
+            locks[lock_name] = bool(is_locked)
+            self.mark_dirty()
 
     def _sync_lock_states_from_runtime(self) -> None:
         os.makedirs(self.locks_dir, exist_ok=True)
         locks = self._get_locks_table()
         keys = [str(key) for key in locks.keys()]
         for key in keys:
-            locks[key] = os.path.exists(self._lock_path(key))
+            self._set_lock_state(key, self._lock_is_held(key))
+
+    def _lock_is_held(self, lock_name: str) -> bool:
+        # A lock file outlives a crashed owner; only a live flock counts.
+        return lock_name in self._held_locks or is_flock_held(self._lock_path(lock_name))
 
     def _coerce_non_negative_float(self, value: Any, default: float) -> float:
         try:
@@ -118,39 +229,6 @@ class StateManager:
             return max(0.0, default)
         return parsed if parsed >= 0.0 else 0.0
 
-    @staticmethod
-    def _write_all(fd: int, payload: bytes) -> None:
-        view = memoryview(payload)
-        while view:
-            written = os.write(fd, view)
-            if written <= 0:
-                raise OSError("short write while creating lock file")
-            view = view[written:]
-
-    def _create_lock_file(self, lock_path: str, payload: Dict[str, Any]) -> None:
-        lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
-        payload_bytes = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
-        try:
-            self._write_all(lock_fd, payload_bytes)
-            os.fsync(lock_fd)
-        except Exception:
-            try:
-                os.close(lock_fd)
-            except OSError:
-                pass
-            try:
-                os.unlink(lock_path)
-            except FileNotFoundError:
-                pass
-            except OSError:
-                pass
-            raise
-        else:
-            try:
-                os.close(lock_fd)
-            except OSError:
-                pass
-
     @staticmethod
     def _parse_lock_payload(lock_path: str) -> Optional[Dict[str, Any]]:
         try:
@@ -162,17 +240,6 @@ class StateManager:
             return None
         return payload
 
-    @staticmethod
-    def _lock_age_sec(lock_path: str, payload: Optional[Dict[str, Any]]) -> Optional[float]:
-        if isinstance(payload, dict):
-            epoch = payload.get("acquired_at_epoch")
-            if isinstance(epoch, (int, float)):
-                return max(0.0, time.time() - float(epoch))
-        try:
-            return max(0.0, time.time() - os.path.getmtime(lock_path))
-        except OSError:
-            return None
-
     @staticmethod
     def _pid_is_alive(pid: int) -> bool:
         if pid <= 0:
@@ -187,117 +254,62 @@ class StateManager:
             return False
         return True
 
-    @staticmethod
-    def _try_acquire_cleanup_guard(lock_fd: int) -> bool:
-        if fcntl is None:
-            return True
-        try:
-            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        except BlockingIOError:
-            return False
-        except OSError:
-            return False
-        return True
-
-    def _is_stale_lock(
-        self,
-        lock_path: str,
-        payload: Optional[Dict[str, Any]],
-        *,
-        stale_timeout_sec: float,
-    ) -> bool:
-        owner_pid: Optional[int] = None
-        if isinstance(payload, dict):
-            owner_pid_raw = payload.get("owner_pid")
-            if isinstance(owner_pid_raw, int):
-                owner_pid = owner_pid_raw
-
-        if owner_pid is not None and owner_pid > 0 and not self._pid_is_alive(owner_pid):
-            return True
-
-        if stale_timeout_sec <= 0.0:
-            return False
-
-        age = self._lock_age_sec(lock_path, payload)
-        if age is None or age < stale_timeout_sec or age < 1.0:
-            return False
-
-        if owner_pid is None or owner_pid <= 0:
-            return True
-        return not self._pid_is_alive(owner_pid)
-
-    def _cleanup_stale_lock(self, lock_path: str, *, stale_timeout_sec: float) -> bool:
-        try:
-            lock_fd = os.open(lock_path, os.O_RDONLY)
-        except FileNotFoundError:
-            return True
-        except OSError:
-            return False
-
+    def _read_snapshot(self) -> Tuple[Any, bool]:
+        if not os.path.exists(self.state_path):
+            return self.get_default_state(), False
         try:
-            if not self._try_acquire_cleanup_guard(lock_fd):
-                return False
-
-            try:
-                stale_inode = os.fstat(lock_fd).st_ino
-            except OSError:
-                return False
-
-            payload = self._parse_lock_payload(lock_path)
-            if not self._is_stale_lock(lock_path, payload, stale_timeout_sec=stale_timeout_sec):
-                return False
-
-            stale_token = payload.get("token") if isinstance(payload, dict) else None
-            current_payload = self._parse_lock_payload(lock_path)
-            current_token = (
-                current_payload.get("token") if isinstance(current_payload, dict) else None
-            )
-
-            try:
-                current_inode = os.stat(lock_path).st_ino
-            except FileNotFoundError:
-                return True
-            except OSError:
-                return False
-
-            if current_inode != stale_inode:
-                return False
-            if stale_token is not None and current_token != stale_token:
-                return False
-
-            try:
-                os.unlink(lock_path)
-            except FileNotFoundError:
-                return True
-            except OSError:
-                return False
-            return True
-        finally:
-            try:
-                os.close(lock_fd)
-            except OSError:
-                pass
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f), True
+        except (OSError, json.JSONDecodeError):
+            return self.get_default_state(), False
 
     def load(self) -> Dict[str, Any]:
-        if os.path.exists(self.state_path):
-            try:
-                with open(self.state_path, "r", encoding="utf-8") as f:
-                    loaded = json.load(f)
-            except (OSError, json.JSONDecodeError):
-                loaded = self.get_default_state()
-        else:
-            loaded = self.get_default_state()
-
+        """Reload from disk; skipped when clean and the file is unchanged since the last load/save."""
+        self._reap_compaction()
+        signature = self._stat_signature()
+        if signature is not None and signature == self._file_signature and not self.dirty:
+            self._io_stats["loads_skipped"] += 1
+            self._sync_lock_states_from_runtime()
+            return self._state
+
+        if self._store is not None:
+            return self._load_from_sqlite(signature)
+
+        loaded, snapshot_ok = self._read_snapshot()
+        self._io_stats["loads_read"] += 1
         self._state = self._normalize_state(loaded)
+        self._pending_records = []
+        self._meta_dirty = False
+
+        replayed = False
+        if self._journal is not None:
+            snapshot_seq = self._state.pop(self.JOURNAL_SEQ_KEY, 0)
+            if not isinstance(snapshot_seq, int) or snapshot_seq < 0:
+                snapshot_seq = 0
+            self._journal_seq = snapshot_seq
+            self._journal_records_since_compact = 0
+            for record in self._journal.read_records():
+                seq = record.get("seq")
+                if not isinstance(seq, int) or seq <= snapshot_seq:
+                    continue
+                self._apply_record(record)
+                self._journal_seq = max(self._journal_seq, seq)
+                self._journal_records_since_compact += 1
+                replayed = True
+
+        self._file_signature = signature if (snapshot_ok or replayed) else None
+        self._saved_revision = self._revision
+        if self._file_signature is None:
+            # Nothing valid on disk yet: the defaults still need one write.
+            self.mark_dirty()
         self._sync_lock_states_from_runtime()
         return self._state
 
-    def save(self) -> None:
-        os.makedirs(self.state_dir, exist_ok=True)
-        os.makedirs(self.locks_dir, exist_ok=True)
-        self._sync_lock_states_from_runtime()
+    def _write_snapshot(self, state: Dict[str, Any]) -> int:
+        """Atomically replace the JSON file with ``state``; returns bytes written (2 fsyncs)."""
         tmp_path = ""
         replaced = False
+        bytes_written = 0
 
         try:
             import tempfile
@@ -311,9 +323,10 @@ class StateManager:
                 delete=False,
             ) as f:
                 tmp_path = f.name
-                json.dump(self._state, f, indent=2, ensure_ascii=False)
+                json.dump(state, f, indent=2, ensure_ascii=False, default=_json_default)
                 f.write("\n")
                 f.flush()
+                bytes_written = f.tell()
                 os.fsync(f.fileno())
 
             os.replace(tmp_path, self.state_path)
@@ -337,23 +350,262 @@ class StateManager:
                 except OSError:
                     pass
             raise
+        return bytes_written
 
-    def is_duplicate_signal(self, sig_hash: str) -> bool:
-        processed = self._state.get("processedSignals")
-        if not isinstance(processed, list):
+    def save(self, *, force: bool = False) -> bool:
+        """Persist the state if it changed; returns True when anything was written.
+
+        ``force`` rewrites the full JSON file (and, for the journal backend,
+        folds the journal into it synchronously).
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        os.makedirs(self.locks_dir, exist_ok=True)
+        self._reap_compaction()
+        self._sync_lock_states_from_runtime()
+        if not force and not self.dirty and self._stat_signature() == self._file_signature:
+            self._io_stats["saves_skipped"] += 1
             return False
-        return sig_hash in processed
 
-    def add_processed_signal(self, sig_hash: str) -> None:
+        if self._store is not None:
+            self._flush_sqlite(force=force)
+        elif self._journal is not None:
+            if force:
+                self._compact(background=False)
+            else:
+                self._flush_journal()
+        else:
+            try:
+                bytes_written = self._write_snapshot(self._state)
+            except Exception:
+                self._file_signature = self._stat_signature()
+                raise
+            self._io_stats["bytes_written"] += bytes_written
+            self._io_stats["fsyncs"] += 2
+
+        self._file_signature = self._stat_signature()
+        self._saved_revision = self._revision
+        self._io_stats["saves_written"] += 1
+        return True
+
+    def close(self) -> None:
+        """Wait for an in-flight compaction and release journal/database handles."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        self._reap_compaction()
+        if self._journal is not None:
+            self._journal.close()
+        if self._store is not None:
+            self._store.close()
+
+    # -- journal backend -------------------------------------------------
+
+    def _commit(self, record: Dict[str, Any]) -> None:
+        self._apply_record(record)
+        self._revision += 1
+        if self._journal is not None:
+            self._journal_seq += 1
+            record["seq"] = self._journal_seq
+        if self._journal is not None or self._store is not None:
+            self._pending_records.append(record)
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "add_processed_signal":
+            self._processed_ring().append(record.get("sig_hash"))
+        elif op == "update_timestamp":
+            table = self._state.get("lastTimestampByTaskPane")
+            if not isinstance(table, dict):
+                table = {}
+                self._state["lastTimestampByTaskPane"] = table
+            table[str(record.get("key"))] = record.get("ts_ms")
+        elif op == "set_task_state":
+            task_state = self._state.get("taskState")
+            if not isinstance(task_state, dict):
+                task_state = {}
+                self._state["taskState"] = task_state
+            entry = record.get("entry")
+            if isinstance(entry, dict):
+                task_state[str(record.get("task_id"))] = entry
+        elif op == "remove_task_state":
+            task_state = self._state.get("taskState")
+            if isinstance(task_state, dict):
+                task_state.pop(str(record.get("task_id")), None)
+        elif op == "set_meta":
+            values = record.get("values")
+            if isinstance(values, dict):
+                self._state.update(values)
+
+    def _take_pending_records(self) -> List[Dict[str, Any]]:
+        if self._meta_dirty:
+            self._meta_dirty = False
+            self._commit(
+                {
+                    "op": "set_meta",
+                    "values": {key: self._state[key] for key in self._META_KEYS if key in self._state},
+                }
+            )
+        records = self._pending_records
+        self._pending_records = []
+        return records
+
+    def _flush_journal(self) -> None:
+        journal = self._journal
+        assert journal is not None
+        records = self._take_pending_records()
+        if not records:
+            return
+        try:
+            bytes_written = journal.append(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")) for record in records
+            )
+        except Exception:
+            self._pending_records = records + self._pending_records
+            raise
+        self._io_stats["bytes_written"] += bytes_written
+        self._io_stats["fsyncs"] += 1
+        self._io_stats["records_written"] += len(records)
+        self._journal_records_since_compact += len(records)
+        if (
+            self._journal_records_since_compact >= self.JOURNAL_COMPACT_RECORDS
+            or journal.size_bytes() >= self.JOURNAL_COMPACT_BYTES
+        ):
+            self._compact(background=True)
+
+    # -- sqlite backend --------------------------------------------------
+
+    def _migrate_into_sqlite(self) -> None:
+        store = self._store
+        assert store is not None
+        journal = StateJournal(os.path.join(self.state_dir, self.JOURNAL_FILENAME))
+        has_legacy = os.path.exists(self.state_path) or journal.signature() != (None, None)
+        if not has_legacy or not store.is_empty():
+            return
+
+        loaded, _ = self._read_snapshot()
+        self._state = self._normalize_state(loaded)
+        snapshot_seq = self._state.pop(self.JOURNAL_SEQ_KEY, 0)
+        if not isinstance(snapshot_seq, int):
+            snapshot_seq = 0
+        for record in journal.read_records():
+            seq = record.get("seq")
+            if isinstance(seq, int) and seq > snapshot_seq:
+                self._apply_record(record)
+
+        store.replace_all(self._state, max_signals=self.max_signals)
+        for path in (self.state_path, journal.rotated_path, journal.path):
+            if os.path.exists(path):
+                os.replace(path, path + self.MIGRATED_SUFFIX)
+        print(
+            f"info: state_manager: migrated {self.state_path} into {store.path}",
+            file=sys.stderr,
+        )
+
+    def _load_from_sqlite(self, signature: Any) -> Dict[str, Any]:
+        store = self._store
+        assert store is not None
+        empty = store.is_empty()
+        self._io_stats["loads_read"] += 1
+        self._state = self._normalize_state(store.load_state())
+        self._pending_records = []
+        self._meta_dirty = False
+        self._file_signature = signature
+        self._saved_revision = self._revision
+        if empty:
+            self.mark_dirty()
+        self._sync_lock_states_from_runtime()
+        return self._state
+
+    def _flush_sqlite(self, *, force: bool) -> None:
+        store = self._store
+        assert store is not None
+        records = self._take_pending_records()
+        if force:
+            store.replace_all(self._state, max_signals=self.max_signals)
+        elif records:
+            try:
+                store.apply(records, max_signals=self.max_signals)
+            except Exception:
+                self._pending_records = records + self._pending_records
+                raise
+        else:
+            return
+        # Logical payload size; SQLite's own page/WAL overhead is not visible here.
+        payload = self._state if force else records
+        self._io_stats["bytes_written"] += len(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+        )
+        self._io_stats["fsyncs"] += 1
+        self._io_stats["records_written"] += len(records)
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        snapshot = copy.deepcopy(self._state)
+        snapshot[self.JOURNAL_SEQ_KEY] = self._journal_seq
+        return snapshot
+
+    def _compact(self, *, background: bool) -> None:
+        journal = self._journal
+        assert journal is not None
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+            self._reap_compaction()
+
+        if not background:
+            self._meta_dirty = False
+            self._pending_records = []
+            self._io_stats["bytes_written"] += self._write_snapshot(self._snapshot_state())
+            self._io_stats["fsyncs"] += 2
+            self._io_stats["compactions"] += 1
+            journal.reset()
+            self._journal_records_since_compact = 0
+            return
+
+        journal.rotate()
+        snapshot = self._snapshot_state()
+        self._journal_records_since_compact = 0
+
+        def _run() -> None:
+            try:
+                written = self._write_snapshot(snapshot)
+                journal.discard_rotated()
+            except BaseException as exc:  # surfaced by _reap_compaction on the owning thread
+                self._compaction_error = exc
+                return
+            self._io_stats["bytes_written"] += written
+            self._io_stats["fsyncs"] += 2
+            self._io_stats["compactions"] += 1
+
+        self._compaction_thread = threading.Thread(target=_run, name="yb-state-compact", daemon=True)
+        self._compaction_thread.start()
+
+    def _reap_compaction(self) -> None:
+        thread = self._compaction_thread
+        if thread is None or thread.is_alive():
+            return
+        self._compaction_thread = None
+        error = self._compaction_error
+        self._compaction_error = None
+        if error is not None:
+            # The rotated journal is kept, so replay still covers everything.
+            print(f"warning: state_manager: journal compaction failed: {error}", file=sys.stderr)
+        if not self.dirty:
+            self._file_signature = self._stat_signature()
+
+    # -- mutations -------------------------------------------------------
+
+    def _processed_ring(self) -> SignalRing:
         processed = self._state.get("processedSignals")
-        if not isinstance(processed, list):
-            processed = []
+        if not isinstance(processed, SignalRing):
+            processed = SignalRing(processed if isinstance(processed, list) else [], maxlen=self.max_signals)
             self._state["processedSignals"] = processed
+        return processed
 
-        processed.append(sig_hash)
-        overflow = len(processed) - self.max_signals
-        if overflow > 0:
-            del processed[:overflow]
+    def is_duplicate_signal(self, sig_hash: str) -> bool:
+        return sig_hash in self._processed_ring()
+
+    def add_processed_signal(self, sig_hash: str) -> None:
+        self._commit({"op": "add_processed_signal", "sig_hash": sig_hash})
 
     def check_timestamp_guard(self, task_pane_key: str, ts_ms: int) -> bool:
         table = self._state.get("lastTimestampByTaskPane")
@@ -368,10 +620,9 @@ class StateManager:
 
     def update_timestamp(self, task_pane_key: str, ts_ms: int) -> None:
         table = self._state.get("lastTimestampByTaskPane")
-        if not isinstance(table, dict):
-            table = {}
-            self._state["lastTimestampByTaskPane"] = table
-        table[task_pane_key] = ts_ms
+        if isinstance(table, dict) and task_pane_key in table and table.get(task_pane_key) == ts_ms:
+            return
+        self._commit({"op": "update_timestamp", "key": task_pane_key, "ts_ms": ts_ms})
 
     def get_task_state(self, task_id: str) -> Optional[Dict[str, Any]]:
         task_state = self._state.get("taskState")
@@ -393,12 +644,7 @@ class StateManager:
         assigned_worker: str,
         **extra: Any,
     ) -> None:
-        task_state = self._state.get("taskState")
-        if not isinstance(task_state, dict):
-            task_state = {}
-            self._state["taskState"] = task_state
-
-        current = task_state.get(task_id)
+        current = self.get_task_state(task_id)
         next_state: Dict[str, Any] = copy.deepcopy(current) if isinstance(current, dict) else {}
         next_state.update(
             {
@@ -411,27 +657,48 @@ class StateManager:
         if extra:
             next_state.update(extra)
 
-        task_state[task_id] = next_state
+        self._commit({"op": "set_task_state", "task_id": task_id, "entry": next_state})
 
     def remove_task_state(self, task_id: str) -> None:
         task_state = self._state.get("taskState")
-        if not isinstance(task_state, dict):
+        if not isinstance(task_state, dict) or task_id not in task_state:
             return
-        task_state.pop(task_id, None)
+        self._commit({"op": "remove_task_state", "task_id": task_id})
+
+    def get_pending_retries(self) -> Dict[str, Dict[str, Any]]:
+        retries = self._state.get("pendingRetries")
+        return retries if isinstance(retries, dict) else {}
+
+    def set_pending_retry(self, retry_id: str, entry: Dict[str, Any]) -> None:
+        retries = dict(self.get_pending_retries())
+        retries[str(retry_id)] = copy.deepcopy(entry)
+        # The table stays small, so it is persisted whole as a top-level value.
+        self._commit({"op": "set_meta", "values": {"pendingRetries": retries}})
+
+    def remove_pending_retry(self, retry_id: str) -> None:
+        retries = self.get_pending_retries()
+        if str(retry_id) not in retries:
+            return
+        remaining = {key: value for key, value in retries.items() if key != str(retry_id)}
+        self._commit({"op": "set_meta", "values": {"pendingRetries": remaining}})
 
     def acquire_lock(
         self,
         lock_name: str,
         *,
         timeout_sec: float = DEFAULT_LOCK_TIMEOUT_SEC,
-        stale_timeout_sec: float = DEFAULT_STALE_LOCK_TIMEOUT_SEC,
-        poll_interval_sec: float = DEFAULT_LOCK_POLL_INTERVAL_SEC,
     ) -> LockAcquireResult:
+        """``flock`` the named lock file, blocking up to ``timeout_sec`` (0 = try once).
+
+        The kernel drops the lock with its owner, so a crashed holder never
+        needs age-based stale cleanup; ``stale_recovered`` reports that the
+        payload left in the file names an owner that is no longer alive.
+        """
         lock_name = str(lock_name)
         os.makedirs(self.locks_dir, exist_ok=True)
         lock_path = self._lock_path(lock_name)
 
-        if lock_name in self._held_lock_tokens:
+        if lock_name in self._held_locks:
             return LockAcquireResult(
                 acquired=False,
                 reason="already_held",
@@ -441,79 +708,52 @@ class StateManager:
             )
 
         timeout_sec = self._coerce_non_negative_float(timeout_sec, self.DEFAULT_LOCK_TIMEOUT_SEC)
-        stale_timeout_sec = self._coerce_non_negative_float(
-            stale_timeout_sec,
-            self.DEFAULT_STALE_LOCK_TIMEOUT_SEC,
+        lock = FileLock(lock_path, name=f"state:{lock_name}", stats=self.lock_stats)
+        if not lock.acquire(timeout_sec):
+            self._set_lock_state(lock_name, True)
+            return LockAcquireResult(
+                acquired=False,
+                reason="timeout" if timeout_sec > 0.0 else "busy",
+                lock_path=lock_path,
+                waited_sec=lock.waited_sec,
+                stale_recovered=False,
+            )
+
+        previous = self._parse_lock_payload(lock_path)
+        previous_pid = previous.get("owner_pid") if isinstance(previous, dict) else None
+        stale_recovered = (
+            isinstance(previous_pid, int) and previous_pid != os.getpid() and not self._pid_is_alive(previous_pid)
         )
-        poll_interval_sec = max(
-            0.01,
-            self._coerce_non_negative_float(poll_interval_sec, self.DEFAULT_LOCK_POLL_INTERVAL_SEC),
+        payload = {
+            "schema_version": 1,
+            "lock_name": lock_name,
+            "owner_pid": os.getpid(),
+            "token": uuid.uuid4().hex,
+            "acquired_at": datetime.now(timezone.utc).isoformat(),
+            "acquired_at_epoch": time.time(),
+        }
+        try:
+            os.ftruncate(lock.fd, 0)
+            os.pwrite(lock.fd, (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"), 0)
+        except OSError:
+            lock.release(unlink=True)
+            raise
+        self._held_locks[lock_name] = lock
+        self._set_lock_state(lock_name, True)
+        return LockAcquireResult(
+            acquired=True,
+            reason="acquired_after_stale_recovery" if stale_recovered else "acquired",
+            lock_path=lock_path,
+            waited_sec=lock.waited_sec,
+            stale_recovered=stale_recovered,
         )
 
-        start = time.monotonic()
-        deadline = start + timeout_sec
-        stale_recovered = False
-
-        while True:
-            token = uuid.uuid4().hex
-            payload = {
-                "schema_version": 1,
-                "lock_name": lock_name,
-                "owner_pid": os.getpid(),
-                "token": token,
-                "acquired_at": datetime.now(timezone.utc).isoformat(),
-                "acquired_at_epoch": time.time(),
-            }
-
-            try:
-                self._create_lock_file(lock_path, payload)
-                self._held_lock_tokens[lock_name] = token
-                self._set_lock_state(lock_name, True)
-                reason = "acquired_after_stale_recovery" if stale_recovered else "acquired"
-                return LockAcquireResult(
-                    acquired=True,
-                    reason=reason,
-                    lock_path=lock_path,
-                    waited_sec=time.monotonic() - start,
-                    stale_recovered=stale_recovered,
-                )
-            except FileExistsError:
-                if self._cleanup_stale_lock(lock_path, stale_timeout_sec=stale_timeout_sec):
-                    stale_recovered = True
-                    continue
-
-                now = time.monotonic()
-                if now >= deadline:
-                    self._set_lock_state(lock_name, os.path.exists(lock_path))
-                    reason = "timeout" if timeout_sec > 0.0 else "busy"
-                    return LockAcquireResult(
-                        acquired=False,
-                        reason=reason,
-                        lock_path=lock_path,
-                        waited_sec=now - start,
-                        stale_recovered=stale_recovered,
-                    )
-                time.sleep(poll_interval_sec)
-
     def release_lock(self, lock_name: str) -> None:
         lock_name = str(lock_name)
-        lock_path = self._lock_path(lock_name)
-        token = self._held_lock_tokens.pop(lock_name, None)
-
-        if token is not None:
-            payload = self._parse_lock_payload(lock_path)
-            payload_token = payload.get("token") if isinstance(payload, dict) else None
-            payload_pid = payload.get("owner_pid") if isinstance(payload, dict) else None
-
-            if payload_token == token and payload_pid == os.getpid():
-                try:
-                    os.unlink(lock_path)
-                except FileNotFoundError:
-                    pass
-                except OSError:
-                    pass
-
-        self._set_lock_state(lock_name, os.path.exists(lock_path))
+        lock = self._held_locks.pop(lock_name, None)
+        if lock is not None:
+            lock.release(unlink=True)
+        self._set_lock_state(lock_name, self._lock_is_held(lock_name))
 
     @property
     def state(self) -> Dict[str, Any]:
@@ -0,0 +1,197 @@
+"""SQLite (WAL) persistence backing ``StateManager(backend="sqlite")``.
+
+State lives in indexed tables instead of one JSON document:
+
+- ``meta``:              top-level scalars (mode, poll interval, lock flags, ...)
+- ``task_state``:        one row per task id (entry stored as JSON)
+- ``processed_signals``: bounded FIFO of signal hashes, indexed by hash
+- ``task_pane_ts``:      last accepted timestamp per ``task_id:pane_id``
+
+``StateManager`` hands over the same mutation records the journal backend
+uses; ``apply`` turns one batch into one transaction.  Other processes
+(collect, dashboards, CLIs) can read concurrently thanks to WAL, and
+``data_version`` tells the owner whether anyone else committed since its
+last look.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List
+
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS task_state (task_id TEXT PRIMARY KEY, entry TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS processed_signals (seq INTEGER PRIMARY KEY AUTOINCREMENT, sig_hash TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS processed_signals_hash ON processed_signals (sig_hash)",
+    "CREATE TABLE IF NOT EXISTS task_pane_ts (task_pane_key TEXT PRIMARY KEY, ts_ms INTEGER NOT NULL)",
+)
+
+_STRUCTURED_KEYS = ("taskState", "processedSignals", "lastTimestampByTaskPane")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class SqliteStateStore:
+    """One WAL-mode connection; every ``apply``/``replace_all`` is a single transaction."""
+
+    def __init__(self, path: str, *, read_only: bool = False):
+        self.path = path
+        if read_only:
+            uri = f"file:{path}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, isolation_level=None, timeout=BUSY_TIMEOUT_MS / 1000)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, isolation_level=None, timeout=BUSY_TIMEOUT_MS / 1000)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('store_schema_version', ?)",
+                (_dumps(SCHEMA_VERSION),),
+            )
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits (not for our own commits)."""
+        return int(self._conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def is_empty(self) -> bool:
+        row = self._conn.execute("SELECT COUNT(*) FROM meta WHERE key != 'store_schema_version'").fetchone()
+        if row[0]:
+            return False
+        for table in ("task_state", "processed_signals", "task_pane_ts"):
+            if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def load_state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        for key, value in self._conn.execute("SELECT key, value FROM meta WHERE key != 'store_schema_version'"):
+            try:
+                state[key] = json.loads(value)
+            except json.JSONDecodeError:
+                continue
+
+        task_state: Dict[str, Any] = {}
+        for task_id, entry in self._conn.execute("SELECT task_id, entry FROM task_state"):
+            try:
+                task_state[task_id] = json.loads(entry)
+            except json.JSONDecodeError:
+                continue
+        state["taskState"] = task_state
+        state["processedSignals"] = [
+            row[0] for row in self._conn.execute("SELECT sig_hash FROM processed_signals ORDER BY seq")
+        ]
+        state["lastTimestampByTaskPane"] = dict(
+            self._conn.execute("SELECT task_pane_key, ts_ms FROM task_pane_ts").fetchall()
+        )
+        return state
+
+    def has_signal(self, sig_hash: str) -> bool:
+        return (
+            self._conn.execute("SELECT 1 FROM processed_signals WHERE sig_hash = ? LIMIT 1", (sig_hash,)).fetchone()
+            is not None
+        )
+
+    def _apply_one(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "add_processed_signal":
+            self._conn.execute("INSERT INTO processed_signals (sig_hash) VALUES (?)", (record.get("sig_hash"),))
+        elif op == "update_timestamp":
+            self._conn.execute(
+                "INSERT INTO task_pane_ts (task_pane_key, ts_ms) VALUES (?, ?) "
+                "ON CONFLICT(task_pane_key) DO UPDATE SET ts_ms = excluded.ts_ms",
+                (str(record.get("key")), record.get("ts_ms")),
+            )
+        elif op == "set_task_state":
+            self._conn.execute(
+                "INSERT INTO task_state (task_id, entry) VALUES (?, ?) "
+                "ON CONFLICT(task_id) DO UPDATE SET entry = excluded.entry",
+                (str(record.get("task_id")), _dumps(record.get("entry"))),
+            )
+        elif op == "remove_task_state":
+            self._conn.execute("DELETE FROM task_state WHERE task_id = ?", (str(record.get("task_id")),))
+        elif op == "set_meta":
+            values = record.get("values")
+            if isinstance(values, dict):
+                self._conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    [(str(key), _dumps(value)) for key, value in values.items()],
+                )
+
+    def _trim_signals(self, max_signals: int) -> None:
+        self._conn.execute(
+            "DELETE FROM processed_signals WHERE seq <= "
+            "(SELECT seq FROM processed_signals ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+            (max(1, int(max_signals)),),
+        )
+
+    def apply(self, records: Iterable[Dict[str, Any]], *, max_signals: int) -> int:
+        """Apply mutation records in one transaction; returns the number applied."""
+        count = 0
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            trim = False
+            for record in records:
+                self._apply_one(record)
+                trim = trim or record.get("op") == "add_processed_signal"
+                count += 1
+            if trim:
+                self._trim_signals(max_signals)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def replace_all(self, state: Dict[str, Any], *, max_signals: int) -> None:
+        """Overwrite every table with ``state`` (migration and forced saves)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM meta WHERE key != 'store_schema_version'")
+            self._conn.execute("DELETE FROM task_state")
+            self._conn.execute("DELETE FROM processed_signals")
+            self._conn.execute("DELETE FROM task_pane_ts")
+            records: List[Dict[str, Any]] = [
+                {
+                    "op": "set_meta",
+                    "values": {key: value for key, value in state.items() if key not in _STRUCTURED_KEYS},
+                }
+            ]
+            records.extend(
+                {"op": "set_task_state", "task_id": task_id, "entry": entry}
+                for task_id, entry in (state.get("taskState") or {}).items()
+            )
+            records.extend(
+                {"op": "add_processed_signal", "sig_hash": sig_hash}
+                for sig_hash in (state.get("processedSignals") or [])
+            )
+            records.extend(
+                {"op": "update_timestamp", "key": key, "ts_ms": ts_ms}
+                for key, ts_ms in (state.get("lastTimestampByTaskPane") or {}).items()
+            )
+            for record in records:
+                self._apply_one(record)
+            self._trim_signals(max_signals)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
+
+
+__all__ = ["SqliteStateStore"]
@@ -0,0 +1,121 @@
+"""Cached task_id / parent_cmd_id index over ``<queue_dir>/tasks/*.yaml`` headers.
+
+Every refresh is one ``scandir`` plus a ``stat`` per file; a header is only
+re-parsed when the file's (inode, size, mtime_ns) changed, or while its
+mtime is too recent to trust (a same-tick rewrite can keep size and mtime).
+The YAML header parser is injected so the orchestrator keeps owning the
+task-file format.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+HeaderReader = Callable[[str], Dict[str, Any]]
+
+# Files modified within this window are re-parsed on every refresh.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+class _Entry:
+    __slots__ = ("signature", "racy", "header")
+
+    def __init__(self, signature: Tuple[int, int, int], racy: bool, header: Dict[str, Any]):
+        self.signature = signature
+        self.racy = racy
+        self.header = header
+
+
+class TaskMetadataIndex:
+    """O(1) task lookups for one tasks directory, refreshed from file stats."""
+
+    def __init__(self, tasks_dir: str, read_header: HeaderReader):
+        self.tasks_dir = tasks_dir
+        self._read_header = read_header
+        self._entries: Dict[str, _Entry] = {}
+        self._by_task_id: Dict[str, List[str]] = {}
+        self._by_cmd: Dict[str, Set[str]] = {}
+        self.parses = 0
+
+    def refresh(self) -> None:
+        now_ns = time.time_ns()
+        seen: Set[str] = set()
+        changed = False
+        try:
+            with os.scandir(self.tasks_dir) as it:
+                dir_entries = [entry for entry in it if entry.name.endswith(".yaml")]
+        except (FileNotFoundError, NotADirectoryError):
+            dir_entries = []
+
+        for dir_entry in dir_entries:
+            try:
+                if not dir_entry.is_file():
+                    continue
+                st = dir_entry.stat()
+            except OSError:
+                continue
+            path = dir_entry.path
+            seen.add(path)
+            signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+            cached = self._entries.get(path)
+            if cached is not None and cached.signature == signature and not cached.racy:
+                continue
+            header = self._read_header(path)
+            self.parses += 1
+            racy = now_ns - st.st_mtime_ns < RACY_MTIME_WINDOW_NS
+            if cached is None or cached.header != header:
+                changed = True
+            self._entries[path] = _Entry(signature, racy, header)
+
+        for path in [path for path in self._entries if path not in seen]:
+            del self._entries[path]
+            changed = True
+
+        if changed:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        by_task_id: Dict[str, List[str]] = {}
+        by_cmd: Dict[str, Set[str]] = {}
+        for path in sorted(self._entries):
+            header = self._entries[path].header
+            task_id = str(header.get("task_id") or "")
+            if not task_id:
+                continue
+            by_task_id.setdefault(task_id, []).append(path)
+            parent_cmd_id = str(header.get("parent_cmd_id") or "")
+            if parent_cmd_id:
+                by_cmd.setdefault(parent_cmd_id, set()).add(path)
+            # Tasks also belong to any "<prefix>_" of their id (legacy cmd_id derivation).
+            pos = task_id.find("_")
+            while pos > 0:
+                by_cmd.setdefault(task_id[:pos], set()).add(path)
+                pos = task_id.find("_", pos + 1)
+        self._by_task_id = by_task_id
+        self._by_cmd = by_cmd
+
+    def find_path(self, task_id: str, preferred_path: str = "") -> str:
+        """Path of the task file for ``task_id`` (``preferred_path`` wins when it matches)."""
+        self.refresh()
+        paths = self._by_task_id.get(task_id) or []
+        if preferred_path and preferred_path in paths:
+            return preferred_path
+        return paths[0] if paths else ""
+
+    def header(self, path: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(path)
+        return dict(entry.header) if entry is not None else None
+
+    def headers_for_cmd(self, cmd_id: str) -> List[Dict[str, Any]]:
+        """Headers whose parent_cmd_id is ``cmd_id`` or whose task_id starts with ``cmd_id_``."""
+        self.refresh()
+        if not cmd_id:
+            paths = sorted(self._entries)
+        else:
+            paths = sorted(self._by_cmd.get(cmd_id) or ())
+        return [dict(self._entries[path].header) for path in paths]
+
+
+__all__ = ["TaskMetadataIndex"]
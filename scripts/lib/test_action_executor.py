@@ -0,0 +1,145 @@
+"""Unit tests for scripts/lib/action_executor.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_action_executor
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.action_executor import ActionExecutor
+
+
+class ActionExecutorTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = ActionExecutor(max_concurrency=4, kind_limits={"collect": 1})
+        self.addCleanup(self.executor.shutdown)
+        self.events = []
+        self.events_lock = threading.Lock()
+
+    def _record(self, name, delay=0.0, result=(0, [], "")):
+        def run():
+            with self.events_lock:
+                self.events.append(("start", name))
+            time.sleep(delay)
+            with self.events_lock:
+                self.events.append(("end", name))
+            return result
+
+        return run
+
+    def _drain_all(self):
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        return {job.context["name"]: job for job in self.executor.drain()}
+
+    def test_same_key_jobs_run_in_submission_order(self):
+        self.executor.submit("collect", ["t1"], self._record("collect", 0.05), context={"name": "collect"})
+        self.executor.submit("implementer", ["t1"], self._record("dispatch"), context={"name": "dispatch"})
+        self._drain_all()
+        self.assertEqual(
+            self.events,
+            [("start", "collect"), ("end", "collect"), ("start", "dispatch"), ("end", "dispatch")],
+        )
+
+    def test_slow_job_does_not_block_unrelated_keys(self):
+        release = threading.Event()
+        self.executor.submit("collect", ["t1"], lambda: release.wait(5), context={"name": "slow"})
+        self.executor.submit("implementer", ["t2"], self._record("fast"), context={"name": "fast"})
+        self.assertTrue(self.executor.wait(timeout=2))
+        finished = [job.context["name"] for job in self.executor.drain()]
+        self.assertEqual(finished, ["fast"])
+        release.set()
+        self._drain_all()
+
+    def test_waiting_job_keeps_later_jobs_on_its_keys_behind_it(self):
+        release = threading.Event()
+        self.executor.submit("collect", ["a"], lambda: release.wait(5), context={"name": "c1"})
+        # Blocked by the collect limit, not by its keys: it still holds back "b".
+        self.executor.submit("collect", ["b"], self._record("c2"), context={"name": "c2"})
+        self.executor.submit("reviewer", ["b"], self._record("d"), context={"name": "d"})
+        time.sleep(0.05)
+        self.assertEqual(self.events, [])
+        release.set()
+        self._drain_all()
+        self.assertEqual([name for kind, name in self.events if kind == "start"], ["c2", "d"])
+
+    def test_kind_limit_caps_concurrency(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        for index in range(4):
+            self.executor.submit("collect", [f"t{index}"], job, context={"name": str(index)})
+        self._drain_all()
+        self.assertEqual(max(peak), 1)
+
+    def test_gated_job_skipped_after_batch_failure(self):
+        batch = self.executor.new_batch()
+        self.executor.submit(
+            "collect",
+            ["t1"],
+            self._record("collect", result=(1, [], "boom")),
+            batch=batch,
+            fails_batch=lambda result: result[0] != 0,
+            context={"name": "collect"},
+        )
+        self.executor.submit("implementer", ["t1", "t2"], self._record("dispatch"), batch=batch, gated=True, context={"name": "dispatch"})
+        self.executor.submit("implementer", ["t3"], self._record("other"), batch=batch, gated=True, context={"name": "other"})
+        self.executor.close_batch(batch)
+        jobs = self._drain_all()
+        self.assertTrue(jobs["dispatch"].skipped)
+        self.assertEqual(jobs["dispatch"].skipped_by, jobs["collect"].job_id)
+        self.assertFalse(jobs["other"].skipped)
+        self.assertNotIn(("start", "dispatch"), self.events)
+
+    def test_batch_failure_does_not_leak_into_next_batch(self):
+        first = self.executor.new_batch()
+        self.executor.mark_batch_failed(first, ["t1"])
+        self.executor.close_batch(first)
+        second = self.executor.new_batch()
+        self.assertFalse(self.executor.batch_failed(second, ["t1"]))
+        self.executor.submit("implementer", ["t1"], self._record("dispatch"), batch=second, gated=True, context={"name": "dispatch"})
+        self.assertFalse(self._drain_all()["dispatch"].skipped)
+
+    def test_exception_is_reported_and_fails_batch(self):
+        def boom():
+            raise RuntimeError("nope")
+
+        batch = self.executor.new_batch()
+        self.executor.submit("collect", ["t1"], boom, batch=batch, fails_batch=lambda result: False, context={"name": "boom"})
+        jobs = self._drain_all()
+        self.assertIsInstance(jobs["boom"].error, RuntimeError)
+        self.assertTrue(self.executor.batch_failed(batch, ["t1"]))
+
+    def test_on_finish_fires_after_job_is_drainable(self):
+        seen = []
+        fired = threading.Event()
+
+        def on_finish():
+            seen.append(len(executor.drain()))
+            fired.set()
+
+        executor = ActionExecutor(max_concurrency=1, on_finish=on_finish)
+        self.addCleanup(executor.shutdown)
+        executor.submit("notify", ["t1"], self._record("notify"), context={"name": "notify"})
+        self.assertTrue(fired.wait(5))
+        self.assertEqual(seen, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
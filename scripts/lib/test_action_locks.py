@@ -0,0 +1,128 @@
+"""Unit tests for scripts/lib/action_locks.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_action_locks
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.action_locks import ActionLocks
+
+# Takes the requested leases in a separate process (record locks never conflict
+# within one process), prints "ok"/"busy", and holds them until stdin closes.
+_OTHER_PROCESS = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from lib.action_locks import ActionLocks
+locks = ActionLocks(sys.argv[2])
+ok = True
+for spec in sys.argv[3:]:
+    kind, _, rest = spec.partition(":")
+    if kind == "collect":
+        lease, _ = locks.acquire_collect()
+    else:
+        task_id, _, worker = rest.partition("@")
+        lease, _ = locks.acquire_dispatch([task_id], worker=worker)
+    ok = ok and lease is not None
+print("ok" if ok else "busy", flush=True)
+sys.stdin.read()
+"""
+
+
+class ActionLocksTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.lock_dir = os.path.join(self.tmpdir.name, "locks")
+        self.locks = ActionLocks(self.lock_dir)
+        self.addCleanup(self.locks.close)
+
+    def _other(self, *specs):
+        proc = subprocess.Popen(
+            [sys.executable, "-c", _OTHER_PROCESS, SCRIPTS_DIR, self.lock_dir, *specs],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+        def stop():
+            proc.stdin.close()
+            proc.wait(timeout=5)
+            proc.stdout.close()
+
+        self.addCleanup(stop)
+        return proc.stdout.readline().strip()
+
+    def test_dispatches_for_different_tasks_and_workers_run_in_parallel(self):
+        self.assertEqual(self._other("dispatch:t1@%1"), "ok")
+        lease, error = self.locks.acquire_dispatch(["t2"], worker="%2")
+        self.assertIsNotNone(lease, error)
+
+    def test_same_task_or_worker_in_another_process_is_busy(self):
+        self.assertEqual(self._other("dispatch:t1@%1"), "ok")
+        lease, error = self.locks.acquire_dispatch(["t1"], worker="%9")
+        self.assertIsNone(lease)
+        self.assertIn("task-t1", error)
+        lease, error = self.locks.acquire_dispatch(["t9"], worker="%1")
+        self.assertIsNone(lease)
+        self.assertIn("worker-_1", error)
+        # A failed lease leaves nothing behind.
+        self.assertEqual(self.locks.held(), {})
+
+    def test_collect_excludes_dispatches_of_other_processes(self):
+        self.assertEqual(self._other("dispatch:t1@%1"), "ok")
+        lease, error = self.locks.acquire_collect()
+        self.assertIsNone(lease)
+        self.assertIn("dispatch_collect", error)
+
+    def test_local_collect_and_dispatch_exclude_each_other(self):
+        dispatch, _ = self.locks.acquire_dispatch(["t1"], worker="%1")
+        collect, error = self.locks.acquire_collect()
+        self.assertIsNone(collect)
+        self.assertIn("dispatch in this process", error)
+        self.assertEqual(self.locks.held()["dispatch_collect"], "shared")
+
+        self.locks.release(dispatch)
+        collect, error = self.locks.acquire_collect()
+        self.assertIsNotNone(collect, error)
+        dispatch, error = self.locks.acquire_dispatch(["t2"], worker="%2")
+        self.assertIsNone(dispatch)
+        self.assertIn("collect in this process", error)
+        self.assertEqual(self.locks.held(), {"dispatch_collect": "exclusive"})
+        self.assertEqual(self._other("dispatch:t2@%2"), "busy")
+
+        self.locks.release(collect)
+        self.assertEqual(self.locks.held(), {})
+        self.assertEqual(self._other("dispatch:t2@%2"), "ok")
+
+    def test_dispatch_gated_by_the_local_collect_joins_it(self):
+        collect, _ = self.locks.acquire_collect()
+        dispatch, error = self.locks.acquire_dispatch(["t1"], worker="%1", gated_by=collect)
+        self.assertIsNotNone(dispatch, error)
+
+        self.locks.release(collect)
+        self.assertEqual(self.locks.held()["dispatch_collect"], "shared")
+        self.assertEqual(self._other("dispatch:t2@%2"), "ok")
+        self.assertEqual(self._other("collect"), "busy")
+        self.locks.release(dispatch)
+        self.assertEqual(self.locks.held(), {})
+
+    def test_released_task_lock_file_is_removed(self):
+        lease, _ = self.locks.acquire_dispatch(["cmd_1_task_1"], worker="%1")
+        task_lock = os.path.join(self.lock_dir, "task-cmd_1_task_1.lock")
+        self.assertTrue(os.path.exists(task_lock))
+        self.locks.release(lease)
+        self.assertFalse(os.path.exists(task_lock))
+        self.assertEqual(self._other("dispatch:cmd_1_task_1@%1"), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
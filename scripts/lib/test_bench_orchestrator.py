@@ -0,0 +1,51 @@
+"""Unit tests for scripts/lib/bench_orchestrator.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_bench_orchestrator
+"""
+
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch
+from lib.bench_orchestrator import compare, run_once
+
+
+class BenchOrchestratorTests(unittest.TestCase):
+    def test_small_run_completes_every_task_and_restores_patches(self):
+        originals = (orch._capture_pane_tail, orch._run_dispatch, orch._apply_transition, orch._log)
+
+        run = run_once(workers=2, tasks=3, rework_every=2, state_backend="json", max_cycles=500)
+
+        self.assertEqual(run["tasks_done"], 3)
+        self.assertEqual(run["script_errors"], [])
+        # planner + 4 steps per task + one rework loop (3 more signals) for tasks 0 and 2
+        self.assertEqual(run["signals"], 1 + 3 * 4 + 2 * 3)
+        self.assertGreater(run["state_bytes"], 0)
+        self.assertEqual(originals, (orch._capture_pane_tail, orch._run_dispatch, orch._apply_transition, orch._log))
+
+    def test_compare_flags_throughput_regressions(self):
+        run = {
+            "workers": 4,
+            "tasks": 10,
+            "rework_every": 5,
+            "state_backend": "json",
+            "signals_per_sec": 70.0,
+            "transition_latency_ms": {"p90": 2.0},
+            "state_bytes_per_task": 600.0,
+        }
+        baseline = {"runs": [dict(run, signals_per_sec=100.0)]}
+
+        _, regressed = compare([run], baseline, 0.2)
+        self.assertTrue(regressed)
+        _, regressed = compare([run], baseline, 0.5)
+        self.assertFalse(regressed)
+
+
+if __name__ == "__main__":
+    unittest.main()
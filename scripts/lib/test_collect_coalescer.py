@@ -0,0 +1,73 @@
+"""Unit tests for scripts/lib/collect_coalescer.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_collect_coalescer
+"""
+
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.collect_coalescer import CollectCoalescer
+
+
+def _collect(task_id, reason="review_input_error", cmd_id="", **extra):
+    action = {"type": "collect", "reason": reason, "task_id": task_id, "cmd_id": cmd_id}
+    action.update(extra)
+    return action
+
+
+class CollectCoalescerTests(unittest.TestCase):
+    def test_merges_requests_and_keeps_every_task_id(self):
+        coalescer = CollectCoalescer()
+        coalescer.add(_collect("t1", cmd_id="c1"), [{"type": "dispatch", "task_id": "t1"}])
+        coalescer.add(_collect("t2", cmd_id="c2"))
+        coalescer.add(_collect("t1", reason="other"))
+        merged, followups = coalescer.take()
+        self.assertEqual(merged["task_ids"], ["t1", "t2"])
+        self.assertEqual(merged["cmd_ids"], {"t1": "c1", "t2": "c2"})
+        self.assertEqual(merged["reason"], "review_input_error,other")
+        self.assertEqual(merged["coalesced"], 3)
+        self.assertNotIn("attempt", merged)
+        self.assertEqual(followups, [{"type": "dispatch", "task_id": "t1"}])
+        self.assertIsNone(coalescer.take())
+        self.assertEqual(coalescer.pending(), 0)
+
+    def test_merged_collect_can_be_merged_again(self):
+        coalescer = CollectCoalescer()
+        coalescer.add(_collect("t1"))
+        coalescer.add(_collect("t2"))
+        first, _ = coalescer.take()
+        first["attempt"] = 2
+        coalescer.add(first)
+        coalescer.add(_collect("t3", attempt=3))
+        merged, _ = coalescer.take()
+        self.assertEqual(merged["task_ids"], ["t1", "t2", "t3"])
+        self.assertEqual(merged["attempt"], 2)
+
+    def test_window_starts_at_first_request(self):
+        coalescer = CollectCoalescer(window_sec=0.5)
+        self.assertIsNone(coalescer.seconds_until_due())
+        self.assertFalse(coalescer.due())
+        coalescer.add(_collect("t1"))
+        start = coalescer._first_at
+        coalescer.add(_collect("t2"))
+        self.assertAlmostEqual(coalescer.seconds_until_due(now=start + 0.2), 0.3)
+        self.assertFalse(coalescer.due(now=start + 0.2))
+        self.assertTrue(coalescer.due(now=start + 0.5))
+
+    def test_zero_window_is_due_immediately(self):
+        coalescer = CollectCoalescer(window_sec=0)
+        coalescer.add(_collect(""))
+        self.assertTrue(coalescer.due())
+        merged, _ = coalescer.take()
+        self.assertEqual(merged["task_ids"], [])
+        self.assertEqual(merged["task_id"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
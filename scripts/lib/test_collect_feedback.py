@@ -9,13 +9,19 @@ from __future__ import annotations
 import re
 import shutil
 import subprocess
+import sys
 import tempfile
 import unittest
 
 from pathlib import Path
+from unittest import mock
 
 
 SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from lib import collect_engine
 COLLECT_SCRIPT = SCRIPTS_DIR / "yb_collect.sh"
 SESSION_ID = "feedback-loop"
 
@@ -158,5 +164,52 @@ class CollectFeedbackRegressionTests(unittest.TestCase):
         self._assert_dashboard_feedback_counts(dashboard, missing=0, invalid=0, rework_repeat=1)
 
 
+class InProcessCollectBoundTests(unittest.TestCase):
+    def setUp(self):
+        self.repo_dir = Path(tempfile.mkdtemp(prefix="yb_collect_bound_"))
+        self.queue_dir = self.repo_dir / ".yamibaito" / f"queue_{SESSION_ID}"
+        (self.queue_dir / "reports").mkdir(parents=True, exist_ok=True)
+        (self.queue_dir / "tasks").mkdir(parents=True, exist_ok=True)
+        (self.queue_dir / "reports" / "worker_001_report.yaml").write_text(
+            _build_report_yaml("T-B1", extra_lines=[], feedback_block=_valid_feedback_block()),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.repo_dir, ignore_errors=True)
+
+    def test_expired_deadline_exits_124_without_writing_the_dashboard(self):
+        messages = []
+
+        rc = collect_engine.run_collect(str(self.repo_dir), SESSION_ID, log=messages.append, timeout_sec=0)
+
+        self.assertEqual(rc, collect_engine.COLLECT_TIMEOUT_RC)
+        self.assertIn("collect timed out", messages[-1])
+        self.assertFalse((self.repo_dir / "dashboard.md").exists())
+
+    def test_hung_git_is_cut_off_and_only_skips_the_tamper_audit(self):
+        hung = subprocess.TimeoutExpired(cmd="git", timeout=collect_engine.GIT_TIMEOUT_SEC)
+        messages = []
+
+        with mock.patch.object(collect_engine.subprocess, "run", side_effect=hung) as run:
+            rc = collect_engine.run_collect(str(self.repo_dir), SESSION_ID, log=messages.append, timeout_sec=60)
+
+        self.assertEqual(rc, 0)
+        self.assertLessEqual(run.call_args.kwargs["timeout"], collect_engine.GIT_TIMEOUT_SEC)
+        self.assertTrue(any("git タイムアウト" in message for message in messages))
+        self.assertTrue((self.repo_dir / "dashboard.md").exists())
+
+    def test_recovery_warning_is_appended_to_the_dashboard(self):
+        (self.repo_dir / "dashboard.md").write_text("# dashboard\n", encoding="utf-8")
+
+        collect_engine.emit_recovery_warning(
+            str(self.repo_dir), SESSION_ID, "COLLECT", "collect failed (attempt 1/4, rc=124)", log=lambda _: None
+        )
+
+        lines = (self.repo_dir / "dashboard.md").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(lines[0], "# dashboard")
+        self.assertRegex(lines[1], r"^- \[WARN\]\[\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\]\[COLLECT\] collect failed \(attempt 1/4, rc=124\)$")
+
+
 if __name__ == "__main__":
     unittest.main()
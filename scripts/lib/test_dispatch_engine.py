@@ -0,0 +1,272 @@
+"""Unit tests for scripts/lib/dispatch_engine.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_dispatch_engine
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib import dispatch_engine
+from lib.dispatch_engine import (
+    collect_active_worker_tasks,
+    dispatch_default_workers,
+    dispatch_planner_workers,
+    planner_route,
+    read_worker_task_fields,
+    run_dispatch,
+    should_abort_architect_launch,
+    should_dispatch_architect_done,
+)
+
+
+class DispatchSmokeTests(unittest.TestCase):
+    def test_planner_dispatch_with_architect_pane(self):
+        self.assertEqual(planner_route(True, True), "architect")
+
+    def test_planner_dispatch_without_architect_pane(self):
+        self.assertIsNone(planner_route(False, True))
+
+    def test_planner_blocked_worker_without_architect_pane_has_no_dispatch_side_effects(self):
+        active_worker_tasks = [
+            ("worker_001", "pane_worker_001", "cmd_0001_task_001", "/tmp/worker_001.yaml", True, False)
+        ]
+        dispatch_counts = {"architect": 0, "implementer": 0}
+
+        def fake_resolve_architect_agent():
+            return {"command": ["echo", "unused"]}
+
+        def fake_dispatch_architect(*_args):
+            dispatch_counts["architect"] += 1
+
+        def fake_dispatch_implementer(*_args):
+            dispatch_counts["implementer"] += 1
+
+        planner_error = dispatch_planner_workers(
+            None,
+            active_worker_tasks,
+            False,
+            resolve_architect_agent_fn=fake_resolve_architect_agent,
+            dispatch_architect_fn=fake_dispatch_architect,
+            dispatch_implementer_fn=fake_dispatch_implementer,
+        )
+
+        self.assertEqual(
+            planner_error,
+            "planner: blocked worker 'worker_001' (cmd_0001_task_001) because needs_architect=true "
+            "but architect pane is not configured",
+        )
+        self.assertEqual(dispatch_counts["architect"], 0)
+        self.assertEqual(dispatch_counts["implementer"], 0)
+
+    def test_architect_done_with_embedded_design_guidance(self):
+        body = "\n".join(
+            [
+                "schema_version: 1",
+                "task:",
+                '  task_id: "cmd_0001_task_001"',
+                "  status: assigned",
+                "  description: |",
+                "    ## Architect",
+                "    - needs_architect: true",
+                "    - design_guidance: embedded",
+                "    --- ARCHITECT DESIGN GUIDANCE ---",
+                "    decision: keep-plan-as-source",
+                "",
+            ]
+        )
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as tmp:
+            tmp.write(body)
+            tmp_path = tmp.name
+        try:
+            _, _, needs_architect, design_guidance = read_worker_task_fields(tmp_path)
+        finally:
+            os.remove(tmp_path)
+        self.assertTrue(should_dispatch_architect_done(needs_architect, design_guidance))
+
+    def test_architect_done_with_top_level_design_guidance(self):
+        body = "\n".join(
+            [
+                "schema_version: 1",
+                "task:",
+                '  task_id: "cmd_0001_task_001"',
+                "  status: assigned",
+                "  needs_architect: true",
+                "  design_guidance: complete",
+                "",
+            ]
+        )
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as tmp:
+            tmp.write(body)
+            tmp_path = tmp.name
+        try:
+            _, _, needs_architect, design_guidance = read_worker_task_fields(tmp_path)
+        finally:
+            os.remove(tmp_path)
+        self.assertTrue(should_dispatch_architect_done(needs_architect, design_guidance))
+
+    def test_architect_launch_failure_is_fatal(self):
+        targets = [("worker_001", "cmd_0001_task_001", "/tmp/worker_001.yaml")]
+        self.assertTrue(should_abort_architect_launch(True, targets, None))
+        self.assertFalse(should_abort_architect_launch(False, targets, None))
+
+    def test_planner_mixed_task_aborts_without_tmux_side_effects_on_architect_resolution_failure(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tasks_dir = os.path.join(tmpdir, "tasks")
+            os.makedirs(tasks_dir, exist_ok=True)
+
+            with open(os.path.join(tasks_dir, "worker_001.yaml"), "w", encoding="utf-8") as f:
+                f.write(
+                    "\n".join(
+                        [
+                            "schema_version: 1",
+                            "task:",
+                            '  task_id: "cmd_0001_task_001"',
+                            "  status: assigned",
+                            "  needs_architect: true",
+                            "",
+                        ]
+                    )
+                )
+            with open(os.path.join(tasks_dir, "worker_002.yaml"), "w", encoding="utf-8") as f:
+                f.write(
+                    "\n".join(
+                        [
+                            "schema_version: 1",
+                            "task:",
+                            '  task_id: "cmd_0001_task_002"',
+                            "  status: assigned",
+                            "  needs_architect: false",
+                            "",
+                        ]
+                    )
+                )
+
+            workers_map = {
+                "worker_001": "pane_architect_target",
+                "worker_002": "pane_implementer_target",
+            }
+            active_worker_tasks = collect_active_worker_tasks(workers_map, tmpdir, {})
+            calls = []
+
+            def fake_resolve_architect_agent():
+                return None
+
+            def fake_dispatch_architect(*_args):
+                calls.append("architect")
+
+            def fake_dispatch_implementer(*_args):
+                calls.append("implementer")
+
+            planner_error = dispatch_planner_workers(
+                None,
+                active_worker_tasks,
+                True,
+                resolve_architect_agent_fn=fake_resolve_architect_agent,
+                dispatch_architect_fn=fake_dispatch_architect,
+                dispatch_implementer_fn=fake_dispatch_implementer,
+            )
+
+        self.assertEqual(
+            planner_error,
+            "architect pane is configured but architect command resolution failed",
+        )
+        self.assertEqual(calls, [])
+
+    def test_default_mode_dispatch_helper_skips_worker_without_design_guidance(self):
+        active_worker_tasks = [
+            ("worker_001", "pane_worker_001", "cmd_0001_task_001", "/tmp/worker_001.yaml", True, False)
+        ]
+        implementer_calls = 0
+        skipped_workers = []
+
+        def fake_dispatch_implementer(*_args):
+            nonlocal implementer_calls
+            implementer_calls += 1
+
+        def fake_skip_reporter(worker_id, task_id):
+            skipped_workers.append((worker_id, task_id))
+
+        dispatch_default_workers(
+            None,
+            active_worker_tasks,
+            dispatch_implementer_fn=fake_dispatch_implementer,
+            skip_reporter_fn=fake_skip_reporter,
+        )
+
+        self.assertEqual(implementer_calls, 0)
+        self.assertEqual(skipped_workers, [("worker_001", "cmd_0001_task_001")])
+
+suite = unittest.defaultTestLoader.loadTestsFromTestCase(DispatchSmokeTests)
+result = unittest.TextTestRunner(verbosity=2).run(suite)
+
+
+class _RecordingClient:
+    def __init__(self):
+        self.calls = []
+
+    def send_keys(self, target, payload):
+        self.calls.append((target, payload))
+        return subprocess.CompletedProcess(["tmux"], 0, "", "")
+
+
+class RunDispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.repo = tempfile.mkdtemp(prefix="yb_dispatch_engine_")
+        self.addCleanup(shutil.rmtree, self.repo, ignore_errors=True)
+        self.queue_dir = os.path.join(self.repo, ".yamibaito", "queue_s1")
+        os.makedirs(os.path.join(self.queue_dir, "tasks"))
+        self.client = _RecordingClient()
+        patcher = mock.patch.object(dispatch_engine, "shared_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logs = []
+
+    def _write_panes(self, payload):
+        with open(os.path.join(self.repo, ".yamibaito", "panes_s1.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    def _write_task(self, worker_id, task_id, status="assigned"):
+        path = os.path.join(self.queue_dir, "tasks", f"{worker_id}.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'schema_version: 1\ntask:\n  task_id: "{task_id}"\n  status: {status}\n')
+
+    def test_default_dispatch_sends_worker_command_to_pane(self):
+        self._write_panes({"session": "yb", "workers": {"worker_001": "%1", "worker_002": "%2"}})
+        self._write_task("worker_001", "cmd_0001_task_001")
+        self._write_task("worker_002", "cmd_0001_task_002", status="done")
+
+        rc = run_dispatch(self.repo, "s1", log=self.logs.append)
+
+        self.assertEqual(rc, 0, self.logs)
+        self.assertEqual([target for target, _ in self.client.calls], ["yb:%1", "yb:%1"])
+        command = self.client.calls[0][1]
+        self.assertIn('--worker "worker_001"', command)
+        self.assertIn('--session "s1"', command)
+        self.assertEqual(self.client.calls[1][1], "Enter")
+
+    def test_invalid_panes_map_is_reported_not_raised(self):
+        rc = run_dispatch(self.repo, "s1", log=self.logs.append)
+        self.assertEqual(rc, 1)
+        self.assertTrue(self.logs and self.logs[-1].startswith("Invalid panes map:"))
+
+    def test_role_dispatch_without_source_task_fails(self):
+        self._write_panes({"session": "yb", "workers": {"worker_001": "%1"}})
+        rc = run_dispatch(self.repo, "s1", role="reviewer", task_id="cmd_0001_task_009", log=self.logs.append)
+        self.assertEqual(rc, 1)
+        self.assertIn("Missing task for --task-id cmd_0001_task_009", self.logs[-1])
+        self.assertEqual(self.client.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+"""Unit tests for scripts/lib/event_logger.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_event_logger
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.event_logger import OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL, EventLogger
+
+
+class EventLoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "orchestrator-events.jsonl")
+
+    def _events(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_unbuffered_appends_each_event(self):
+        logger = EventLogger(self.path)
+        self.addCleanup(logger.close)
+
+        logger.log_signal_received("t1", "reviewer", "abc", True)
+        logger.log_transition("t1", "review", "quality-gate", "reviewer", {"task_id": "t1"})
+
+        self.assertEqual([event["event_type"] for event in self._events()], ["signal_received", "transition"])
+        self.assertEqual(logger.io_stats["appends"], 2)
+
+    def test_buffered_events_are_group_committed_on_flush(self):
+        logger = EventLogger(self.path, buffer_events=100, buffer_max_age_sec=60)
+        self.addCleanup(logger.close)
+
+        for index in range(5):
+            logger.log_error(f"t{index}", "boom", "message")
+        self.assertEqual(self._events(), [])
+
+        logger.flush()
+        logger.flush()
+
+        self.assertEqual([event["task_id"] for event in self._events()], ["t0", "t1", "t2", "t3", "t4"])
+        stats = logger.io_stats
+        self.assertEqual((stats["events_logged"], stats["appends"]), (5, 1))
+        self.assertEqual(stats["bytes_written"], os.path.getsize(self.path))
+
+    def test_buffer_flushes_itself_at_the_event_limit_and_on_close(self):
+        logger = EventLogger(self.path, buffer_events=3, buffer_max_age_sec=60)
+
+        for index in range(4):
+            logger.log_escalation(f"t{index}", "reason")
+        self.assertEqual(len(self._events()), 3)
+
+        logger.close()
+        self.assertEqual(len(self._events()), 4)
+        self.assertEqual(logger.io_stats["appends"], 2)
+
+    def test_buffer_flushes_when_the_oldest_event_is_too_old(self):
+        logger = EventLogger(self.path, buffer_events=100, buffer_max_age_sec=5)
+        self.addCleanup(logger.close)
+
+        with mock.patch("lib.event_logger.time.monotonic", side_effect=[100.0, 100.0, 106.0, 106.0]):
+            logger.log_error("t1", "boom", "first")
+            self.assertEqual(self._events(), [])
+            logger.log_error("t2", "boom", "second")
+
+        self.assertEqual([event["task_id"] for event in self._events()], ["t1", "t2"])
+
+    def test_failed_flush_drops_the_batch_and_raises(self):
+        logger = EventLogger(self.path, buffer_events=100, buffer_max_age_sec=60)
+        self.addCleanup(logger.close)
+        logger.log_error("t1", "boom", "message")
+
+        with mock.patch.object(logger, "_append_with_retry", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                logger.flush()
+
+        logger.flush()
+        self.assertEqual(self._events(), [])
+        self.assertEqual(logger.io_stats["events_dropped"], 1)
+
+
+
+class BackgroundEventLoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "orchestrator-events.jsonl")
+
+    def _task_ids(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as fh:
+            return [json.loads(line)["task_id"] for line in fh]
+
+    def _stalled_logger(self, **kwargs):
+        """A background logger whose first append blocks until ``release`` is set."""
+        logger = EventLogger(self.path, background=True, **kwargs)
+        self.addCleanup(logger.close)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        entered = threading.Event()
+        real_append = logger._append_with_retry
+
+        def slow_append(payload):
+            entered.set()
+            release.wait(5)
+            real_append(payload)
+
+        logger._append_with_retry = slow_append
+        logger.log_error("t0", "boom", "first")
+        self.assertTrue(entered.wait(5))
+        return logger, release
+
+    def test_writer_thread_writes_everything_by_flush_and_close(self):
+        logger = EventLogger(self.path, background=True)
+
+        for index in range(50):
+            logger.log_error(f"t{index}", "boom", "message")
+        logger.flush()
+        self.assertEqual(len(self._task_ids()), 50)
+
+        logger.log_error("t50", "boom", "message")
+        logger.close()
+        self.assertEqual(self._task_ids(), [f"t{index}" for index in range(51)])
+        self.assertLessEqual(logger.io_stats["appends"], 51)
+
+    def test_drop_oldest_discards_queued_events_and_counts_them(self):
+        logger, release = self._stalled_logger(queue_events=2, overflow=OVERFLOW_DROP_OLDEST)
+
+        for index in range(1, 5):
+            logger.log_error(f"t{index}", "boom", "message")
+        release.set()
+        logger.close()
+
+        self.assertEqual(self._task_ids(), ["t0", "t3", "t4"])
+        self.assertEqual(logger.io_stats["events_overflow_dropped"], 2)
+
+    def test_spill_keeps_overflow_in_a_side_file_until_the_writer_catches_up(self):
+        logger, release = self._stalled_logger(queue_events=1, overflow=OVERFLOW_SPILL)
+
+        for index in range(1, 4):
+            logger.log_error(f"t{index}", "boom", "message")
+        self.assertTrue(os.path.getsize(self.path + ".spill") > 0)
+        release.set()
+        logger.close()
+
+        self.assertEqual(self._task_ids(), ["t0", "t1", "t2", "t3"])
+        self.assertEqual(logger.io_stats["events_spilled"], 2)
+        self.assertEqual(os.path.getsize(self.path + ".spill"), 0)
+
+    def test_lines_logged_after_a_spill_stay_behind_the_spilled_lines(self):
+        logger, release = self._stalled_logger(queue_events=1, overflow=OVERFLOW_SPILL)
+        second_release = threading.Event()
+        self.addCleanup(second_release.set)
+        second_entered = threading.Event()
+        stalled_append = logger._append_with_retry
+
+        def stall_second_write(payload):
+            if not second_entered.is_set() and b'"t1"' in payload:
+                second_entered.set()
+                second_release.wait(5)
+            stalled_append(payload)
+
+        logger._append_with_retry = stall_second_write
+        logger.log_error("t1", "boom", "message")
+        logger.log_error("t2", "boom", "message")  # queue full: spilled
+        release.set()
+        self.assertTrue(second_entered.wait(5))
+        # The writer has taken t1 and the queue is empty again, but t2 is still in the spill file.
+        logger.log_error("t3", "boom", "message")
+        logger.log_error("t4", "boom", "message")
+        second_release.set()
+        logger.close()
+
+        self.assertEqual(self._task_ids(), ["t0", "t1", "t2", "t3", "t4"])
+        self.assertEqual(logger.io_stats["events_spilled"], 3)
+
+    def test_leftover_spill_file_is_written_before_new_lines(self):
+        with open(self.path + ".spill", "w", encoding="utf-8") as fh:
+            fh.write(json.dumps({"task_id": "old"}) + "\n")
+
+        logger = EventLogger(self.path, background=True, overflow=OVERFLOW_SPILL)
+        logger.log_error("new", "boom", "message")
+        logger.close()
+
+        self.assertEqual(self._task_ids(), ["old", "new"])
+
+    def test_block_waits_for_room_in_the_queue(self):
+        logger, release = self._stalled_logger(queue_events=1)
+        logger.log_error("t1", "boom", "message")
+
+        done = threading.Event()
+
+        def producer():
+            logger.log_error("t2", "boom", "message")
+            done.set()
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        self.assertFalse(done.wait(0.2))
+        release.set()
+        thread.join(5)
+        logger.close()
+
+        self.assertTrue(done.is_set())
+        self.assertEqual(self._task_ids(), ["t0", "t1", "t2"])
+        self.assertEqual(logger.io_stats["queue_blocked"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
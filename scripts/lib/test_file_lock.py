@@ -0,0 +1,97 @@
+"""Unit tests for scripts/lib/file_lock.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_file_lock
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.file_lock import FileLock, LockStats, is_flock_held
+
+
+class FileLockTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "locks", "state_save.lock")
+        self.stats = LockStats()
+
+    def _lock(self):
+        lock = FileLock(self.path, stats=self.stats)
+        self.addCleanup(lock.release)
+        return lock
+
+    def test_uncontended_acquire_does_not_wait(self):
+        lock = self._lock()
+        self.assertTrue(lock.acquire(5))
+        self.assertTrue(is_flock_held(self.path))
+        lock.release()
+        self.assertFalse(is_flock_held(self.path))
+        entry = self.stats.snapshot()["state_save"]
+        self.assertEqual((entry["acquired"], entry["contended"], entry["failed"]), (1, 0, 0))
+
+    def test_waiter_wakes_when_holder_releases(self):
+        holder, waiter = self._lock(), self._lock()
+        self.assertTrue(holder.acquire())
+        threading.Timer(0.1, holder.release).start()
+        self.assertTrue(waiter.acquire(5))
+        self.assertGreaterEqual(waiter.waited_sec, 0.05)
+        self.assertLess(waiter.waited_sec, 2)
+        entry = self.stats.snapshot()["state_save"]
+        self.assertEqual((entry["acquired"], entry["contended"]), (2, 1))
+        self.assertGreater(entry["hold_ms_max"], 0)
+
+    def test_timeout_gives_up_and_abandoned_waiter_releases(self):
+        holder, waiter = self._lock(), self._lock()
+        self.assertTrue(holder.acquire())
+        self.assertFalse(waiter.acquire(0.05))
+        self.assertIsNone(waiter.fd)
+        holder.release()
+        # The abandoned helper takes the lock, then must let go of it at once.
+        deadline = time.monotonic() + 2
+        while is_flock_held(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(waiter.acquire(0))
+        entry = self.stats.snapshot()["state_save"]
+        self.assertEqual((entry["acquired"], entry["failed"]), (2, 1))
+
+    def test_release_with_unlink_lets_waiter_reopen(self):
+        holder, waiter = self._lock(), self._lock()
+        self.assertTrue(holder.acquire())
+        threading.Timer(0.05, lambda: holder.release(unlink=True)).start()
+        self.assertTrue(waiter.acquire(5))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(os.fstat(waiter.fd).st_ino, os.stat(self.path).st_ino)
+
+    def test_take_report_covers_only_the_interval(self):
+        self.stats.record_acquire("a", 0.002, acquired=True, contended=True)
+        self.stats.record_release("a", 0.5)
+        self.assertEqual(
+            self.stats.take_report(),
+            {
+                "a": {
+                    "acquired": 1,
+                    "contended": 1,
+                    "failed": 0,
+                    "wait_ms_total": 2.0,
+                    "wait_ms_max": 2.0,
+                    "hold_ms_total": 500.0,
+                    "hold_ms_max": 500.0,
+                }
+            },
+        )
+        self.assertEqual(self.stats.take_report(), {})
+        self.assertEqual(self.stats.snapshot()["a"]["acquired"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
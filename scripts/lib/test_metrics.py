@@ -0,0 +1,63 @@
+"""Unit tests for scripts/lib/metrics.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_metrics
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.metrics import MetricsRegistry
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_counters_accumulate_across_threads(self):
+        metrics = MetricsRegistry()
+
+        def bump():
+            for _ in range(1000):
+                metrics.incr("pane_parses_total")
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.counter("pane_parses_total"), 4000)
+        self.assertEqual(metrics.counter("missing"), 0)
+
+    def test_gauges_keep_latest_value_and_snapshots_are_copies(self):
+        metrics = MetricsRegistry()
+        metrics.set_gauge("poll_interval_sec", 5)
+        metrics.set_gauge("poll_interval_sec", 2)
+        snapshot = metrics.gauges()
+        snapshot["poll_interval_sec"] = 99
+        self.assertEqual(metrics.gauges(), {"poll_interval_sec": 2})
+
+    def test_labelled_series_and_histogram_buckets(self):
+        metrics = MetricsRegistry()
+        metrics.incr("signals_total", labels={"outcome": "accepted"})
+        metrics.incr("signals_total", labels={"outcome": "accepted"})
+        metrics.incr("signals_total", labels={"outcome": "duplicate"})
+        self.assertEqual(metrics.counter("signals_total", labels={"outcome": "accepted"}), 2)
+        self.assertEqual(
+            metrics.counters(),
+            {'signals_total{outcome="accepted"}': 2, 'signals_total{outcome="duplicate"}': 1},
+        )
+
+        for value in (0.05, 0.2, 3.0):
+            metrics.observe("cycle_duration_seconds", value, buckets=(0.1, 1.0))
+        histogram = metrics.histograms()["cycle_duration_seconds"]
+        self.assertEqual(histogram.cumulative(), [(0.1, 1), (1.0, 2)])
+        self.assertEqual(histogram.count, 3)
+        self.assertAlmostEqual(histogram.sum, 3.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
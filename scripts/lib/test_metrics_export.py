@@ -0,0 +1,91 @@
+"""Unit tests for scripts/lib/metrics_export.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_metrics_export
+"""
+
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.metrics import MetricsRegistry
+from lib.metrics_export import MetricsEndpoint, render_prometheus, write_metrics_file
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost", timeout=5)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+class MetricsExportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.metrics = MetricsRegistry()
+        self.metrics.incr("signals_total", labels={"outcome": "accepted"})
+        self.metrics.set_gauge("actions_in_flight", 2)
+        self.metrics.observe("pane_capture_seconds", 0.2, labels={"worker": "worker_001"}, buckets=(0.1, 1.0))
+
+    def test_render_text_format(self):
+        self.assertEqual(
+            render_prometheus(self.metrics),
+            "\n".join(
+                [
+                    "# TYPE yb_actions_in_flight gauge",
+                    "yb_actions_in_flight 2",
+                    "# TYPE yb_pane_capture_seconds histogram",
+                    'yb_pane_capture_seconds_bucket{worker="worker_001",le="0.1"} 0',
+                    'yb_pane_capture_seconds_bucket{worker="worker_001",le="1.0"} 1',
+                    'yb_pane_capture_seconds_bucket{worker="worker_001",le="+Inf"} 1',
+                    'yb_pane_capture_seconds_sum{worker="worker_001"} 0.2',
+                    'yb_pane_capture_seconds_count{worker="worker_001"} 1',
+                    "# TYPE yb_signals_total counter",
+                    'yb_signals_total{outcome="accepted"} 1',
+                ]
+            )
+            + "\n",
+        )
+        self.assertEqual(render_prometheus(MetricsRegistry()), "")
+
+    def test_metrics_file_is_replaced_atomically(self):
+        path = os.path.join(self.tmpdir.name, "runtime", "orchestrator-metrics.prom")
+        write_metrics_file(path, "a 1\n")
+        write_metrics_file(path, "a 2\n")
+        with open(path, "r", encoding="utf-8") as fh:
+            self.assertEqual(fh.read(), "a 2\n")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["orchestrator-metrics.prom"])
+
+    def test_unix_socket_endpoint_serves_live_registry(self):
+        path = os.path.join(self.tmpdir.name, "m.sock")
+        endpoint = MetricsEndpoint(path, self.metrics)
+        self.addCleanup(endpoint.close)
+        with self.assertRaises(OSError):
+            MetricsEndpoint(path, self.metrics)
+
+        self.metrics.set_gauge("actions_in_flight", 5)
+        conn = _UnixHTTPConnection(path)
+        conn.request("GET", "/metrics")
+        response = conn.getresponse()
+        body = response.read().decode("utf-8")
+        conn.close()
+        self.assertEqual(response.status, 200)
+        self.assertIn("yb_actions_in_flight 5\n", body)
+
+        endpoint.close()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Unit tests for scripts/lib/pane_stream.py and scripts/lib/fs_watch.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_pane_stream
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch
+from lib.action_executor import ActionExecutor
+from lib.fs_watch import DirectoryWatcher, wait_any
+from lib.pane_stream import PaneStreamReader, strip_terminal_controls, stream_path
+
+WORKERS = {"worker_001": "0.2"}
+
+
+class PaneStreamReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.stream_dir = tempfile.mkdtemp(prefix="yb_pane_stream_")
+        self.addCleanup(shutil.rmtree, self.stream_dir, True)
+        self.reader = PaneStreamReader(self.stream_dir)
+        self.path = stream_path(self.stream_dir, "worker_001")
+
+    def _append(self, data: bytes) -> None:
+        with open(self.path, "ab") as fh:
+            fh.write(data)
+
+    def test_strip_terminal_controls(self):
+        raw = "\x1b[32m{\"a\": 1}\x1b[0m\r\n\x1b]0;title\x07done\x07"
+        self.assertEqual(strip_terminal_controls(raw), '{"a": 1}\ndone')
+
+    def test_only_new_bytes_are_returned(self):
+        self._append(b"first line\n")
+        first = self.reader.read_updates(WORKERS)
+        self.assertEqual([u.text for u in first], ["first line"])
+        self.assertEqual(self.reader.read_updates(WORKERS), [])
+
+        self._append(b'{"task_id": "t1"}\n')
+        second = self.reader.read_updates(WORKERS)
+        self.assertEqual(second[0].bytes_read, len(b'{"task_id": "t1"}\n'))
+        self.assertTrue(second[0].text.endswith('{"task_id": "t1"}'))
+        self.assertEqual(second[0].pane_id, "0.2")
+
+    def test_partial_line_is_carried_over(self):
+        self._append(b'{"task_id": ')
+        self.reader.read_updates(WORKERS)
+        self._append(b'"t1"}\n')
+        update = self.reader.read_updates(WORKERS)[0]
+        self.assertIn('{"task_id": "t1"}', update.text)
+
+    def test_truncated_stream_restarts_from_zero(self):
+        self._append(b"old output\n")
+        self.reader.read_updates(WORKERS)
+        with open(self.path, "wb") as fh:
+            fh.write(b"new\n")
+        update = self.reader.read_updates(WORKERS)[0]
+        self.assertEqual(update.bytes_read, 4)
+
+    def test_missing_streams_lists_workers_without_a_file(self):
+        workers = dict(WORKERS, worker_002="0.3")
+        self._append(b"")
+        self.assertEqual(self.reader.missing_streams(workers), ["worker_002"])
+
+    def test_watcher_wakeups_are_debounced_until_not_before(self):
+        class ChattyWatcher:
+            calls = 0
+
+            def wait(self, timeout_sec):
+                self.calls += 1
+                return True
+
+        executor = ActionExecutor(max_concurrency=1)
+        self.addCleanup(executor.shutdown)
+        watcher = ChattyWatcher()
+
+        started = time.monotonic()
+        orch._wait_for_next_cycle(watcher, executor, 5.0, not_before=started + 0.1)
+        elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(watcher.calls, 1)
+
+        started = time.monotonic()
+        orch._wait_for_next_cycle(watcher, executor, 5.0, not_before=started - 1.0)
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    def test_polling_watcher_detects_append(self):
+        watcher = DirectoryWatcher(self.stream_dir, use_inotify=False, poll_interval_sec=0.01)
+        self.addCleanup(watcher.close)
+        self.assertFalse(watcher.wait(0.02))
+        self._append(b"x")
+        self.assertTrue(watcher.wait(0.5))
+
+    def test_polling_watcher_covers_added_path(self):
+        other_dir = os.path.join(self.stream_dir, "inbox")
+        watcher = DirectoryWatcher(self.stream_dir, use_inotify=False, poll_interval_sec=0.01)
+        self.addCleanup(watcher.close)
+        watcher.add_path(other_dir)
+        watcher.wait(0.02)
+        with open(os.path.join(other_dir, "signal.json"), "w", encoding="utf-8") as fh:
+            fh.write("{}")
+        self.assertTrue(watcher.wait(0.5))
+
+    def test_wait_any_reports_changed_watcher_and_ready_fd(self):
+        other_dir = tempfile.mkdtemp(prefix="yb_pane_stream_other_")
+        self.addCleanup(shutil.rmtree, other_dir, True)
+        watched = DirectoryWatcher(self.stream_dir)
+        quiet = DirectoryWatcher(other_dir, use_inotify=False, poll_interval_sec=0.01)
+        for watcher in (watched, quiet):
+            self.addCleanup(watcher.close)
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        quiet.wait(0)
+        self.assertEqual(wait_any([watched, quiet], 0.05, extra_fds=[read_fd]), ([], []))
+
+        self._append(b"x")
+        changed, ready = wait_any([watched, quiet], 1.0, extra_fds=[read_fd])
+        self.assertEqual((changed, ready), ([watched], []))
+
+        os.write(write_fd, b"\0")
+        self.assertEqual(wait_any([watched, quiet], 1.0, extra_fds=[read_fd]), ([], [read_fd]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Unit tests for scripts/lib/poll_schedule.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_poll_schedule
+"""
+
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch
+from lib.poll_schedule import AdaptivePollInterval
+
+
+class AdaptivePollIntervalTests(unittest.TestCase):
+    def test_idle_backs_off_to_ceiling_and_activity_snaps_back(self):
+        schedule = AdaptivePollInterval(0.25, 4, active_max_sec=1)
+        self.assertEqual(schedule.interval, 0.25)
+        waits = [schedule.update(activity=False, active_tasks=False) for _ in range(6)]
+        self.assertEqual(waits, [0.5, 1.0, 2.0, 4.0, 4.0, 4.0])
+        self.assertEqual(schedule.update(activity=True, active_tasks=False), 0.25)
+
+    def test_active_tasks_cap_backoff_lower(self):
+        schedule = AdaptivePollInterval(0.25, 30, active_max_sec=1)
+        waits = [schedule.update(activity=False, active_tasks=True) for _ in range(4)]
+        self.assertEqual(waits, [0.5, 1.0, 1.0, 1.0])
+        schedule.update(activity=False, active_tasks=False)
+        self.assertEqual(schedule.interval, 2.0)
+        # A task becoming active again pulls a long idle interval down to its cap.
+        schedule.interval = 30
+        self.assertEqual(schedule.update(activity=False, active_tasks=True), 1.0)
+
+    def test_bounds_are_normalized(self):
+        schedule = AdaptivePollInterval(2, 1, active_max_sec=5)
+        self.assertEqual((schedule.min_sec, schedule.max_sec, schedule.active_max_sec), (2.0, 2.0, 2.0))
+
+
+class SessionRunnerBackoffTests(unittest.TestCase):
+    def setUp(self):
+        self.repo = tempfile.mkdtemp(prefix="yb_poll_backoff_")
+        self.addCleanup(shutil.rmtree, self.repo, True)
+        os.makedirs(os.path.join(self.repo, ".yamibaito", "queue", "tasks"))
+        with open(os.path.join(self.repo, ".yamibaito", "panes.json"), "w", encoding="utf-8") as fh:
+            json.dump({"session": "fake", "work_dir": self.repo, "workers": {"worker_001": "0.1"}}, fh)
+
+    def test_pane_output_without_signals_does_not_pin_the_interval(self):
+        spinner = itertools.count()
+        patches = [
+            mock.patch.object(orch, "_capture_pane_tail", lambda session, pane: f"thinking... {next(spinner)}"),
+            mock.patch.object(orch, "_log", lambda level, message: None),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        spec = orch.SessionSpec(repo_root=self.repo, mode=orch.MODE_V2)
+        runner = orch.SessionRunner(spec, orch._load_runtime_config(self.repo))
+        self.addCleanup(runner.shutdown)
+
+        for _ in range(3):
+            runner.run_cycle()
+
+        self.assertEqual(runner.metrics.counter("pane_parses_total"), 3)
+        self.assertGreater(runner.poll_schedule.interval, runner.poll_schedule.min_sec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Unit tests for scripts/yb_replay.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_replay
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch
+import yb_replay
+from lib.event_logger import EventLogger
+from lib.state_manager import StateManager
+
+
+class ReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.repo = self.tmpdir.name
+        self.queue_dir = os.path.join(self.repo, ".yamibaito", "queue")
+        self.state_dir = os.path.join(self.repo, ".yamibaito", "runtime")
+        os.makedirs(os.path.join(self.queue_dir, "tasks"))
+        for task_id in ("cmd_r_task_1", "cmd_r_task_2"):
+            with open(os.path.join(self.queue_dir, "tasks", f"{task_id}.yaml"), "w", encoding="utf-8") as fh:
+                fh.write(
+                    "task:\n"
+                    f"  task_id: {task_id}\n"
+                    "  parent_cmd_id: cmd_r\n"
+                    "  assigned_to: worker_001\n"
+                    "  needs_architect: true\n"
+                    "  routing_policy: v2\n"
+                )
+        self._record_run()
+
+    def _record_run(self):
+        sm = StateManager(state_dir=self.state_dir)
+        sm.state["mode"] = orch.MODE_V2
+        logger = EventLogger(os.path.join(self.state_dir, yb_replay.EVENTS_FILENAME))
+        base = {"cmd_id": "cmd_r", "mission": "completed", "worker_id": "worker_001", "pane_id": "0.1"}
+        signals = [
+            dict(base, task_id="cmd_r_task_1", role="planner", status="tasks_ready", task_count=2, ts_ms=1),
+            dict(base, task_id="cmd_r_task_1", role="architect", status="design_ready", ts_ms=2),
+            dict(base, task_id="cmd_r_task_1", role="implementer", status="done", ts_ms=3),
+            dict(base, task_id="cmd_r_task_2", role="architect", status="design_ready", ts_ms=4),
+        ]
+        for signal in signals:
+            orch._apply_transition(
+                sm,
+                logger,
+                signal_dict=signal,
+                panes={},
+                mode=orch.MODE_V2,
+                queue_dir=self.queue_dir,
+                quality_gate_enabled=True,
+                max_rework_loops=3,
+            )
+        sm.save()
+        logger.close()
+
+    def _run_main(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            rc = yb_replay.main(["--repo", self.repo, "--json", *args])
+        return rc, json.loads(out.getvalue())
+
+    def test_planner_fan_out_is_one_step(self):
+        steps = yb_replay.load_replay_steps(os.path.join(self.state_dir, yb_replay.EVENTS_FILENAME))
+
+        self.assertEqual([step.signal["role"] for step in steps], ["planner", "architect", "implementer", "architect"])
+        self.assertEqual(len(steps[0].transitions), 2)
+
+    def test_replay_matches_recorded_log_and_state(self):
+        rc, report = self._run_main()
+
+        self.assertEqual(rc, 0)
+        self.assertEqual(report["steps"], 4)
+        self.assertEqual(report["transitions"], 5)
+        self.assertEqual(report["divergences"], [])
+        self.assertEqual(report["state_diff"], [])
+
+    def test_stored_state_drift_is_reported(self):
+        state_path = os.path.join(self.state_dir, StateManager.STATE_FILENAME)
+        with open(state_path, "r", encoding="utf-8") as fh:
+            stored = json.load(fh)
+        stored["taskState"]["cmd_r_task_2"]["phase"] = "blocked_design"
+        with open(state_path, "w", encoding="utf-8") as fh:
+            json.dump(stored, fh)
+
+        rc, report = self._run_main()
+
+        self.assertEqual(rc, 1)
+        self.assertEqual(len(report["state_diff"]), 1)
+        diff = report["state_diff"][0]
+        self.assertEqual(diff["task_id"], "cmd_r_task_2")
+        self.assertEqual(diff["fields"]["phase"], {"replayed": "implement", "stored": "blocked_design"})
+
+
+if __name__ == "__main__":
+    unittest.main()
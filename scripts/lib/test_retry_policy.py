@@ -0,0 +1,43 @@
+"""Unit tests for scripts/lib/retry_policy.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_retry_policy
+"""
+
+import os
+import random
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.retry_policy import RetryPolicy
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_delay_doubles_until_the_cap_without_jitter(self):
+        policy = RetryPolicy(base_delay_sec=1, max_delay_sec=5, jitter=0)
+        self.assertEqual([policy.delay_for(attempt) for attempt in range(1, 6)], [1, 2, 4, 5, 5])
+
+    def test_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(base_delay_sec=2, max_delay_sec=100, jitter=0.5, rng=random.Random(7))
+        for _ in range(200):
+            delay = policy.delay_for(3)
+            self.assertGreaterEqual(delay, 8)
+            self.assertLessEqual(delay, 12)
+
+    def test_should_retry_counts_attempts(self):
+        policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry(1))
+        self.assertTrue(policy.should_retry(2))
+        self.assertFalse(policy.should_retry(3))
+
+    def test_due_at_is_relative_to_now(self):
+        policy = RetryPolicy(base_delay_sec=4, jitter=0)
+        self.assertEqual(policy.due_at(1, now=100.0), 104.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
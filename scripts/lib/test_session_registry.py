@@ -0,0 +1,79 @@
+"""Unit tests for scripts/lib/session_registry.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_session_registry
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.session_registry import SessionRegistry, SessionSpec
+
+
+class SessionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.registry = SessionRegistry(os.path.join(self.tmpdir.name, "supervisor"))
+        self.addCleanup(self.registry.close)
+
+    def test_register_round_trips_and_unregister_removes(self):
+        spec = SessionSpec(repo_root="/work/app", session_id="feat", mode="hybrid", poll_interval_sec=2)
+        key = self.registry.register(spec)
+        self.assertTrue(key.startswith("app_"))
+        self.assertTrue(key.endswith("_feat"))
+        self.assertEqual(self.registry.entries(), {key: spec})
+        self.assertTrue(self.registry.unregister(key))
+        self.assertFalse(self.registry.unregister(key))
+        self.assertEqual(self.registry.entries(), {})
+
+    def test_keys_separate_repos_with_the_same_name(self):
+        first = SessionSpec(repo_root="/a/app")
+        second = SessionSpec(repo_root="/b/app")
+        self.assertNotEqual(first.key, second.key)
+        self.registry.register(first)
+        self.registry.register(second)
+        self.assertEqual(set(self.registry.entries().values()), {first, second})
+
+    def test_signature_changes_on_register_and_bad_entries_are_skipped(self):
+        before = self.registry.signature()
+        with open(os.path.join(self.registry.sessions_dir, "broken.json"), "w", encoding="utf-8") as fh:
+            fh.write('{"session_id": "x"}')
+        self.assertNotEqual(self.registry.signature(), before)
+        self.assertEqual(self.registry.entries(), {})
+
+
+    def test_entry_of_a_gone_owner_is_removed(self):
+        mine = SessionSpec(repo_root="/work/app", session_id="live")
+        key = self.registry.register(mine)
+        # Registers and exits without unregistering, like a killed attach process.
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; sys.path.insert(0, sys.argv[1]);"
+                "from lib.session_registry import SessionRegistry, SessionSpec;"
+                "SessionRegistry(sys.argv[2]).register(SessionSpec(repo_root='/work/app', session_id='dead'))",
+                SCRIPTS_DIR,
+                self.registry.root,
+            ],
+            check=True,
+        )
+        self.assertEqual(len(os.listdir(self.registry.sessions_dir)), 2)
+
+        self.assertEqual(self.registry.entries(), {key: mine})
+        self.assertEqual(os.listdir(self.registry.sessions_dir), [f"{key}.json"])
+        self.assertTrue(self.registry.owns(key))
+        self.registry.unregister(key)
+        self.assertFalse(self.registry.owns(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
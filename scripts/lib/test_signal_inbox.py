@@ -0,0 +1,92 @@
+"""Unit tests for scripts/lib/signal_inbox.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_signal_inbox
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import yb_orchestrator as orch
+from lib.signal_inbox import SignalInbox, drop_signal, inbox_dir_for_queue
+
+
+class SignalInboxTests(unittest.TestCase):
+    def setUp(self):
+        self.queue_dir = tempfile.mkdtemp(prefix="yb_signal_inbox_")
+        self.addCleanup(shutil.rmtree, self.queue_dir, True)
+        self.inbox_dir = inbox_dir_for_queue(self.queue_dir)
+        self.inbox = SignalInbox(self.inbox_dir)
+
+    def test_drop_and_read_roundtrip(self):
+        path = drop_signal(self.inbox_dir, {"task_id": "t1", "status": "completed"})
+        self.assertEqual(self.inbox.pending(), [path])
+        payload, err = self.inbox.read(path)
+        self.assertEqual(err, "")
+        self.assertEqual(payload, {"task_id": "t1", "status": "completed"})
+
+    def test_pending_is_in_arrival_order_and_skips_temp_files(self):
+        first = drop_signal(self.inbox_dir, {"n": 1})
+        second = drop_signal(self.inbox_dir, {"n": 2})
+        os.utime(first, ns=(1, 1))
+        with open(os.path.join(self.inbox_dir, ".tmp-abc.part"), "w", encoding="utf-8") as fh:
+            fh.write("{")
+        self.assertEqual(self.inbox.pending(), [first, second])
+
+    def test_invalid_file_is_reported_and_archived_to_failed(self):
+        path = os.path.join(self.inbox_dir, "bad.json")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("[1, 2]")
+        payload, err = self.inbox.read(path)
+        self.assertIsNone(payload)
+        self.assertIn("JSON object", err)
+
+        target = self.inbox.archive(path, ok=False)
+        self.assertEqual(os.path.dirname(target), self.inbox.failed_dir)
+        self.assertEqual(self.inbox.pending(), [])
+
+    def test_archive_missing_file_returns_empty(self):
+        self.assertEqual(self.inbox.archive(os.path.join(self.inbox_dir, "gone.json")), "")
+
+    def test_drop_rejects_non_object(self):
+        with self.assertRaises(ValueError):
+            drop_signal(self.inbox_dir, ["not", "a", "dict"])
+
+    def test_drain_leaves_files_in_the_inbox_until_the_caller_archives_them(self):
+        path = drop_signal(self.inbox_dir, {"task_id": "t1", "worker_id": "worker_001"})
+        ctx = types.SimpleNamespace(panes={"workers": {"worker_001": "0.2"}})
+
+        with mock.patch.object(orch, "_process_signal") as process:
+            consumed = orch._drain_signal_inbox(None, None, ctx, self.inbox)
+
+        self.assertEqual(consumed, [path])
+        self.assertEqual(process.call_args.kwargs["pane_id"], "0.2")
+        self.assertEqual(self.inbox.pending(), [path])
+
+    def test_prune_processed_drops_old_and_excess_files(self):
+        now = time.time()
+        for index in range(5):
+            path = os.path.join(self.inbox.processed_dir, f"{index}.json")
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("{}")
+            age = 10_000 if index == 0 else 5 - index
+            os.utime(path, (now - age, now - age))
+
+        removed = self.inbox.prune_processed(max_age_sec=3600, max_files=3, now=now)
+
+        self.assertEqual(removed, 2)
+        self.assertEqual(sorted(os.listdir(self.inbox.processed_dir)), ["2.json", "3.json", "4.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
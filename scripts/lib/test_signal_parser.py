@@ -0,0 +1,81 @@
+"""Unit tests for the JSON extractors in scripts/lib/signal_parser.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_signal_parser
+"""
+
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.signal_parser import (
+    _extract_json_object_from_text,
+    _extract_json_object_reverse,
+    extract_last_json_object,
+)
+
+SIGNAL = '{"mission": "completed", "task_id": "t1", "role": "implementer", "status": "completed"}'
+
+
+class ExtractLastJsonObjectTests(unittest.TestCase):
+    def assertMatchesForward(self, text):
+        self.assertEqual(_extract_json_object_reverse(text), _extract_json_object_from_text(text))
+
+    def test_returns_last_top_level_object(self):
+        text = 'noise {"a": 1}\ndiff: if (x) { y(); }\n' + SIGNAL + "\n$ "
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+        self.assertMatchesForward(text)
+
+    def test_nested_object_is_not_returned_alone(self):
+        text = 'out {"outer": {"inner": 1}, "s": "}{"}'
+        self.assertEqual(extract_last_json_object(text), {"outer": {"inner": 1}, "s": "}{"})
+        self.assertMatchesForward(text)
+
+    def test_escaped_quotes_and_braces_inside_strings(self):
+        text = r'{"msg": "say \"}\" and \\", "n": {"k": "{"}}'
+        self.assertEqual(extract_last_json_object(text), {"msg": 'say "}" and \\', "n": {"k": "{"}})
+        self.assertMatchesForward(text)
+
+    def test_skips_invalid_trailing_candidate(self):
+        text = SIGNAL + "\nfunction f() { return {a: 1}; }\n"
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+        self.assertMatchesForward(text)
+
+    def test_stray_brace_after_signal(self):
+        text = 'log {"status":"done","task_id":"t1"}\n$ echo }\n}\n> '
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+        self.assertMatchesForward(text)
+
+    def test_unmatched_quote_after_signal(self):
+        text = '{"status":"done"}\nsay "hi\n> '
+        self.assertEqual(extract_last_json_object(text), {"status": "done"})
+        self.assertMatchesForward(text)
+
+        text = '{"a": 1}\n{"s": "x"} say "hi'
+        self.assertEqual(extract_last_json_object(text), {"s": "x"})
+        self.assertMatchesForward(text)
+
+    def test_unbalanced_open_brace_before_signal(self):
+        text = "partial diff {\n  if (x) {\n" + SIGNAL
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+
+    def test_sentinel_line_takes_precedence(self):
+        text = "YB_SIGNAL " + SIGNAL + '\nlater output {"other": true}\n'
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+
+    def test_sentinel_mid_line_or_invalid_falls_back(self):
+        text = 'echo YB_SIGNAL {"task_id": "quoted"}\nYB_SIGNAL {broken\n' + SIGNAL
+        self.assertEqual(extract_last_json_object(text)["task_id"], "t1")
+
+    def test_no_object(self):
+        self.assertIsNone(extract_last_json_object("plain text } { [1, 2]"))
+        self.assertIsNone(extract_last_json_object("   "))
+        self.assertIsNone(extract_last_json_object(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Unit tests for scripts/lib/signal_ring.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_signal_ring
+"""
+
+import copy
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.signal_ring import SignalRing
+
+
+class SignalRingTests(unittest.TestCase):
+    def test_evicts_oldest_and_forgets_evicted_hashes(self):
+        ring = SignalRing(["a", "b"], maxlen=3)
+        ring.append("c")
+        ring.append("d")
+        self.assertEqual(ring, ["b", "c", "d"])
+        self.assertNotIn("a", ring)
+        self.assertIn("b", ring)
+
+    def test_duplicate_entries_stay_indexed_until_last_copy_evicted(self):
+        ring = SignalRing(["a", "b", "a"], maxlen=3)
+        ring.append("c")
+        self.assertIn("a", ring)
+        ring.append("d")
+        self.assertIn("a", ring)
+        ring.append("e")
+        self.assertNotIn("a", ring)
+
+    def test_loading_longer_history_keeps_newest(self):
+        ring = SignalRing([str(idx) for idx in range(10)], maxlen=4)
+        self.assertEqual(ring.to_list(), ["6", "7", "8", "9"])
+        self.assertEqual(len(ring), 4)
+
+    def test_deepcopy_is_independent(self):
+        ring = SignalRing(["a"], maxlen=2)
+        clone = copy.deepcopy(ring)
+        clone.append("b")
+        clone.append("c")
+        self.assertEqual(ring, ["a"])
+        self.assertIn("a", ring)
+        self.assertNotIn("a", clone)
+
+
+if __name__ == "__main__":
+    unittest.main()
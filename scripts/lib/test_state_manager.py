@@ -0,0 +1,317 @@
+"""Unit tests for dirty tracking and the journal/sqlite backends in scripts/lib/state_manager.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_state_manager
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.state_manager import StateManager
+from lib.state_sqlite import SqliteStateStore
+
+
+class StateManagerDirtyTrackingTests(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="yb_state_")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+        self.sm = StateManager(self.state_dir)
+
+    def test_first_save_writes_defaults_then_noop(self):
+        self.assertTrue(self.sm.dirty)
+        self.assertTrue(self.sm.save())
+        self.assertTrue(os.path.exists(self.sm.state_path))
+        self.assertFalse(self.sm.save())
+        stats = self.sm.io_stats
+        self.assertEqual(stats["saves_written"], 1)
+        self.assertEqual(stats["saves_skipped"], 1)
+        self.assertEqual(stats["fsyncs"], 2)
+        self.assertEqual(stats["bytes_written"], os.path.getsize(self.sm.state_path))
+
+    def test_mutations_mark_dirty(self):
+        self.sm.save()
+        self.sm.add_processed_signal("abc")
+        self.assertTrue(self.sm.save())
+
+        self.sm.update_timestamp("t1:0.1", 5)
+        self.assertTrue(self.sm.save())
+        self.sm.update_timestamp("t1:0.1", 5)
+        self.assertFalse(self.sm.save())
+
+        self.sm.update_task_state("t1", phase="implement", loop_count=0, assigned_worker="w1")
+        self.assertTrue(self.sm.save())
+        self.sm.remove_task_state("missing")
+        self.assertFalse(self.sm.save())
+
+    def test_direct_edits_need_mark_dirty(self):
+        self.sm.save()
+        self.sm.state["mode"] = "v2"
+        self.assertFalse(self.sm.save())
+        self.sm.mark_dirty()
+        self.assertTrue(self.sm.save())
+
+    def test_load_skips_unchanged_file_and_rereads_external_change(self):
+        self.sm.add_processed_signal("abc")
+        self.sm.save()
+        self.sm.load()
+        self.assertEqual(self.sm.io_stats["loads_skipped"], 1)
+
+        with open(self.sm.state_path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        data["processedSignals"] = ["external"]
+        with open(self.sm.state_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=4)
+        self.sm.load()
+        self.assertTrue(self.sm.is_duplicate_signal("external"))
+        self.assertFalse(self.sm.dirty)
+
+    def test_deleted_file_is_rewritten(self):
+        self.sm.save()
+        os.unlink(self.sm.state_path)
+        self.assertTrue(self.sm.save())
+
+    def test_lock_state_change_marks_dirty(self):
+        self.sm.save()
+        self.assertTrue(self.sm.acquire_lock("dispatch"))
+        self.assertTrue(self.sm.save())
+        self.assertTrue(self.sm.state["locks"]["dispatch"])
+        self.assertFalse(self.sm.save())
+        self.sm.release_lock("dispatch")
+        self.assertTrue(self.sm.save())
+
+    def test_lock_waits_for_other_holder(self):
+        other = StateManager(self.state_dir)
+        self.addCleanup(other.close)
+        self.assertTrue(other.acquire_lock("collect"))
+        self.assertEqual(self.sm.acquire_lock("collect").reason, "busy")
+        threading.Timer(0.05, other.release_lock, args=("collect",)).start()
+        result = self.sm.acquire_lock("collect", timeout_sec=5)
+        self.assertTrue(result)
+        self.assertGreater(result.waited_sec, 0)
+        self.sm.release_lock("collect")
+
+
+class StateManagerJournalBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="yb_state_journal_")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def _open(self, **kwargs):
+        sm = StateManager(self.state_dir, backend=StateManager.BACKEND_JOURNAL, **kwargs)
+        self.addCleanup(sm.close)
+        return sm
+
+    def test_replay_restores_mutations_without_snapshot(self):
+        sm = self._open()
+        sm.add_processed_signal("h1")
+        sm.update_timestamp("t1:0.1", 10)
+        sm.update_task_state("t1", phase="review", loop_count=1, assigned_worker="w1", cmd_id="c1")
+        sm.update_task_state("t2", phase="implement", loop_count=0, assigned_worker="w2")
+        sm.remove_task_state("t2")
+        sm.state["mode"] = "v2"
+        sm.mark_dirty()
+        self.assertTrue(sm.save())
+        self.assertFalse(os.path.exists(sm.state_path))
+        sm.close()
+
+        reloaded = self._open()
+        self.assertTrue(reloaded.is_duplicate_signal("h1"))
+        self.assertFalse(reloaded.check_timestamp_guard("t1:0.1", 10))
+        self.assertEqual(reloaded.get_task_state("t1")["cmd_id"], "c1")
+        self.assertIsNone(reloaded.get_task_state("t2"))
+        self.assertEqual(reloaded.state["mode"], "v2")
+        self.assertFalse(reloaded.dirty)
+
+    def test_meta_change_is_clean_after_save(self):
+        sm = self._open()
+        sm.state["mode"] = "v2"
+        sm.mark_dirty()
+        self.assertTrue(sm.save())
+        self.assertFalse(sm.dirty)
+        self.assertFalse(sm.save())
+
+    def test_save_appends_only_the_change(self):
+        sm = self._open()
+        for idx in range(200):
+            sm.add_processed_signal(f"{idx:064x}")
+        sm.save()
+        before = sm.io_stats["bytes_written"]
+        sm.add_processed_signal("f" * 64)
+        sm.save()
+        self.assertLess(sm.io_stats["bytes_written"] - before, 200)
+        self.assertEqual(sm.io_stats["fsyncs"], 2)
+
+    def test_background_compaction_writes_snapshot_and_trims_journal(self):
+        sm = self._open(max_signals=50)
+        sm.JOURNAL_COMPACT_RECORDS = 10
+        for idx in range(25):
+            sm.add_processed_signal(f"h{idx}")
+            sm.save()
+        sm.close()
+        self.assertGreaterEqual(sm.io_stats["compactions"], 2)
+        with open(sm.state_path, "r", encoding="utf-8") as fh:
+            snapshot = json.load(fh)
+        self.assertGreater(snapshot[StateManager.JOURNAL_SEQ_KEY], 0)
+        self.assertFalse(os.path.exists(sm._journal.rotated_path))
+
+        reloaded = self._open(max_signals=50)
+        self.assertEqual(reloaded.state["processedSignals"], [f"h{idx}" for idx in range(25)])
+        self.assertNotIn(StateManager.JOURNAL_SEQ_KEY, reloaded.state)
+
+    def test_torn_journal_tail_is_ignored(self):
+        sm = self._open()
+        sm.add_processed_signal("h1")
+        sm.save()
+        sm.close()
+        with open(os.path.join(self.state_dir, StateManager.JOURNAL_FILENAME), "a", encoding="utf-8") as fh:
+            fh.write('{"op": "add_processed_signal", "sig_')
+        reloaded = self._open()
+        self.assertEqual(reloaded.state["processedSignals"], ["h1"])
+
+    def test_append_after_a_torn_tail_keeps_the_next_batch(self):
+        journal_path = os.path.join(self.state_dir, StateManager.JOURNAL_FILENAME)
+        sm = self._open()
+        sm.add_processed_signal("h1")
+        sm.save()
+        sm.close()
+        with open(journal_path, "a", encoding="utf-8") as fh:
+            fh.write('{"op": "add_processed_signal", "sig_')
+
+        sm = self._open()
+        sm.add_processed_signal("h2")
+        sm.save()
+        sm.add_processed_signal("h3")
+        sm.save()
+        sm.close()
+
+        reloaded = self._open()
+        self.assertEqual(reloaded.state["processedSignals"], ["h1", "h2", "h3"])
+
+    def test_forced_save_folds_journal_into_snapshot(self):
+        sm = self._open()
+        sm.add_processed_signal("h1")
+        sm.save(force=True)
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, StateManager.JOURNAL_FILENAME)))
+        reloaded = self._open()
+        self.assertEqual(reloaded.state["processedSignals"], ["h1"])
+
+
+class StateManagerSqliteBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="yb_state_sqlite_")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def _open(self, **kwargs):
+        sm = StateManager(self.state_dir, backend=StateManager.BACKEND_SQLITE, **kwargs)
+        self.addCleanup(sm.close)
+        return sm
+
+    def test_roundtrip_and_bounded_signal_history(self):
+        sm = self._open(max_signals=3)
+        for idx in range(5):
+            sm.add_processed_signal(f"h{idx}")
+        sm.update_timestamp("t1:0.1", 7)
+        sm.update_task_state("t1", phase="review", loop_count=2, assigned_worker="w1")
+        self.assertTrue(sm.save())
+        self.assertFalse(sm.save())
+        sm.close()
+
+        reloaded = self._open(max_signals=3)
+        self.assertEqual(reloaded.state["processedSignals"], ["h2", "h3", "h4"])
+        self.assertEqual(reloaded.state["lastTimestampByTaskPane"], {"t1:0.1": 7})
+        self.assertEqual(reloaded.get_task_state("t1")["loop_count"], 2)
+        self.assertFalse(reloaded.dirty)
+
+    def test_migrates_existing_json_state_once(self):
+        legacy = StateManager(self.state_dir)
+        legacy.add_processed_signal("legacy")
+        legacy.update_task_state("t9", phase="implement", loop_count=0, assigned_worker="w9")
+        legacy.save()
+
+        sm = self._open()
+        self.assertTrue(sm.is_duplicate_signal("legacy"))
+        self.assertEqual(sm.get_task_state("t9")["assigned_worker"], "w9")
+        self.assertFalse(os.path.exists(sm.state_path))
+        self.assertTrue(os.path.exists(sm.state_path + StateManager.MIGRATED_SUFFIX))
+
+    def test_load_rereads_only_after_another_connection_commits(self):
+        sm = self._open()
+        sm.save()
+        sm.load()
+        self.assertEqual(sm.io_stats["loads_skipped"], 1)
+
+        other = SqliteStateStore(os.path.join(self.state_dir, StateManager.SQLITE_FILENAME))
+        self.addCleanup(other.close)
+        other.apply([{"op": "add_processed_signal", "sig_hash": "external"}], max_signals=10)
+        sm.load()
+        self.assertTrue(sm.is_duplicate_signal("external"))
+
+        reader = SqliteStateStore(os.path.join(self.state_dir, StateManager.SQLITE_FILENAME), read_only=True)
+        self.addCleanup(reader.close)
+        self.assertTrue(reader.has_signal("external"))
+
+
+class StateManagerPendingRetryTests(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="yb_state_retry_")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def _roundtrip(self, backend):
+        sm = StateManager(self.state_dir, backend=backend)
+        sm.set_pending_retry("collect-1", {"action": {"type": "collect", "task_id": "t1"}, "attempt": 2, "due_at": 5.0})
+        sm.set_pending_retry("dispatch-2", {"action": {"type": "dispatch", "task_id": "t2"}, "attempt": 3, "due_at": 9.0})
+        sm.remove_pending_retry("collect-1")
+        sm.remove_pending_retry("missing")
+        self.assertTrue(sm.save())
+        sm.close()
+        reloaded = StateManager(self.state_dir, backend=backend)
+        self.addCleanup(reloaded.close)
+        return reloaded.get_pending_retries()
+
+    def test_pending_retries_survive_restart_on_every_backend(self):
+        for backend in StateManager.VALID_BACKENDS:
+            with self.subTest(backend=backend):
+                shutil.rmtree(self.state_dir, True)
+                os.makedirs(self.state_dir)
+                retries = self._roundtrip(backend)
+                self.assertEqual(list(retries), ["dispatch-2"])
+                self.assertEqual(retries["dispatch-2"]["attempt"], 3)
+
+
+class StateManagerForcedSaveTests(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="yb_state_force_")
+        self.addCleanup(shutil.rmtree, self.state_dir, True)
+
+    def test_forced_save_with_signal_history_on_every_backend(self):
+        for backend in StateManager.VALID_BACKENDS:
+            with self.subTest(backend=backend):
+                shutil.rmtree(self.state_dir, True)
+                os.makedirs(self.state_dir)
+                sm = StateManager(self.state_dir, backend=backend)
+                sm.add_processed_signal("h1")
+                sm.update_task_state("t1", phase="review", loop_count=1, assigned_worker="w1")
+                self.assertTrue(sm.save())
+                sm.add_processed_signal("h2")
+
+                self.assertTrue(sm.save(force=True))
+                self.assertFalse(sm.dirty)
+                sm.close()
+
+                reloaded = StateManager(self.state_dir, backend=backend)
+                self.addCleanup(reloaded.close)
+                self.assertEqual(list(reloaded.state["processedSignals"]), ["h1", "h2"])
+                self.assertEqual(reloaded.get_task_state("t1")["phase"], "review")
+
+
+if __name__ == "__main__":
+    unittest.main()
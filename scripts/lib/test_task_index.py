@@ -0,0 +1,87 @@
+"""Unit tests for scripts/lib/task_index.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_task_index
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib import task_index
+from lib.task_index import TaskMetadataIndex
+
+
+def _read_header(path):
+    header = {}
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            key, _, value = line.partition(":")
+            header[key.strip()] = value.strip()
+    return header
+
+
+class TaskMetadataIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tasks_dir = tempfile.mkdtemp(prefix="yb_task_index_")
+        self.addCleanup(shutil.rmtree, self.tasks_dir, True)
+        self.index = TaskMetadataIndex(self.tasks_dir, _read_header)
+        self._old_window = task_index.RACY_MTIME_WINDOW_NS
+        self.addCleanup(setattr, task_index, "RACY_MTIME_WINDOW_NS", self._old_window)
+        task_index.RACY_MTIME_WINDOW_NS = 0
+
+    def _write(self, name, task_id, parent_cmd_id="", status="assigned"):
+        path = os.path.join(self.tasks_dir, name)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(f"task_id: {task_id}\nparent_cmd_id: {parent_cmd_id}\nstatus: {status}\n")
+        return path
+
+    def test_lookup_prefers_assigned_worker_file(self):
+        first = self._write("worker_001.yaml", "cmd_1_task_1")
+        second = self._write("worker_002.yaml", "cmd_1_task_1")
+        self.assertEqual(self.index.find_path("cmd_1_task_1"), first)
+        self.assertEqual(self.index.find_path("cmd_1_task_1", second), second)
+        self.assertEqual(self.index.find_path("missing"), "")
+
+    def test_unchanged_files_are_not_reparsed(self):
+        self._write("worker_001.yaml", "t1")
+        self._write("worker_002.yaml", "t2")
+        self.index.refresh()
+        self.assertEqual(self.index.parses, 2)
+        self.index.find_path("t1")
+        self.index.headers_for_cmd("")
+        self.assertEqual(self.index.parses, 2)
+
+        self._write("worker_002.yaml", "t2-renamed-task")
+        self.assertEqual(self.index.find_path("t2-renamed-task"), os.path.join(self.tasks_dir, "worker_002.yaml"))
+        self.assertEqual(self.index.parses, 3)
+
+    def test_cmd_lookup_matches_parent_and_task_id_prefix(self):
+        self._write("worker_001.yaml", "cmd_7_task_1")
+        self._write("worker_002.yaml", "other", parent_cmd_id="cmd_7")
+        self._write("worker_003.yaml", "cmd_70_task_1")
+        ids = sorted(header["task_id"] for header in self.index.headers_for_cmd("cmd_7"))
+        self.assertEqual(ids, ["cmd_7_task_1", "other"])
+
+    def test_removed_file_drops_out(self):
+        path = self._write("worker_001.yaml", "t1")
+        self.assertEqual(self.index.find_path("t1"), path)
+        os.unlink(path)
+        self.assertEqual(self.index.find_path("t1"), "")
+
+    def test_recent_mtime_is_reparsed(self):
+        task_index.RACY_MTIME_WINDOW_NS = 60 * 1_000_000_000
+        self._write("worker_001.yaml", "t1")
+        self.index.refresh()
+        self.index.refresh()
+        self.assertEqual(self.index.parses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
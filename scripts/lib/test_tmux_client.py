@@ -0,0 +1,151 @@
+"""Unit tests for scripts/lib/tmux_client.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_tmux_client
+"""
+
+import io
+import os
+import queue
+import sys
+import threading
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.tmux_client import (
+    CONTROL_MODE_ENV,
+    TmuxClient,
+    build_control_line,
+    quote_control_arg,
+)
+
+
+class _FakeProc:
+    def __init__(self, output: bytes):
+        self.stdout = io.BytesIO(output)
+
+
+class _PipelinedTmux:
+    """Fake ``tmux -C``: replies only after ``hold`` commands are queued, then in order."""
+
+    def __init__(self, hold: int):
+        cmd_read, cmd_write = os.pipe()
+        out_read, out_write = os.pipe()
+        self.stdin = os.fdopen(cmd_write, "wb")
+        self.stdout = os.fdopen(out_read, "rb")
+        self._commands = os.fdopen(cmd_read, "rb")
+        self._replies = os.fdopen(out_write, "wb")
+        self._hold = hold
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        self._replies.write(b"%begin 1 1 0\n%end 1 1 0\n")
+        self._replies.flush()
+        pending = []
+        for number, raw in enumerate(self._commands, start=2):
+            pending.append((number, raw.decode("utf-8").split(" ")[-1].strip().strip("'")))
+            if len(pending) < self._hold:
+                continue
+            for reply_id, target in pending:
+                block = f"%begin {reply_id} {reply_id} 1\nout {target}\n%end {reply_id} {reply_id} 1\n"
+                self._replies.write(block.encode())
+            self._replies.flush()
+            pending = []
+        self._replies.close()
+
+    def poll(self):
+        return None if self._thread.is_alive() else 0
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return 0
+
+    def kill(self):
+        pass
+
+
+class QuoteControlArgTests(unittest.TestCase):
+    def test_single_quote_is_escaped(self):
+        self.assertEqual(quote_control_arg("it's"), "'it'\"'\"'s'")
+
+    def test_newline_is_not_representable(self):
+        self.assertIsNone(quote_control_arg("a\nb"))
+
+    def test_command_name_is_not_quoted(self):
+        line = build_control_line(["send-keys", "-t", "s:0.1", "echo $HOME; x"])
+        self.assertEqual(line, "send-keys '-t' 's:0.1' 'echo $HOME; x'\n")
+
+    def test_build_control_line_rejects_multiline_argument(self):
+        self.assertIsNone(build_control_line(["send-keys", "-t", "s:0.1", "a\nb"]))
+
+
+class ReaderLoopTests(unittest.TestCase):
+    def _read_blocks(self, output: bytes):
+        blocks = queue.Queue()
+        TmuxClient._reader_loop(_FakeProc(output), blocks)
+        items = []
+        while not blocks.empty():
+            items.append(blocks.get_nowait())
+        return items
+
+    def test_attach_block_and_notifications_are_skipped(self):
+        output = (
+            b"%begin 1 10 0\n%end 1 10 0\n"
+            b"%session-changed $1 s\n"
+            b"%begin 2 11 1\nline one\n{\"a\": 1}\n%end 2 11 1\n"
+        )
+        self.assertEqual(self._read_blocks(output), [(True, ["line one", '{"a": 1}']), None])
+
+    def test_error_block_is_reported_as_failure(self):
+        output = b"%begin 3 12 1\nparse error: unknown command: x\n%error 3 12 1\n"
+        self.assertEqual(
+            self._read_blocks(output),
+            [(False, ["parse error: unknown command: x"]), None],
+        )
+
+    def test_end_marker_with_other_id_stays_in_output(self):
+        output = b"%begin 4 13 1\n%end 9 99 1\n%end 4 13 1\n"
+        self.assertEqual(self._read_blocks(output), [(True, ["%end 9 99 1"]), None])
+
+
+class PipeliningTests(unittest.TestCase):
+    def test_concurrent_commands_share_the_connection_without_waiting_for_each_other(self):
+        fake = _PipelinedTmux(hold=2)
+        with mock.patch.dict(os.environ, {CONTROL_MODE_ENV: "1"}):
+            client = TmuxClient("session", command_timeout_sec=2.0)
+        self.addCleanup(client.close)
+        results = {}
+
+        def capture(pane):
+            results[pane] = client.run(["display-message", "-p", pane])
+
+        with mock.patch("lib.tmux_client.subprocess.Popen", return_value=fake):
+            threads = [threading.Thread(target=capture, args=(pane,)) for pane in ("0.1", "0.2")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        # With a lock held across the round trip the second command could never be sent.
+        outputs = {pane: result.stdout for pane, result in results.items()}
+        self.assertEqual(outputs, {"0.1": "out 0.1\n", "0.2": "out 0.2\n"})
+        self.assertTrue(all(result.via_control for result in results.values()))
+
+
+class FallbackTests(unittest.TestCase):
+    def test_env_switch_disables_control_mode(self):
+        with mock.patch.dict(os.environ, {CONTROL_MODE_ENV: "0"}):
+            client = TmuxClient("session")
+        with mock.patch.object(TmuxClient, "_run_subprocess", return_value=mock.sentinel.result) as run:
+            self.assertIs(client.send_keys("session:0.1", "Enter"), mock.sentinel.result)
+        run.assert_called_once_with(["send-keys", "-t", "session:0.1", "Enter"])
+        self.assertFalse(client.control_active)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Unit tests for scripts/lib/tracing.py.
+
+Run:
+    python3 -m unittest scripts.lib.test_tracing
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from lib.tracing import NULL_TRACER, Tracer, load_spans, summarize_spans, trace_files
+
+
+class TracerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "orchestrator-trace.jsonl")
+
+    def _records(self):
+        with open(self.path, "r", encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_nested_spans_are_written_when_the_root_closes(self):
+        tracer = Tracer(self.path)
+        with tracer.span("cycle"):
+            with tracer.span("pane", pane_id="0.1"):
+                with tracer.span("transition", task_id="t1", role="reviewer"):
+                    pass
+                tracer.add_span("action.dispatch", 0.25, task_id="t1")
+            self.assertFalse(os.path.exists(self.path))
+
+        records = {record["name"]: record for record in self._records()}
+        self.assertEqual(set(records), {"cycle", "pane", "transition", "action.dispatch"})
+        self.assertNotIn("parent", records["cycle"])
+        self.assertEqual(records["pane"]["parent"], records["cycle"]["span"])
+        self.assertEqual(records["transition"]["parent"], records["pane"]["span"])
+        self.assertEqual(records["action.dispatch"]["parent"], records["pane"]["span"])
+        self.assertEqual(records["transition"]["tags"], {"task_id": "t1", "role": "reviewer"})
+        self.assertEqual(records["action.dispatch"]["ms"], 250.0)
+        self.assertEqual({record["trace"] for record in records.values()}, {records["cycle"]["trace"]})
+
+    def test_exception_is_tagged_and_rotation_keeps_backups(self):
+        tracer = Tracer(self.path, max_bytes=200, backups=2)
+        with self.assertRaises(RuntimeError):
+            with tracer.span("cycle"):
+                raise RuntimeError("boom")
+        self.assertEqual(self._records()[0]["tags"], {"error": "RuntimeError"})
+        for _ in range(6):
+            with tracer.span("cycle", session="a-fairly-long-session-name"):
+                pass
+        self.assertEqual(trace_files(self.path, 2), [f"{self.path}.2", f"{self.path}.1", self.path])
+        self.assertFalse(os.path.exists(f"{self.path}.3"))
+
+    def test_null_tracer_writes_nothing(self):
+        with NULL_TRACER.span("cycle") as span:
+            span.set_tag("task_id", "t1")
+        NULL_TRACER.add_span("capture.pane", 0.1)
+        NULL_TRACER.flush()
+        self.assertFalse(NULL_TRACER.enabled)
+
+    def test_summary_percentiles_and_window(self):
+        lines = [{"ts": 100.0 + i, "name": "state.save", "ms": float(i + 1)} for i in range(10)]
+        lines.append({"ts": 50.0, "name": "state.save", "ms": 999.0})
+        lines.append({"ts": 105.0, "name": "transition", "ms": 2.0, "tags": {"role": "reviewer"}})
+        with open(self.path, "w", encoding="utf-8") as fh:
+            fh.write("not json\n")
+            for line in lines:
+                fh.write(json.dumps(line) + "\n")
+
+        rows = summarize_spans(load_spans([self.path], since_ts=90.0))
+        self.assertEqual(
+            rows[0],
+            {
+                "name": "state.save",
+                "count": 10,
+                "p50_ms": 5.0,
+                "p90_ms": 9.0,
+                "p99_ms": 10.0,
+                "max_ms": 10.0,
+                "total_ms": 55.0,
+            },
+        )
+        grouped = summarize_spans(load_spans([self.path], since_ts=90.0), group_by="role")
+        self.assertEqual([row["name"] for row in grouped], ["state.save[-]", "transition[reviewer]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,349 @@
+"""tmux command client backed by a persistent control-mode connection.
+
+Every ``tmux capture-pane`` / ``tmux send-keys`` normally forks a new tmux
+client.  ``TmuxClient`` keeps one ``tmux -C attach-session`` process per
+session and writes commands over its stdin instead, falling back to plain
+subprocess calls when control mode is unavailable (old tmux, missing session,
+broken pipe, or ``YB_TMUX_CONTROL_MODE=0``).  Commands from several threads
+are pipelined: each is written under a short lock and its ``%begin``/``%end``
+reply is matched in FIFO order, so concurrent captures overlap instead of
+queueing behind each other's round trip.
+
+Usage from scripts under ORCH_ROOT:
+    sys.path.insert(0, os.path.join(ORCH_ROOT, "scripts", "lib"))
+    from tmux_client import shared_client
+    shared_client(session).send_keys(f"{session}:{pane}", "echo hi", "Enter")
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+CONTROL_MODE_ENV = "YB_TMUX_CONTROL_MODE"
+CONTROL_CLIENT_FLAGS = "no-output,ignore-size"
+DEFAULT_COMMAND_TIMEOUT_SEC = 5.0
+RECONNECT_COOLDOWN_SEC = 30.0
+
+
+@dataclass(frozen=True)
+class TmuxResult:
+    returncode: int
+    stdout: str
+    stderr: str
+    via_control: bool = False
+
+
+def _warn(message: str) -> None:
+    print(f"warning: tmux_client: {message}", file=sys.stderr)
+
+
+Block = Optional[Tuple[bool, List[str]]]
+
+
+class _Reply:
+    __slots__ = ("event", "block")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.block: Block = None
+
+
+class _ReplyRouter:
+    """Hand reply blocks to the commands waiting for them, in the order they were sent.
+
+    tmux answers control-mode commands strictly in order, so a FIFO of
+    outstanding replies is enough; ``put(None)`` (connection gone) fails every
+    command still waiting.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiting: Deque[_Reply] = collections.deque()
+        self._closed = False
+
+    def expect(self) -> Optional[_Reply]:
+        with self._lock:
+            if self._closed:
+                return None
+            reply = _Reply()
+            self._waiting.append(reply)
+            return reply
+
+    def put(self, block: Block) -> None:
+        with self._lock:
+            if block is None:
+                self._closed = True
+                done, self._waiting = list(self._waiting), collections.deque()
+            elif self._waiting:
+                done = [self._waiting.popleft()]
+            else:
+                return
+        for reply in done:
+            reply.block = block
+            reply.event.set()
+
+
+def control_mode_enabled_by_env() -> bool:
+    value = os.environ.get(CONTROL_MODE_ENV, "").strip().lower()
+    return value not in {"0", "false", "no", "off"}
+
+
+def quote_control_arg(value: str) -> Optional[str]:
+    """Quote one argument for the tmux command parser (None if not representable)."""
+    text = str(value)
+    if "\n" in text or "\r" in text:
+        return None
+    return "'" + text.replace("'", "'\"'\"'") + "'"
+
+
+def build_control_line(args: Sequence[str]) -> Optional[str]:
+    quoted: List[str] = []
+    for index, arg in enumerate(args):
+        if index == 0:
+            quoted.append(str(arg))
+            continue
+        token = quote_control_arg(arg)
+        if token is None:
+            return None
+        quoted.append(token)
+    return " ".join(quoted) + "\n"
+
+
+class TmuxClient:
+    """Issue tmux commands over one control-mode pipe with subprocess fallback."""
+
+    def __init__(
+        self,
+        session: str = "",
+        *,
+        control_mode: bool = True,
+        command_timeout_sec: float = DEFAULT_COMMAND_TIMEOUT_SEC,
+    ):
+        self.session = str(session or "")
+        self.command_timeout_sec = max(0.1, float(command_timeout_sec))
+        self._control_wanted = bool(control_mode) and bool(self.session) and control_mode_enabled_by_env()
+        self._proc: Optional[subprocess.Popen] = None
+        self._router = _ReplyRouter()
+        # Guards connection setup/teardown and the write of each command, not the wait for its reply.
+        self._lock = threading.Lock()
+        self._retry_after = 0.0
+
+    @property
+    def control_active(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start_control(self) -> bool:
+        if self.control_active:
+            return True
+        if not self._control_wanted or time.monotonic() < self._retry_after:
+            return False
+
+        command = ["tmux", "-C", "attach-session", "-t", self.session, "-f", CONTROL_CLIENT_FLAGS]
+        try:
+            proc = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            _warn(f"failed to start control-mode client for session '{self.session}': {exc}")
+            self._retry_after = time.monotonic() + RECONNECT_COOLDOWN_SEC
+            return False
+
+        router = _ReplyRouter()
+        reader = threading.Thread(
+            target=self._reader_loop,
+            args=(proc, router),
+            name=f"yb-tmux-control-{self.session}",
+            daemon=True,
+        )
+        reader.start()
+        self._proc = proc
+        self._router = router
+        return True
+
+    @staticmethod
+    def _reader_loop(proc: subprocess.Popen, blocks: _ReplyRouter) -> None:
+        stream = proc.stdout
+        if stream is None:
+            blocks.put(None)
+            return
+
+        current_id = ""
+        from_client = False
+        lines: List[str] = []
+        in_block = False
+        try:
+            for raw_line in stream:
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\n")
+                if not in_block:
+                    if line.startswith("%begin "):
+                        parts = line.split(" ")
+                        current_id = " ".join(parts[1:3])
+                        from_client = len(parts) > 3 and parts[3].isdigit() and int(parts[3]) & 1 == 1
+                        lines = []
+                        in_block = True
+                    continue
+
+                if line.startswith("%end ") or line.startswith("%error "):
+                    parts = line.split(" ")
+                    if " ".join(parts[1:3]) == current_id:
+                        in_block = False
+                        if from_client:
+                            blocks.put((line.startswith("%end "), lines))
+                        continue
+                lines.append(line)
+        except (OSError, ValueError):
+            pass
+        blocks.put(None)
+
+    def _stop_control(self, *, cooldown: bool) -> None:
+        proc = self._proc
+        self._proc = None
+        if cooldown:
+            self._retry_after = time.monotonic() + RECONNECT_COOLDOWN_SEC
+        if proc is None:
+            return
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            try:
+                proc.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def _drop_connection(self, proc: subprocess.Popen) -> None:
+        """Tear down ``proc`` unless another thread already replaced it."""
+        with self._lock:
+            if self._proc is proc:
+                self._stop_control(cooldown=True)
+
+    def _run_control(self, args: Sequence[str]) -> Optional[TmuxResult]:
+        """Run over control mode; None means the command was not sent and may fall back."""
+        line = build_control_line(args)
+        if line is None:
+            return None
+
+        with self._lock:
+            if not self._start_control():
+                return None
+            proc = self._proc
+            if proc is None or proc.stdin is None:
+                return None
+            reply = self._router.expect()
+            if reply is None:
+                self._stop_control(cooldown=True)
+                return None
+            try:
+                proc.stdin.write(line.encode("utf-8"))
+                proc.stdin.flush()
+            except (OSError, ValueError):
+                self._stop_control(cooldown=True)
+                return None
+
+        if not reply.event.wait(self.command_timeout_sec):
+            # The command may already have run; never replay it via fallback.
+            self._drop_connection(proc)
+            return TmuxResult(1, "", f"tmux control-mode timeout: {args[0]}", via_control=True)
+        block = reply.block
+        if block is None:
+            # Connection lost after the write: same rule, report instead of replaying.
+            self._drop_connection(proc)
+            return TmuxResult(1, "", f"tmux control-mode connection lost: {args[0]}", via_control=True)
+
+        ok, output_lines = block
+        text = "\n".join(output_lines)
+        if ok:
+            return TmuxResult(0, text + "\n" if output_lines else "", "", via_control=True)
+        return TmuxResult(1, "", text or f"tmux {args[0]} failed", via_control=True)
+
+    @staticmethod
+    def _run_subprocess(args: Sequence[str]) -> TmuxResult:
+        try:
+            proc = subprocess.run(["tmux", *args], capture_output=True, text=True, check=False)
+        except OSError as exc:
+            return TmuxResult(127, "", str(exc))
+        return TmuxResult(proc.returncode, proc.stdout, proc.stderr)
+
+    def run(self, args: Sequence[str]) -> TmuxResult:
+        tokens = [str(arg) for arg in args]
+        if not tokens:
+            return TmuxResult(2, "", "empty tmux command")
+        result = self._run_control(tokens)
+        if result is not None:
+            return result
+        return self._run_subprocess(tokens)
+
+    def capture_pane(self, target: str, *, start_line: Optional[int] = None) -> TmuxResult:
+        args = ["capture-pane", "-t", target, "-p"]
+        if start_line is not None:
+            args.extend(["-S", str(start_line)])
+        return self.run(args)
+
+    def send_keys(self, target: str, *keys: str) -> TmuxResult:
+        return self.run(["send-keys", "-t", target, *keys])
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_control(cooldown=False)
+
+    def __enter__(self) -> "TmuxClient":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+_SHARED_CLIENTS: Dict[str, TmuxClient] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_client(session: str, *, control_mode: bool = True) -> TmuxClient:
+    """Return the process-wide client for ``session`` (created on first use)."""
+    key = str(session or "")
+    with _SHARED_LOCK:
+        client = _SHARED_CLIENTS.get(key)
+        if client is None:
+            client = TmuxClient(key, control_mode=control_mode)
+            _SHARED_CLIENTS[key] = client
+        return client
+
+
+def close_shared_clients() -> None:
+    with _SHARED_LOCK:
+        clients = list(_SHARED_CLIENTS.values())
+        _SHARED_CLIENTS.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_shared_clients)
+
+
+__all__ = [
+    "TmuxClient",
+    "TmuxResult",
+    "build_control_line",
+    "close_shared_clients",
+    "control_mode_enabled_by_env",
+    "quote_control_arg",
+    "shared_client",
+]
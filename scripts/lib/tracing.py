@@ -0,0 +1,324 @@
+"""Span-level timing of orchestrator cycles, written to a rotating JSONL file.
+
+``Tracer.span(name, **tags)`` times a block with ``time.monotonic`` and nests
+under the span already open on the same thread; a span opened with nothing
+around it is the root of a new trace (one orchestrator cycle).  Finished
+spans are buffered and appended in one write when their root closes, so a
+cycle costs one ``write`` however many spans it has.  ``add_span`` records
+work timed elsewhere (a pane capture on a pool thread, an action subprocess)
+under the current span.
+
+One line per span::
+
+    {"ts": 1760000000.123, "trace": "1f2a-17", "span": 4, "parent": 1,
+     "name": "transition", "ms": 0.412, "tags": {"task_id": "t1", "role": "reviewer"}}
+
+``load_spans``/``summarize_spans`` read the file and its rotated siblings
+back for ``yb trace summarize``.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+
+def _warn(message: str) -> None:
+    print(f"warning: tracing: {message}", file=sys.stderr)
+
+
+def _clean_tags(tags: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in tags.items() if value not in (None, "")}
+
+
+class _Span:
+    __slots__ = ("_tracer", "name", "tags", "span_id", "parent_id", "trace_id", "_started", "_wall")
+
+    def __init__(self, tracer: "Tracer", name: str, tags: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.tags = tags
+        self.span_id = 0
+        self.parent_id: Optional[int] = None
+        self.trace_id = ""
+        self._started = 0.0
+        self._wall = 0.0
+
+    def set_tag(self, key: str, value: Any) -> None:
+        if value not in (None, ""):
+            self.tags[key] = value
+
+    def __enter__(self) -> "_Span":
+        self._tracer._enter(self)
+        self._wall = time.time()
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.monotonic() - self._started
+        if exc_type is not None:
+            self.tags["error"] = exc_type.__name__
+        self._tracer._exit(self, self._wall, elapsed)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set_tag(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Per-thread span stacks over one trace file; ``path=None`` makes every call a no-op."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+    ):
+        self.path = path or ""
+        self.max_bytes = max(1, int(max_bytes))
+        self.backups = max(0, int(backups))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._span_ids = itertools.count(1)
+        self._trace_ids = itertools.count(1)
+        self._trace_prefix = f"{os.getpid():x}"
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def span(self, name: str, **tags: Any):
+        if not self.path:
+            return _NULL_SPAN
+        return _Span(self, name, _clean_tags(tags))
+
+    def add_span(self, name: str, duration_sec: float, *, start_ts: Optional[float] = None, **tags: Any) -> None:
+        """Record an already-timed span as a child of this thread's current span."""
+        if not self.path:
+            return
+        parent = self._current()
+        if start_ts is None:
+            start_ts = time.time() - duration_sec
+        self._record(
+            {
+                "ts": round(start_ts, 6),
+                "trace": parent.trace_id if parent else f"{self._trace_prefix}-{next(self._trace_ids)}",
+                "span": next(self._span_ids),
+                "parent": parent.span_id if parent else None,
+                "name": name,
+                "ms": round(duration_sec * 1000.0, 3),
+                "tags": _clean_tags(tags),
+            }
+        )
+        if parent is None:
+            self.flush()
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _current(self) -> Optional[_Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _enter(self, span: _Span) -> None:
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span.span_id = next(self._span_ids)
+        span.parent_id = parent.span_id if parent else None
+        span.trace_id = parent.trace_id if parent else f"{self._trace_prefix}-{next(self._trace_ids)}"
+        stack.append(span)
+
+    def _exit(self, span: _Span, wall: float, elapsed: float) -> None:
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:
+            stack.remove(span)
+        self._record(
+            {
+                "ts": round(wall, 6),
+                "trace": span.trace_id,
+                "span": span.span_id,
+                "parent": span.parent_id,
+                "name": span.name,
+                "ms": round(elapsed * 1000.0, 3),
+                "tags": span.tags,
+            }
+        )
+        if span.parent_id is None:
+            self.flush()
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        if record["parent"] is None:
+            del record["parent"]
+        if not record["tags"]:
+            del record["tags"]
+        try:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        except (TypeError, ValueError) as exc:
+            _warn(f"dropping span '{record.get('name')}': {exc}")
+            return
+        with self._lock:
+            self._buffer.append(line)
+
+    def flush(self) -> None:
+        """Append every buffered span in one write, rotating the file first when it is full."""
+        with self._lock:
+            if not self._buffer or not self.path:
+                return
+            data = ("\n".join(self._buffer) + "\n").encode("utf-8")
+            self._buffer = []
+            try:
+                self._rotate_if_needed(len(data))
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+            except OSError as exc:
+                _warn(f"failed to write trace file '{self.path}': {exc}")
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        if self.backups == 0:
+            os.unlink(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+NULL_TRACER = Tracer()
+
+
+def trace_files(path: str, backups: int = DEFAULT_BACKUPS) -> List[str]:
+    """``path`` and its rotated siblings that exist, oldest first."""
+    candidates = [f"{path}.{index}" for index in range(max(backups, 0), 0, -1)] + [path]
+    return [candidate for candidate in candidates if os.path.isfile(candidate)]
+
+
+def load_spans(
+    paths: List[str],
+    *,
+    since_ts: Optional[float] = None,
+    until_ts: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        try:
+            fh = open(path, "r", encoding="utf-8")
+        except OSError as exc:
+            _warn(f"cannot read trace file '{path}': {exc}")
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict) or not isinstance(record.get("ms"), (int, float)):
+                    continue
+                ts = record.get("ts")
+                if not isinstance(ts, (int, float)):
+                    continue
+                if since_ts is not None and ts < since_ts:
+                    continue
+                if until_ts is not None and ts > until_ts:
+                    continue
+                yield record
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_spans(spans: Iterator[Dict[str, Any]], *, group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per-stage count, p50/p90/p99/max and total ms, slowest total first.
+
+    ``group_by`` splits each stage further by one tag (``role``, ``pane_id`` ...).
+    """
+    durations: Dict[str, List[float]] = {}
+    for span in spans:
+        name = str(span.get("name") or "?")
+        if group_by:
+            tags = span.get("tags") if isinstance(span.get("tags"), dict) else {}
+            name = f"{name}[{tags.get(group_by, '-')}]"
+        durations.setdefault(name, []).append(float(span["ms"]))
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append(
+            {
+                "name": name,
+                "count": len(values),
+                "p50_ms": _percentile(values, 0.50),
+                "p90_ms": _percentile(values, 0.90),
+                "p99_ms": _percentile(values, 0.99),
+                "max_ms": values[-1],
+                "total_ms": round(sum(values), 3),
+            }
+        )
+    rows.sort(key=lambda row: (-row["total_ms"], row["name"]))
+    return rows
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    if not rows:
+        return "no spans in the selected window\n"
+    width = max(len("stage"), max(len(row["name"]) for row in rows))
+    header = f"{'stage':<{width}}  {'count':>7}  {'p50_ms':>9}  {'p90_ms':>9}  {'p99_ms':>9}  {'max_ms':>9}  {'total_ms':>11}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['name']:<{width}}  {row['count']:>7}  {row['p50_ms']:>9.3f}  {row['p90_ms']:>9.3f}  "
+            f"{row['p99_ms']:>9.3f}  {row['max_ms']:>9.3f}  {row['total_ms']:>11.3f}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "DEFAULT_BACKUPS",
+    "DEFAULT_MAX_BYTES",
+    "NULL_TRACER",
+    "Tracer",
+    "format_summary",
+    "load_spans",
+    "summarize_spans",
+    "trace_files",
+]
@@ -5,23 +5,39 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import fcntl
-import glob
+import functools
+import hashlib
 import os
 import re
+import select
 import shlex
 import signal
 import subprocess
 import sys
 import tempfile
 import time
-from typing import Any, Dict, List, Optional, Tuple
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 
-from lib.event_logger import EventLogger
+from lib.action_executor import ActionExecutor
+from lib.action_locks import ActionLease, ActionLocks
+from lib.collect_coalescer import CollectCoalescer
+from lib.collect_engine import DEFAULT_COLLECT_TIMEOUT_SEC, emit_recovery_warning, run_collect
+from lib.dispatch_engine import run_dispatch
+from lib.event_logger import DEFAULT_QUEUE_EVENTS, OVERFLOW_BLOCK, VALID_OVERFLOW_POLICIES, EventLogger
+from lib.file_lock import FileLock, LockStats, is_flock_held
+from lib.fs_watch import DirectoryWatcher, wait_any
+from lib.metrics import MetricsRegistry
+from lib.metrics_export import MetricsEndpoint, render_prometheus, write_metrics_file
+from lib.pane_stream import PaneStreamReader
+from lib.poll_schedule import AdaptivePollInterval
+from lib.retry_policy import RetryPolicy
 from lib.panes import load_panes
 from lib.signal_parser import (
     compute_sig_hash,
@@ -29,13 +45,23 @@ from lib.signal_parser import (
     normalize_timestamp,
     validate_signal,
 )
+from lib.session_registry import SessionRegistry, SessionSpec
+from lib.signal_inbox import SignalInbox, inbox_dir_for_queue
 from lib.state_manager import StateManager
+from lib.task_index import TaskMetadataIndex
+from lib.tmux_client import shared_client
+from lib.tracing import NULL_TRACER, Tracer
 
 MODE_LEGACY = "legacy"
 MODE_HYBRID = "hybrid"
 MODE_V2 = "v2"
 VALID_MODES = (MODE_LEGACY, MODE_HYBRID, MODE_V2)
 
+SIGNAL_SOURCE_CAPTURE = "capture"
+SIGNAL_SOURCE_PIPE = "pipe"
+VALID_SIGNAL_SOURCES = (SIGNAL_SOURCE_CAPTURE, SIGNAL_SOURCE_PIPE)
+PANE_STREAMS_DIRNAME = "pane-streams"
+
 ROLE_PLANNER = "planner"
 ROLE_ARCHITECT = "architect"
 ROLE_IMPLEMENTER = "implementer"
@@ -62,24 +88,64 @@ DISPATCH_CALL_ROLE = "role"
 BLOCKED_PHASE_DISPATCH = "blocked_dispatch"
 BLOCKED_PHASE_COLLECT = "blocked_collect"
 
-PROCESS_LOCK_DISPATCH_COLLECT = "dispatch_collect"
 PROCESS_LOCK_STATE_SAVE = "state_save"
 
 CAPTURE_PANE_RETRY_MAX = 2
 MAX_CAPTURE_LINES = 50
-COMMAND_RETRY_MAX = 2
+DEFAULT_CAPTURE_CONCURRENCY = 8
+CAPTURE_SLOW_WARN_SEC = 1.0
 COMMAND_RETRY_SLEEP_SEC = 1.0
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BASE_DELAY_SEC = 2
+DEFAULT_RETRY_MAX_DELAY_SEC = 60
+RETRY_ERROR_MAX_CHARS = 500
+DEFAULT_COLLECT_DEBOUNCE_MS = 500
+DEFAULT_POLL_INTERVAL_MIN_MS = 250
+DEFAULT_POLL_INTERVAL_MAX_SEC = 30
 PROCESS_LOCK_TIMEOUT_SEC = 10.0
+DEFAULT_ACTION_CONCURRENCY = 4
+# Per-kind caps on top of action_concurrency; kinds are dispatch roles plus "collect"/"notify".
+DEFAULT_ACTION_ROLE_CONCURRENCY = {"collect": 1}
+ACTION_KIND_COLLECT = "collect"
+ACTION_KIND_NOTIFY = "notify"
+ACTION_RESULT_POLL_SEC = 0.5
+LOCK_STATS_REPORT_INTERVAL_SEC = 60.0
+SIGNAL_INBOX_PRUNE_INTERVAL_SEC = 300.0
+TRACE_FILENAME = "orchestrator-trace.jsonl"
+DEFAULT_TRACE_MAX_MB = 16
+EVENTS_FILENAME = "orchestrator-events.jsonl"
+# Written after the first cycle whatever the state backend; yb start waits for it.
+READY_MARKER_FILENAME = "orchestrator.ready"
+DEFAULT_EVENT_LOG_BUFFER_EVENTS = 256
+DEFAULT_EVENT_LOG_BUFFER_MAX_AGE_MS = 1000
+EVENT_LOG_WRITER_SYNC = "sync"
+EVENT_LOG_WRITER_THREAD = "thread"
+VALID_EVENT_LOG_WRITERS = (EVENT_LOG_WRITER_SYNC, EVENT_LOG_WRITER_THREAD)
+STATE_SAVE_BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+SUPERVISOR_CAPTURE_THREADS = 16
+SUPERVISOR_REGISTRY_RESCAN_SEC = 2.0
+SUPERVISOR_IDLE_EXIT_SEC = 300.0
+SUPERVISOR_ATTACH_CHECK_SEC = 5.0
+SUPERVISOR_OWNER_CHECK_SEC = 10.0
 
 _SESSION_SANITIZER = re.compile(r"[^A-Za-z0-9_-]")
 _STOP_REQUESTED = False
+# Session label prefixed to log lines while the supervisor works on that session.
+_LOG_SESSION = ""
 
 
 def _log(level: str, message: str) -> None:
     stamp = dt.datetime.now().isoformat(timespec="seconds")
+    if _LOG_SESSION:
+        message = f"[{_LOG_SESSION}] {message}"
     print(f"[yb_orchestrator][{level}][{stamp}] {message}", file=sys.stderr, flush=True)
 
 
+def _set_log_session(label: str) -> None:
+    global _LOG_SESSION
+    _LOG_SESSION = label
+
+
 def _to_text(value: Any) -> str:
     if value is None:
         return ""
@@ -224,6 +290,13 @@ def _load_runtime_config(repo_root: str) -> Dict[str, Any]:
     if poll_interval_sec <= 0:
         poll_interval_sec = 5
 
+    poll_interval_min_ms = _to_int(orchestrator.get("poll_interval_min_ms"), DEFAULT_POLL_INTERVAL_MIN_MS)
+    if poll_interval_min_ms <= 0:
+        poll_interval_min_ms = DEFAULT_POLL_INTERVAL_MIN_MS
+    poll_interval_max_sec = _to_int(orchestrator.get("poll_interval_max_sec"), DEFAULT_POLL_INTERVAL_MAX_SEC)
+    if poll_interval_max_sec <= 0:
+        poll_interval_max_sec = DEFAULT_POLL_INTERVAL_MAX_SEC
+
     max_signal_history = _to_int(orchestrator.get("max_signal_history"), 2000)
     if max_signal_history <= 0:
         max_signal_history = 2000
@@ -232,10 +305,101 @@ def _load_runtime_config(repo_root: str) -> Dict[str, Any]:
     if max_rework_loops < 0:
         max_rework_loops = 3
 
+    capture_concurrency = _to_int(orchestrator.get("capture_concurrency"), DEFAULT_CAPTURE_CONCURRENCY)
+    if capture_concurrency <= 0:
+        capture_concurrency = DEFAULT_CAPTURE_CONCURRENCY
+
+    signal_source = _to_text(orchestrator.get("signal_source")).lower() or SIGNAL_SOURCE_CAPTURE
+    if signal_source not in VALID_SIGNAL_SOURCES:
+        _log("warn", f"unknown orchestrator.signal_source '{signal_source}'; using {SIGNAL_SOURCE_CAPTURE}")
+        signal_source = SIGNAL_SOURCE_CAPTURE
+
+    action_concurrency = _to_int(orchestrator.get("action_concurrency"), DEFAULT_ACTION_CONCURRENCY)
+    if action_concurrency <= 0:
+        action_concurrency = DEFAULT_ACTION_CONCURRENCY
+
+    action_role_concurrency = dict(DEFAULT_ACTION_ROLE_CONCURRENCY)
+    raw_role_concurrency = orchestrator.get("action_role_concurrency")
+    if isinstance(raw_role_concurrency, dict):
+        for role, raw_limit in raw_role_concurrency.items():
+            limit = _to_int(raw_limit, 0)
+            if limit <= 0:
+                _log("warn", f"invalid orchestrator.action_role_concurrency.{role} '{raw_limit}'; ignored")
+                continue
+            action_role_concurrency[_to_text(role)] = limit
+
+    retry_max_attempts = _to_int(orchestrator.get("retry_max_attempts"), DEFAULT_RETRY_MAX_ATTEMPTS)
+    if retry_max_attempts <= 0:
+        retry_max_attempts = DEFAULT_RETRY_MAX_ATTEMPTS
+    retry_base_delay_sec = _to_int(orchestrator.get("retry_base_delay_sec"), DEFAULT_RETRY_BASE_DELAY_SEC)
+    if retry_base_delay_sec < 0:
+        retry_base_delay_sec = DEFAULT_RETRY_BASE_DELAY_SEC
+    retry_max_delay_sec = _to_int(orchestrator.get("retry_max_delay_sec"), DEFAULT_RETRY_MAX_DELAY_SEC)
+    if retry_max_delay_sec < retry_base_delay_sec:
+        retry_max_delay_sec = max(retry_base_delay_sec, DEFAULT_RETRY_MAX_DELAY_SEC)
+
+    collect_debounce_ms = _to_int(orchestrator.get("collect_debounce_ms"), DEFAULT_COLLECT_DEBOUNCE_MS)
+    if collect_debounce_ms < 0:
+        collect_debounce_ms = DEFAULT_COLLECT_DEBOUNCE_MS
+
+    state_backend = _to_text(orchestrator.get("state_backend")).lower() or StateManager.BACKEND_JSON
+    if state_backend not in StateManager.VALID_BACKENDS:
+        _log("warn", f"unknown orchestrator.state_backend '{state_backend}'; using {StateManager.BACKEND_JSON}")
+        state_backend = StateManager.BACKEND_JSON
+
+    trace_max_mb = _to_int(orchestrator.get("trace_max_mb"), DEFAULT_TRACE_MAX_MB)
+    if trace_max_mb <= 0:
+        trace_max_mb = DEFAULT_TRACE_MAX_MB
+
+    metrics_file = _to_text(orchestrator.get("metrics_file"))
+    metrics_socket = _to_text(orchestrator.get("metrics_socket"))
+
+    event_log_buffer_events = _to_int(orchestrator.get("event_log_buffer_events"), DEFAULT_EVENT_LOG_BUFFER_EVENTS)
+    if event_log_buffer_events < 0:
+        event_log_buffer_events = DEFAULT_EVENT_LOG_BUFFER_EVENTS
+    event_log_buffer_max_age_ms = _to_int(
+        orchestrator.get("event_log_buffer_max_age_ms"), DEFAULT_EVENT_LOG_BUFFER_MAX_AGE_MS
+    )
+    if event_log_buffer_max_age_ms < 0:
+        event_log_buffer_max_age_ms = DEFAULT_EVENT_LOG_BUFFER_MAX_AGE_MS
+
+    event_log_writer = _to_text(orchestrator.get("event_log_writer")).lower() or EVENT_LOG_WRITER_SYNC
+    if event_log_writer not in VALID_EVENT_LOG_WRITERS:
+        _log("warn", f"unknown orchestrator.event_log_writer '{event_log_writer}'; using {EVENT_LOG_WRITER_SYNC}")
+        event_log_writer = EVENT_LOG_WRITER_SYNC
+    event_log_queue_events = _to_int(orchestrator.get("event_log_queue_events"), DEFAULT_QUEUE_EVENTS)
+    if event_log_queue_events <= 0:
+        event_log_queue_events = DEFAULT_QUEUE_EVENTS
+    event_log_overflow = _to_text(orchestrator.get("event_log_overflow")).lower() or OVERFLOW_BLOCK
+    if event_log_overflow not in VALID_OVERFLOW_POLICIES:
+        _log("warn", f"unknown orchestrator.event_log_overflow '{event_log_overflow}'; using {OVERFLOW_BLOCK}")
+        event_log_overflow = OVERFLOW_BLOCK
+
     return {
         "mode": _to_text(orchestrator.get("mode")),
+        "signal_source": signal_source,
+        "state_backend": state_backend,
+        "signal_inbox": _to_bool(orchestrator.get("signal_inbox"), True),
         "poll_interval_sec": poll_interval_sec,
+        "poll_interval_min_ms": poll_interval_min_ms,
+        "poll_interval_max_sec": poll_interval_max_sec,
         "max_signal_history": max_signal_history,
+        "capture_concurrency": capture_concurrency,
+        "action_concurrency": action_concurrency,
+        "action_role_concurrency": action_role_concurrency,
+        "retry_max_attempts": retry_max_attempts,
+        "retry_base_delay_sec": retry_base_delay_sec,
+        "retry_max_delay_sec": retry_max_delay_sec,
+        "collect_debounce_ms": collect_debounce_ms,
+        "metrics_file": metrics_file,
+        "metrics_socket": metrics_socket,
+        "trace": _to_bool(orchestrator.get("trace"), False),
+        "trace_max_mb": trace_max_mb,
+        "event_log_buffer_events": event_log_buffer_events,
+        "event_log_buffer_max_age_ms": event_log_buffer_max_age_ms,
+        "event_log_writer": event_log_writer,
+        "event_log_queue_events": event_log_queue_events,
+        "event_log_overflow": event_log_overflow,
         "quality_gate_enabled": _to_bool(quality_gate.get("enabled"), True),
         "max_rework_loops": max_rework_loops,
     }
@@ -275,52 +439,37 @@ def _acquire_process_lock(
     lock_name: str,
     *,
     timeout_sec: float = PROCESS_LOCK_TIMEOUT_SEC,
-) -> Tuple[Optional[int], str]:
-    os.makedirs(lock_dir, exist_ok=True)
+    stats: Optional[LockStats] = None,
+) -> Tuple[Optional[FileLock], str]:
     lock_path = os.path.join(lock_dir, f"{lock_name}.lock")
-    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o600)
-    deadline = time.monotonic() + max(timeout_sec, 0.0)
-
-    while True:
-        try:
-            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-            payload = f"pid={os.getpid()} acquired_at={dt.datetime.now().isoformat()}\n"
-            os.ftruncate(fd, 0)
-            os.write(fd, payload.encode("utf-8"))
-            os.fsync(fd)
-            return fd, lock_path
-        except BlockingIOError:
-            if timeout_sec <= 0 or time.monotonic() >= deadline:
-                os.close(fd)
-                return None, lock_path
-            time.sleep(0.1)
-        except OSError:
-            os.close(fd)
-            raise
-
-
-def _release_process_lock(fd: Optional[int]) -> None:
-    if fd is None:
-        return
-    try:
-        fcntl.flock(fd, fcntl.LOCK_UN)
-    except OSError:
-        pass
+    lock = FileLock(lock_path, name=lock_name, stats=stats)
+    if not lock.acquire(timeout_sec):
+        return None, lock_path
+    payload = f"pid={os.getpid()} acquired_at={dt.datetime.now().isoformat()}\n"
     try:
-        os.close(fd)
+        os.ftruncate(lock.fd, 0)
+        os.pwrite(lock.fd, payload.encode("utf-8"), 0)
+        os.fsync(lock.fd)
     except OSError:
-        pass
+        lock.release()
+        raise
+    return lock, lock_path
+
+
+def _release_process_lock(lock: Optional[FileLock]) -> None:
+    if lock is not None:
+        lock.release()
 
 
 def _save_state_with_lock(sm: StateManager, lock_dir: str) -> None:
-    lock_fd: Optional[int] = None
+    lock: Optional[FileLock] = None
     try:
-        lock_fd, lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_STATE_SAVE)
-        if lock_fd is None:
+        lock, lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_STATE_SAVE, stats=sm.lock_stats)
+        if lock is None:
             raise RuntimeError(f"state save lock timeout: {lock_path}")
         sm.save()
     finally:
-        _release_process_lock(lock_fd)
+        _release_process_lock(lock)
 
 
 def _atomic_write_text(path: str, content: str) -> bool:
@@ -508,25 +657,21 @@ def _set_plan_task_needs_architect_true(plan_tasks_path: str, task_id: str, cmd_
     return False
 
 
-def _find_worker_task_path(queue_dir: str, task_id: str, assigned_worker: str) -> str:
+_TASK_INDEXES: Dict[str, TaskMetadataIndex] = {}
+
+
+def _task_index(queue_dir: str) -> TaskMetadataIndex:
     tasks_dir = os.path.join(queue_dir, "tasks")
-    if not os.path.isdir(tasks_dir):
-        return ""
+    index = _TASK_INDEXES.get(tasks_dir)
+    if index is None:
+        index = TaskMetadataIndex(tasks_dir, _read_task_header)
+        _TASK_INDEXES[tasks_dir] = index
+    return index
 
-    candidate_paths: List[str] = []
-    if assigned_worker:
-        candidate_paths.append(os.path.join(tasks_dir, f"{assigned_worker}.yaml"))
-    for task_path in sorted(glob.glob(os.path.join(tasks_dir, "*.yaml"))):
-        if task_path not in candidate_paths:
-            candidate_paths.append(task_path)
 
-    for task_path in candidate_paths:
-        if not os.path.isfile(task_path):
-            continue
-        info = _read_task_header(task_path)
-        if _to_text(info.get("task_id")) == task_id:
-            return task_path
-    return ""
+def _find_worker_task_path(queue_dir: str, task_id: str, assigned_worker: str) -> str:
+    preferred = os.path.join(queue_dir, "tasks", f"{assigned_worker}.yaml") if assigned_worker else ""
+    return _task_index(queue_dir).find_path(task_id, preferred)
 
 
 def _persist_needs_architect_metadata(queue_dir: str, task_id: str, assigned_worker: str, cmd_id: str) -> None:
@@ -600,17 +745,12 @@ def _read_task_metadata(queue_dir: str, task_id: str, assigned_worker: str) -> D
     task_path = _find_worker_task_path(queue_dir, task_id, assigned_worker)
     if not task_path:
         return {}
-    return _read_task_header(task_path)
+    return _task_index(queue_dir).header(task_path) or {}
 
 
 def _collect_tasks_for_cmd(queue_dir: str, cmd_id: str) -> List[Dict[str, Any]]:
-    tasks_dir = os.path.join(queue_dir, "tasks")
-    if not os.path.isdir(tasks_dir):
-        return []
-
     results: List[Dict[str, Any]] = []
-    for task_path in sorted(glob.glob(os.path.join(tasks_dir, "*.yaml"))):
-        info = _read_task_header(task_path)
+    for info in _task_index(queue_dir).headers_for_cmd(cmd_id):
         task_id = _to_text(info.get("task_id"))
         if not task_id:
             continue
@@ -686,6 +826,21 @@ def _safe_log_escalation(logger: EventLogger, task_id: str, reason: str, target:
         _log("warn", f"event_logger.log_escalation failed: {exc}")
 
 
+def _safe_log_lock_stats(logger: EventLogger, lock: str, stats: Dict[str, Any], interval_sec: float) -> None:
+    try:
+        logger.log_lock_stats(lock, stats, interval_sec=interval_sec)
+    except Exception as exc:
+        _log("warn", f"event_logger.log_lock_stats failed: {exc}")
+
+
+def _safe_flush_events(logger: EventLogger) -> None:
+    """Write buffered events now; with the background writer, only wake it (never wait on disk)."""
+    try:
+        logger.flush(wait=False)
+    except Exception as exc:
+        _log("warn", f"event_logger.flush failed: {exc}")
+
+
 def _worker_from_pane(panes: Dict[str, Any], pane_id: str) -> str:
     workers = panes.get("workers")
     if not isinstance(workers, dict):
@@ -738,25 +893,14 @@ def _phase_is_consistent(task_state: Optional[Dict[str, Any]], signal_dict: Dict
 
 
 def _capture_pane_tail(tmux_session: str, pane_id: str) -> Optional[str]:
-    cmd = ["tmux", "capture-pane", "-t", f"{tmux_session}:{pane_id}", "-p", "-S", f"-{MAX_CAPTURE_LINES}"]
+    client = shared_client(tmux_session)
+    target = f"{tmux_session}:{pane_id}"
     for attempt in range(1, CAPTURE_PANE_RETRY_MAX + 1):
-        try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        except OSError as exc:
-            if attempt < CAPTURE_PANE_RETRY_MAX:
-                _log(
-                    "warn",
-                    f"tmux capture-pane execution failed for pane '{pane_id}' attempt={attempt}/{CAPTURE_PANE_RETRY_MAX}: {exc}; retrying",
-                )
-                time.sleep(COMMAND_RETRY_SLEEP_SEC)
-                continue
-            _log("warn", f"tmux capture-pane execution failed for pane '{pane_id}': {exc}")
-            return None
-
-        if proc.returncode == 0:
-            return proc.stdout
+        result = client.capture_pane(target, start_line=-MAX_CAPTURE_LINES)
+        if result.returncode == 0:
+            return result.stdout
 
-        detail = _to_text(proc.stderr) or _to_text(proc.stdout) or f"rc={proc.returncode}"
+        detail = _to_text(result.stderr) or _to_text(result.stdout) or f"rc={result.returncode}"
         if attempt < CAPTURE_PANE_RETRY_MAX:
             _log(
                 "warn",
@@ -769,15 +913,108 @@ def _capture_pane_tail(tmux_session: str, pane_id: str) -> Optional[str]:
     return None
 
 
+@dataclass(frozen=True)
+class PaneCapture:
+    worker_id: str
+    pane_id: str
+    text: Optional[str]
+    latency_sec: float
+
+
+def _capture_one_pane(tmux_session: str, worker_id: str, pane_id: str) -> PaneCapture:
+    started = time.monotonic()
+    text = _capture_pane_tail(tmux_session, pane_id)
+    return PaneCapture(
+        worker_id=worker_id,
+        pane_id=pane_id,
+        text=text,
+        latency_sec=time.monotonic() - started,
+    )
+
+
+def _pane_targets(workers: Dict[str, Any]) -> List[Tuple[str, str]]:
+    targets: List[Tuple[str, str]] = []
+    for worker_id in sorted(workers.keys()):
+        pane_id = _to_text(workers.get(worker_id))
+        if pane_id:
+            targets.append((_to_text(worker_id), pane_id))
+    return targets
+
+
+def _warn_slow_captures(captures: List[PaneCapture]) -> None:
+    for capture in captures:
+        if capture.latency_sec >= CAPTURE_SLOW_WARN_SEC:
+            _log(
+                "warn",
+                f"slow tmux capture-pane worker={capture.worker_id} pane={capture.pane_id} latency_ms={capture.latency_sec * 1000:.0f}",
+            )
+
+
+def _capture_worker_panes(
+    tmux_session: str,
+    workers: Dict[str, Any],
+    *,
+    max_workers: int = DEFAULT_CAPTURE_CONCURRENCY,
+) -> List[PaneCapture]:
+    """Capture every worker pane concurrently; results keep sorted worker order."""
+    targets = _pane_targets(workers)
+    if not targets:
+        return []
+
+    pool_size = max(1, min(int(max_workers), len(targets)))
+    if pool_size == 1:
+        captures = [_capture_one_pane(tmux_session, worker_id, pane_id) for worker_id, pane_id in targets]
+    else:
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="yb-capture") as pool:
+            futures = [
+                pool.submit(_capture_one_pane, tmux_session, worker_id, pane_id) for worker_id, pane_id in targets
+            ]
+            captures = [future.result() for future in futures]
+
+    _warn_slow_captures(captures)
+    return captures
+
+
+def _submit_worker_pane_captures(pool: ThreadPoolExecutor, tmux_session: str, workers: Dict[str, Any]) -> List[Future]:
+    """Queue one session's captures on a pool shared with other sessions; see ``_capture_results``."""
+    return [
+        pool.submit(_capture_one_pane, tmux_session, worker_id, pane_id)
+        for worker_id, pane_id in _pane_targets(workers)
+    ]
+
+
+def _capture_results(futures: List[Future]) -> List[PaneCapture]:
+    captures = [future.result() for future in futures]
+    _warn_slow_captures(captures)
+    return captures
+
+
+def _read_pane_streams(reader: PaneStreamReader, workers: Dict[str, Any]) -> List[PaneCapture]:
+    started = time.monotonic()
+    updates = reader.read_updates(workers)
+    elapsed = time.monotonic() - started
+    return [
+        PaneCapture(
+            worker_id=update.worker_id,
+            pane_id=update.pane_id,
+            text=update.text,
+            latency_sec=elapsed,
+        )
+        for update in updates
+    ]
+
+
+def _pane_fingerprint(text: str) -> Tuple[int, str]:
+    """Cheap identity for a pane capture: (length, blake2b digest)."""
+    digest = hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).hexdigest()
+    return len(text), digest
+
+
 def notify_oyabun(session: str, oyabun_pane: str, message: str) -> bool:
-    send_rc = subprocess.run(
-        ["tmux", "send-keys", "-t", f"{session}:{oyabun_pane}", message],
-        check=False,
-    ).returncode
-    enter_rc = subprocess.run(
-        ["tmux", "send-keys", "-t", f"{session}:{oyabun_pane}", "Enter"],
-        check=False,
-    ).returncode
+    client = shared_client(session)
+    target = f"{session}:{oyabun_pane}"
+    send_rc = client.send_keys(target, message).returncode
+    enter_rc = client.send_keys(target, "Enter").returncode
     return send_rc == 0 and enter_rc == 0
 
 
@@ -843,16 +1080,35 @@ def _run_dispatch(
     if validation_error:
         return 2, command, validation_error
 
-    try:
-        proc = subprocess.run(command, cwd=repo_root, capture_output=True, text=True, check=False)
-    except OSError as exc:
-        return 127, command, str(exc)
+    if (dispatch_mode or DISPATCH_CALL_DEFAULT) == DISPATCH_CALL_PLANNER:
+        # --planner first runs yb_planner.sh and yb_task_expand.py, which stay separate processes.
+        try:
+            proc = subprocess.run(command, cwd=repo_root, capture_output=True, text=True, check=False)
+        except OSError as exc:
+            return 127, command, str(exc)
+        detail = _to_text(proc.stderr) or _to_text(proc.stdout)
+        return proc.returncode, command, detail
 
-    detail = _to_text(proc.stderr) or _to_text(proc.stdout)
-    return proc.returncode, command, detail
+    output: List[str] = []
+    rc = run_dispatch(
+        repo_root,
+        session_id,
+        dispatch_mode=DISPATCH_CALL_DEFAULT if dispatch_mode == DISPATCH_CALL_ROLE else dispatch_mode,
+        cmd_id=cmd_id,
+        role=target_role if dispatch_mode == DISPATCH_CALL_ROLE else "",
+        task_id=task_id if dispatch_mode == DISPATCH_CALL_ROLE else "",
+        log=output.append,
+    )
+    return rc, command, "\n".join(output)
 
 
-def _run_collect(repo_root: str, session_id: str) -> Tuple[int, List[str], str]:
+def _run_collect(
+    repo_root: str,
+    session_id: str,
+    lock_stats: Optional[LockStats] = None,
+    attempt: int = 1,
+    max_attempts: int = 1,
+) -> Tuple[int, List[str], str]:
     command = [
         "bash",
         "scripts/yb_collect.sh",
@@ -861,13 +1117,24 @@ def _run_collect(repo_root: str, session_id: str) -> Tuple[int, List[str], str]:
         "--session",
         session_id,
     ]
-    try:
-        proc = subprocess.run(command, cwd=repo_root, capture_output=True, text=True, check=False)
-    except OSError as exc:
-        return 127, command, str(exc)
-
-    detail = _to_text(proc.stderr) or _to_text(proc.stdout)
-    return proc.returncode, command, detail
+    output: List[str] = []
+    rc = run_collect(
+        repo_root,
+        session_id,
+        log=output.append,
+        lock_stats=lock_stats,
+        timeout_sec=DEFAULT_COLLECT_TIMEOUT_SEC,
+    )
+    if rc != 0:
+        # Same dashboard line yb_collect.sh leaves for each failed attempt.
+        emit_recovery_warning(
+            repo_root,
+            session_id,
+            "COLLECT",
+            f"collect failed (attempt {attempt}/{max_attempts}, rc={rc})",
+            log=output.append,
+        )
+    return rc, command, "\n".join(output)
 
 
 def _append_dispatch_action(
@@ -1448,55 +1715,177 @@ def _mark_task_blocked(
     )
 
 
-def _run_dispatch_with_retry(
-    repo_root: str,
-    session_id: str,
-    target_role: str,
-    task_id: str,
-    cmd_id: str,
-    dispatch_mode: str,
-) -> Tuple[int, List[str], str]:
-    last_rc = 1
-    last_command: List[str] = []
-    last_detail = ""
-    for attempt in range(1, COMMAND_RETRY_MAX + 1):
-        rc, command, detail = _run_dispatch(
-            repo_root,
-            session_id,
-            target_role,
-            task_id,
-            cmd_id,
-            dispatch_mode,
+def _dispatch_action_fields(action: Dict[str, Any]) -> Dict[str, Any]:
+    target_role = _to_text(action.get("role"))
+    task_id = _to_text(action.get("task_id"))
+    dispatch_mode = _to_text(action.get("dispatch_mode"))
+    if not dispatch_mode:
+        if target_role in {ROLE_REVIEWER, ROLE_QUALITY_GATE}:
+            dispatch_mode = DISPATCH_CALL_ROLE
+        else:
+            dispatch_mode = DISPATCH_CALL_DEFAULT
+    return {
+        "role": target_role,
+        "task_id": task_id,
+        "cmd_id": _to_text(action.get("cmd_id")) or _derive_cmd_id(task_id) or "unknown_cmd",
+        "pane_id": _to_text(action.get("pane_id")),
+        "dispatch_mode": dispatch_mode,
+        "affected_task_ids": _normalize_task_id_list(action.get("affected_task_ids"), task_id),
+    }
+
+
+def _collect_action_fields(action: Dict[str, Any]) -> Dict[str, Any]:
+    task_id = _to_text(action.get("task_id"))
+    task_ids = _normalize_task_id_list(action.get("task_ids"), task_id)
+    raw_cmd_ids = action.get("cmd_ids")
+    cmd_ids = {_to_text(key): _to_text(value) for key, value in (raw_cmd_ids or {}).items()} if isinstance(raw_cmd_ids, dict) else {}
+    return {
+        "reason": _to_text(action.get("reason")),
+        "task_id": task_id or (task_ids[0] if task_ids else ""),
+        "task_ids": task_ids,
+        "cmd_id": _to_text(action.get("cmd_id")) or _derive_cmd_id(task_id) or "unknown_cmd",
+        "cmd_ids": cmd_ids,
+    }
+
+
+def _finish_dispatch(
+    sm: StateManager,
+    logger: EventLogger,
+    fields: Dict[str, Any],
+    *,
+    rc: int,
+    command: List[str],
+    detail: str,
+    tmux_session: str,
+    oyabun_pane: str,
+) -> None:
+    target_role = fields["role"]
+    task_id = fields["task_id"]
+    dispatch_mode = fields["dispatch_mode"]
+    affected_task_ids = fields["affected_task_ids"]
+
+    command_str = " ".join(shlex.quote(token) for token in command)
+    _safe_log_dispatch(logger, task_id, target_role, fields["pane_id"], command_str)
+    if rc == 0:
+        return
+    failure_reason = detail or f"rc={rc}"
+    _log(
+        "warn",
+        f"dispatch failed role={target_role} task_id={task_id} mode={dispatch_mode} rc={rc} detail={failure_reason}",
+    )
+    for affected_task_id in affected_task_ids:
+        _mark_task_blocked(
+            sm,
+            logger,
+            task_id=affected_task_id,
+            cmd_id=fields["cmd_id"],
+            blocked_phase=BLOCKED_PHASE_DISPATCH,
+            reason=f"dispatch_failed role={target_role} mode={dispatch_mode} detail={failure_reason}",
+            error_type="dispatch_failed",
         )
-        last_rc = rc
-        last_command = command
-        last_detail = detail
-        if rc == 0:
-            return rc, command, detail
-        if attempt < COMMAND_RETRY_MAX:
-            _log(
-                "warn",
-                f"dispatch retry scheduled role={target_role} task_id={task_id} mode={dispatch_mode} attempt={attempt}/{COMMAND_RETRY_MAX} rc={rc}",
-            )
-            time.sleep(COMMAND_RETRY_SLEEP_SEC)
-    return last_rc, last_command, last_detail
-
-
-def _run_collect_with_retry(repo_root: str, session_id: str) -> Tuple[int, List[str], str]:
-    last_rc = 1
-    last_command: List[str] = []
-    last_detail = ""
-    for attempt in range(1, COMMAND_RETRY_MAX + 1):
-        rc, command, detail = _run_collect(repo_root, session_id)
-        last_rc = rc
-        last_command = command
-        last_detail = detail
-        if rc == 0:
-            return rc, command, detail
-        if attempt < COMMAND_RETRY_MAX:
-            _log("warn", f"collect retry scheduled attempt={attempt}/{COMMAND_RETRY_MAX} rc={rc}")
-            time.sleep(COMMAND_RETRY_SLEEP_SEC)
-    return last_rc, last_command, last_detail
+    _notify_oyabun_with_error_log(
+        logger,
+        tmux_session=tmux_session,
+        oyabun_pane=oyabun_pane,
+        message=(
+            f"[orchestrator] dispatch failed role={target_role} mode={dispatch_mode} "
+            f"tasks={','.join(affected_task_ids) or task_id} rc={rc} detail={failure_reason}"
+        ),
+    )
+
+
+def _finish_collect(
+    sm: StateManager,
+    logger: EventLogger,
+    fields: Dict[str, Any],
+    *,
+    rc: int,
+    detail: str,
+    tmux_session: str,
+    oyabun_pane: str,
+) -> None:
+    if rc == 0:
+        return
+    reason = fields["reason"]
+    task_ids = fields["task_ids"]
+    failure_reason = detail or f"rc={rc}"
+    _log("warn", f"collect failed reason={reason or '(none)'} rc={rc} detail={failure_reason}")
+    # One (possibly coalesced) collect run: its outcome belongs to every task that asked for it.
+    for task_id in task_ids:
+        _mark_task_blocked(
+            sm,
+            logger,
+            task_id=task_id,
+            cmd_id=fields["cmd_ids"].get(task_id) or fields["cmd_id"],
+            blocked_phase=BLOCKED_PHASE_COLLECT,
+            reason=f"collect_failed detail={failure_reason}",
+            error_type="collect_failed",
+        )
+    if not task_ids:
+        _safe_log_error(
+            logger,
+            task_id="",
+            error_type="collect_failed",
+            message=failure_reason,
+            role="orchestrator",
+        )
+    _notify_oyabun_with_error_log(
+        logger,
+        tmux_session=tmux_session,
+        oyabun_pane=oyabun_pane,
+        message=(
+            f"[orchestrator] collect failed reason={reason or '(none)'} "
+            f"task_id={','.join(task_ids) or '(none)'} rc={rc} detail={failure_reason}"
+        ),
+    )
+
+
+def _action_attempt(action: Dict[str, Any]) -> int:
+    return max(1, _to_int(action.get("attempt"), 1) or 1)
+
+
+def _schedule_action_retry(
+    sm: StateManager,
+    retry_policy: RetryPolicy,
+    *,
+    retry_id: str,
+    action: Dict[str, Any],
+    detail: str,
+    followups: Optional[List[Dict[str, Any]]] = None,
+) -> bool:
+    """Park a failed ``action`` in state for a later attempt; False once attempts are exhausted."""
+    attempt = _action_attempt(action)
+    if not retry_policy.should_retry(attempt):
+        return False
+    now = time.time()
+    due_at = retry_policy.due_at(attempt, now=now)
+    retry_action = dict(action)
+    retry_action["attempt"] = attempt + 1
+    sm.set_pending_retry(
+        retry_id,
+        {
+            "action": retry_action,
+            "followups": list(followups or []),
+            "attempt": attempt + 1,
+            "max_attempts": retry_policy.max_attempts,
+            "due_at": due_at,
+            "scheduled_at": now,
+            "last_error": detail[:RETRY_ERROR_MAX_CHARS],
+        },
+    )
+    _log(
+        "warn",
+        (
+            f"{_to_text(action.get('type'))} retry scheduled "
+            f"task_id={','.join(_normalize_task_id_list(action.get('task_ids'), _to_text(action.get('task_id')))) or '(none)'} "
+            f"attempt={attempt + 1}/{retry_policy.max_attempts} in={due_at - now:.1f}s detail={detail}"
+        ),
+    )
+    return True
+
+
+def _retry_id_for_job(action_type: str, job_id: int) -> str:
+    return f"{action_type}-{os.getpid()}-{job_id}"
 
 
 def _execute_actions(
@@ -1508,206 +1897,488 @@ def _execute_actions(
     session_id: str,
     tmux_session: str,
     oyabun_pane: str,
-    lock_dir: str,
+    executor: ActionExecutor,
+    leases: ActionLocks,
+    retry_policy: RetryPolicy,
+    collects: Optional[CollectCoalescer] = None,
 ) -> None:
-    collect_failed_tasks: set[str] = set()
-
-    for action in actions:
-        action_type = _to_text(action.get("type"))
-
-        if action_type == "dispatch":
-            target_role = _to_text(action.get("role"))
-            task_id = _to_text(action.get("task_id"))
-            cmd_id = _to_text(action.get("cmd_id")) or _derive_cmd_id(task_id) or "unknown_cmd"
-            pane_id = _to_text(action.get("pane_id"))
-            dispatch_mode = _to_text(action.get("dispatch_mode"))
-            if not dispatch_mode:
-                if target_role in {ROLE_REVIEWER, ROLE_QUALITY_GATE}:
-                    dispatch_mode = DISPATCH_CALL_ROLE
-                else:
-                    dispatch_mode = DISPATCH_CALL_DEFAULT
-            affected_task_ids = _normalize_task_id_list(action.get("affected_task_ids"), task_id)
+    """Submit one transition's actions to ``executor``; results are applied by ``_apply_finished_actions``.
+
+    Jobs are keyed by task id (and target pane for dispatches) so a task's
+    actions run in order, and dispatches are gated on collect failures of
+    the same transition.  Each job makes a single attempt; failures are
+    parked as pending retries instead of sleeping, and so is an action whose
+    task/worker/collect lock (``ActionLocks``) is held by another process --
+    it only escalates once its retries run out.  With ``collects``,
+    collect actions (and the dispatches waiting on them) are handed to the
+    coalescer and submitted later as one merged run by ``_flush_collects``.
+    """
+    batch = executor.new_batch()
+    batch_keys: List[str] = []
+    deferred_task_ids: set[str] = set()
+    # Collects submitted in this batch: (lease, task_ids) for the dispatches they gate.
+    batch_collects: List[Tuple[ActionLease, List[str]]] = []
+    try:
+        for index, action in enumerate(actions):
+            action_type = _to_text(action.get("type"))
+            job_context = {
+                "type": action_type,
+                "action": dict(action),
+                "tmux_session": tmux_session,
+                "oyabun_pane": oyabun_pane,
+            }
+
+            if action_type == "dispatch":
+                fields = _dispatch_action_fields(action)
+                target_role = fields["role"]
+                task_id = fields["task_id"]
+                affected_task_ids = fields["affected_task_ids"]
+
+                if deferred_task_ids.intersection(affected_task_ids):
+                    continue
+                if executor.batch_failed(batch, affected_task_ids):
+                    _log(
+                        "warn",
+                        f"dispatch skipped due prior collect failure task_id={task_id} role={target_role} mode={fields['dispatch_mode']}",
+                    )
+                    continue
 
-            if any(task in collect_failed_tasks for task in affected_task_ids):
-                _log(
-                    "warn",
-                    f"dispatch skipped due prior collect failure task_id={task_id} role={target_role} mode={dispatch_mode}",
+                # The executor runs a dispatch sharing a task key with this batch's collect after it.
+                gated_by = next(
+                    (
+                        collect_lease
+                        for collect_lease, collect_task_ids in batch_collects
+                        if not set(collect_task_ids).isdisjoint(affected_task_ids)
+                    ),
+                    None,
                 )
-                continue
-
-            if not sm.acquire_lock("dispatch"):
-                reason = f"dispatch lock is already held; skipped dispatch action role={target_role}"
-                _log("warn", reason)
-                for affected_task_id in affected_task_ids:
-                    _mark_task_blocked(
-                        sm,
-                        logger,
-                        task_id=affected_task_id,
-                        cmd_id=cmd_id,
-                        blocked_phase=BLOCKED_PHASE_DISPATCH,
-                        reason=reason,
-                        error_type="dispatch_lock_busy",
-                    )
-                _notify_oyabun_with_error_log(
-                    logger,
-                    tmux_session=tmux_session,
-                    oyabun_pane=oyabun_pane,
-                    message=f"[orchestrator] dispatch lock busy; blocked tasks={','.join(affected_task_ids) or task_id}",
+                lease, lease_error = leases.acquire_dispatch(
+                    affected_task_ids, worker=fields["pane_id"], gated_by=gated_by
                 )
-                continue
-
-            process_lock_fd: Optional[int] = None
-            try:
-                process_lock_fd, lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_DISPATCH_COLLECT)
-                if process_lock_fd is None:
+                if lease_error:
+                    if _schedule_action_retry(
+                        sm,
+                        retry_policy,
+                        retry_id=f"dispatch-{uuid.uuid4().hex[:12]}",
+                        action=action,
+                        detail=lease_error,
+                    ):
+                        continue
                     command, _ = _build_dispatch_command(
                         repo_root=repo_root,
                         session_id=session_id,
                         target_role=target_role,
                         task_id=task_id,
-                        cmd_id=cmd_id,
-                        dispatch_mode=dispatch_mode,
-                    )
-                    rc = 1
-                    detail = f"process lock timeout: {lock_path}"
-                else:
-                    rc, command, detail = _run_dispatch_with_retry(
-                        repo_root,
-                        session_id,
-                        target_role,
-                        task_id,
-                        cmd_id,
-                        dispatch_mode,
-                    )
-
-                command_str = " ".join(shlex.quote(token) for token in command)
-                _safe_log_dispatch(logger, task_id, target_role, pane_id, command_str)
-                if rc != 0:
-                    failure_reason = detail or f"rc={rc}"
-                    _log(
-                        "warn",
-                        f"dispatch failed role={target_role} task_id={task_id} mode={dispatch_mode} rc={rc} detail={failure_reason}",
+                        cmd_id=fields["cmd_id"],
+                        dispatch_mode=fields["dispatch_mode"],
                     )
-                    for affected_task_id in affected_task_ids:
-                        _mark_task_blocked(
-                            sm,
-                            logger,
-                            task_id=affected_task_id,
-                            cmd_id=cmd_id,
-                            blocked_phase=BLOCKED_PHASE_DISPATCH,
-                            reason=f"dispatch_failed role={target_role} mode={dispatch_mode} detail={failure_reason}",
-                            error_type="dispatch_failed",
-                        )
-                    _notify_oyabun_with_error_log(
+                    _finish_dispatch(
+                        sm,
                         logger,
+                        fields,
+                        rc=1,
+                        command=command,
+                        detail=lease_error,
                         tmux_session=tmux_session,
                         oyabun_pane=oyabun_pane,
-                        message=(
-                            f"[orchestrator] dispatch failed role={target_role} mode={dispatch_mode} "
-                            f"tasks={','.join(affected_task_ids) or task_id} rc={rc} detail={failure_reason}"
-                        ),
                     )
-            finally:
-                _release_process_lock(process_lock_fd)
-                sm.release_lock("dispatch")
-            continue
+                    continue
 
-        if action_type == "collect":
-            reason = _to_text(action.get("reason"))
-            task_id = _to_text(action.get("task_id"))
-            cmd_id = _to_text(action.get("cmd_id")) or _derive_cmd_id(task_id) or "unknown_cmd"
-
-            if not sm.acquire_lock("collect"):
-                failure_reason = "collect lock is already held; skipped collect action"
-                _log("warn", failure_reason)
-                if task_id:
-                    collect_failed_tasks.add(task_id)
-                    _mark_task_blocked(
-                        sm,
-                        logger,
-                        task_id=task_id,
-                        cmd_id=cmd_id,
-                        blocked_phase=BLOCKED_PHASE_COLLECT,
-                        reason=failure_reason,
-                        error_type="collect_lock_busy",
-                    )
-                _notify_oyabun_with_error_log(
-                    logger,
-                    tmux_session=tmux_session,
-                    oyabun_pane=oyabun_pane,
-                    message=f"[orchestrator] collect lock busy reason={reason or '(none)'} task_id={task_id or '(none)'}",
+                keys = list(affected_task_ids)
+                if fields["pane_id"]:
+                    keys.append(f"pane:{fields['pane_id']}")
+                batch_keys.extend(keys)
+                job_context.update(fields)
+                job_context["lease"] = lease
+                executor.submit(
+                    target_role or "dispatch",
+                    keys,
+                    functools.partial(
+                        _run_dispatch,
+                        repo_root,
+                        session_id,
+                        target_role,
+                        task_id,
+                        fields["cmd_id"],
+                        fields["dispatch_mode"],
+                    ),
+                    batch=batch,
+                    gated=True,
+                    context=job_context,
                 )
                 continue
 
-            process_lock_fd: Optional[int] = None
-            try:
-                process_lock_fd, lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_DISPATCH_COLLECT)
-                if process_lock_fd is None:
-                    rc = 1
-                    detail = f"process lock timeout: {lock_path}"
-                else:
-                    rc, _, detail = _run_collect_with_retry(repo_root, session_id)
-
-                if rc != 0:
-                    failure_reason = detail or f"rc={rc}"
-                    _log("warn", f"collect failed reason={reason or '(none)'} rc={rc} detail={failure_reason}")
-                    if task_id:
-                        collect_failed_tasks.add(task_id)
-                        _mark_task_blocked(
-                            sm,
-                            logger,
-                            task_id=task_id,
-                            cmd_id=cmd_id,
-                            blocked_phase=BLOCKED_PHASE_COLLECT,
-                            reason=f"collect_failed detail={failure_reason}",
-                            error_type="collect_failed",
-                        )
-                    else:
-                        _safe_log_error(
-                            logger,
-                            task_id="",
-                            error_type="collect_failed",
-                            message=failure_reason,
-                            role="orchestrator",
-                        )
-                    _notify_oyabun_with_error_log(
+            if action_type == "collect":
+                fields = _collect_action_fields(action)
+                task_ids = fields["task_ids"]
+                # The dispatches this collect gates wait for it (coalesced run or retry).
+                followups = [
+                    dict(later)
+                    for later in actions[index + 1 :]
+                    if _to_text(later.get("type")) == "dispatch"
+                    and not set(task_ids).isdisjoint(_dispatch_action_fields(later)["affected_task_ids"])
+                ]
+
+                if collects is not None:
+                    collects.add(action, followups)
+                    deferred_task_ids.update(task_ids)
+                    continue
+
+                lease, lease_error = leases.acquire_collect()
+                if lease_error:
+                    executor.mark_batch_failed(batch, task_ids)
+                    if _schedule_action_retry(
+                        sm,
+                        retry_policy,
+                        retry_id=f"collect-{uuid.uuid4().hex[:12]}",
+                        action=action,
+                        detail=lease_error,
+                        followups=followups,
+                    ):
+                        deferred_task_ids.update(task_ids)
+                        continue
+                    _finish_collect(
+                        sm,
                         logger,
+                        fields,
+                        rc=1,
+                        detail=lease_error,
                         tmux_session=tmux_session,
                         oyabun_pane=oyabun_pane,
-                        message=(
-                            f"[orchestrator] collect failed reason={reason or '(none)'} "
-                            f"task_id={task_id or '(none)'} rc={rc} detail={failure_reason}"
-                        ),
                     )
-            finally:
-                _release_process_lock(process_lock_fd)
-                sm.release_lock("collect")
-            continue
-
-        if action_type == "notify":
-            message = _to_text(action.get("message"))
-            _notify_oyabun_with_error_log(
-                logger,
-                tmux_session=tmux_session,
-                oyabun_pane=oyabun_pane,
-                message=message,
-            )
+                    continue
 
+                batch_keys.extend(task_ids)
+                batch_collects.append((lease, task_ids))
+                job_context.update(fields)
+                job_context["lease"] = lease
+                executor.submit(
+                    ACTION_KIND_COLLECT,
+                    task_ids,
+                    functools.partial(
+                        _run_collect,
+                        repo_root,
+                        session_id,
+                        leases.stats,
+                        _action_attempt(action),
+                        retry_policy.max_attempts,
+                    ),
+                    batch=batch,
+                    fails_batch=lambda result: result[0] != 0,
+                    context=job_context,
+                )
+                continue
 
-def _sync_state_metadata(sm: StateManager, mode: str, poll_interval_sec: int) -> None:
-    state = sm.state
-    state["schema_version"] = 1
-    state["mode"] = mode
-    state["poll_interval_sec"] = poll_interval_sec
-    if "version" not in state:
-        state["version"] = "v2-alpha"
+            if action_type == "notify":
+                message = _to_text(action.get("message"))
+                if not tmux_session or not oyabun_pane:
+                    _log("warn", f"oyabun pane is missing; skipped notification: {message}")
+                    continue
+                job_context["message"] = message
+                # Keyed on everything submitted so far so the message follows the work it reports on.
+                executor.submit(
+                    ACTION_KIND_NOTIFY,
+                    list(batch_keys),
+                    functools.partial(notify_oyabun, tmux_session, oyabun_pane, message),
+                    batch=batch,
+                    context=job_context,
+                )
+    finally:
+        executor.close_batch(batch)
 
 
-def _escape_md(value: str) -> str:
+def _apply_finished_actions(
+    sm: StateManager,
+    logger: EventLogger,
+    executor: ActionExecutor,
+    leases: ActionLocks,
+    retry_policy: RetryPolicy,
+    metrics: Optional[MetricsRegistry] = None,
+    tracer: Tracer = NULL_TRACER,
+) -> int:
+    """Apply the outcome of every finished action job on the calling (main) thread."""
+    jobs = executor.drain()
+    for job in jobs:
+        context = job.context
+        action_type = context.get("type")
+        tmux_session = context.get("tmux_session", "")
+        oyabun_pane = context.get("oyabun_pane", "")
+        if tracer.enabled and job.started_at:
+            tracer.add_span(
+                f"action.{action_type}",
+                job.run_sec,
+                start_ts=time.time() - (time.monotonic() - job.started_at),
+                task_id=_to_text(context.get("task_id")),
+                role=_to_text(context.get("role")),
+                pane_id=_to_text(context.get("pane_id")),
+                queue_wait_ms=round(job.queue_wait_sec * 1000.0, 3),
+            )
+        if metrics is not None:
+            metrics.incr("actions_finished_total")
+            metrics.set_gauge(f"action_last_run_ms_{action_type}", int(job.run_sec * 1000))
+            metrics.observe("action_run_seconds", job.run_sec, labels={"action": _to_text(action_type)})
+            metrics.observe("action_queue_wait_seconds", job.queue_wait_sec, labels={"action": _to_text(action_type)})
+
+        if action_type == "notify":
+            if job.error is not None or not job.result:
+                message = _to_text(context.get("message"))
+                _log("warn", f"failed to notify oyabun for message: {message}")
+                _safe_log_error(
+                    logger,
+                    task_id="",
+                    error_type="notify_failed",
+                    message=message,
+                    role="orchestrator",
+                )
+            continue
+
+        leases.release(context.get("lease"))
+        if job.skipped:
+            if metrics is not None:
+                metrics.incr("actions_skipped_total")
+            # A collect that failed but will be retried takes its gated dispatch along.
+            retry_id = _retry_id_for_job(ACTION_KIND_COLLECT, job.skipped_by or 0)
+            entry = sm.get_pending_retries().get(retry_id) if job.skipped_by else None
+            if isinstance(entry, dict):
+                entry = dict(entry)
+                entry["followups"] = list(entry.get("followups") or []) + [context["action"]]
+                sm.set_pending_retry(retry_id, entry)
+                _log(
+                    "info",
+                    f"dispatch deferred until collect retry task_id={context.get('task_id')} role={context.get('role')}",
+                )
+                continue
+            _log(
+                "warn",
+                f"dispatch skipped due prior collect failure task_id={context.get('task_id')} role={context.get('role')} mode={context.get('dispatch_mode')}",
+            )
+            continue
+
+        if job.error is not None:
+            rc, command, detail = 1, [], f"{type(job.error).__name__}: {job.error}"
+        else:
+            rc, command, detail = job.result
+        if rc != 0:
+            if metrics is not None:
+                metrics.incr("actions_failed_total")
+            # rc=2 is a dispatch validation error: retrying cannot fix it.
+            retryable = not (action_type == "dispatch" and rc == 2)
+            if retryable and _schedule_action_retry(
+                sm,
+                retry_policy,
+                retry_id=_retry_id_for_job(_to_text(action_type), job.job_id),
+                action=context["action"],
+                detail=detail or f"rc={rc}",
+            ):
+                if metrics is not None:
+                    metrics.incr("actions_retried_total")
+                continue
+        if action_type == "dispatch":
+            _finish_dispatch(
+                sm,
+                logger,
+                context,
+                rc=rc,
+                command=command,
+                detail=detail,
+                tmux_session=tmux_session,
+                oyabun_pane=oyabun_pane,
+            )
+        else:
+            _finish_collect(
+                sm,
+                logger,
+                context,
+                rc=rc,
+                detail=detail,
+                tmux_session=tmux_session,
+                oyabun_pane=oyabun_pane,
+            )
+    if metrics is not None:
+        metrics.set_gauge("actions_in_flight", executor.in_flight())
+        metrics.set_gauge("actions_pending_retries", len(sm.get_pending_retries()))
+    return len(jobs)
+
+
+def _submit_due_retries(
+    sm: StateManager,
+    logger: EventLogger,
+    ctx: CycleContext,
+    *,
+    now: Optional[float] = None,
+) -> int:
+    """Resubmit every pending retry whose due time has passed; returns how many were resubmitted."""
+    now = time.time() if now is None else now
+    due = sorted(
+        (
+            (float(entry.get("due_at") or 0.0), retry_id, entry)
+            for retry_id, entry in sm.get_pending_retries().items()
+            if isinstance(entry, dict) and float(entry.get("due_at") or 0.0) <= now
+        ),
+        key=lambda item: item[0],
+    )
+    for _, retry_id, entry in due:
+        sm.remove_pending_retry(retry_id)
+        action = entry.get("action")
+        if not isinstance(action, dict):
+            continue
+        followups = [item for item in entry.get("followups") or [] if isinstance(item, dict)]
+        _execute_actions(
+            sm,
+            logger,
+            actions=[action] + followups,
+            repo_root=ctx.repo_root,
+            session_id=ctx.session_id,
+            tmux_session=ctx.tmux_session,
+            oyabun_pane=ctx.oyabun_pane,
+            executor=ctx.executor,
+            leases=ctx.leases,
+            retry_policy=ctx.retry_policy,
+            collects=ctx.collects,
+        )
+    return len(due)
+
+
+def _flush_collects(
+    sm: StateManager,
+    logger: EventLogger,
+    ctx: CycleContext,
+    *,
+    force: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+) -> bool:
+    """Submit the coalesced collect run once its window has passed (or when ``force``)."""
+    if not ctx.collects.pending() or not (force or ctx.collects.due()):
+        return False
+    taken = ctx.collects.take()
+    if taken is None:
+        return False
+    merged, followups = taken
+    requests = _to_int(merged.get("coalesced"), 1)
+    if metrics is not None:
+        metrics.incr("collect_requests_total", requests)
+        metrics.incr("collect_runs_total")
+    if requests > 1:
+        _log(
+            "info",
+            f"coalesced {requests} collect requests into one run task_ids={','.join(merged.get('task_ids') or []) or '(none)'}",
+        )
+    _execute_actions(
+        sm,
+        logger,
+        actions=[merged] + followups,
+        repo_root=ctx.repo_root,
+        session_id=ctx.session_id,
+        tmux_session=ctx.tmux_session,
+        oyabun_pane=ctx.oyabun_pane,
+        executor=ctx.executor,
+        leases=ctx.leases,
+        retry_policy=ctx.retry_policy,
+    )
+    return True
+
+
+def _next_retry_delay(sm: StateManager, *, now: Optional[float] = None) -> Optional[float]:
+    due_times = [
+        float(entry.get("due_at") or 0.0) for entry in sm.get_pending_retries().values() if isinstance(entry, dict)
+    ]
+    if not due_times:
+        return None
+    return max(0.0, min(due_times) - (time.time() if now is None else now))
+
+
+def _sync_state_metadata(sm: StateManager, mode: str, poll_interval_sec: int) -> None:
+    state = sm.state
+    changed = False
+    for key, value in (("schema_version", 1), ("mode", mode), ("poll_interval_sec", poll_interval_sec)):
+        if state.get(key) != value:
+            state[key] = value
+            changed = True
+    if "version" not in state:
+        state["version"] = "v2-alpha"
+        changed = True
+    if changed:
+        sm.mark_dirty()
+
+
+def _publish_state_io_metrics(metrics: MetricsRegistry, sm: StateManager, started_monotonic: float) -> None:
+    stats = sm.io_stats
+    hours = max(time.monotonic() - started_monotonic, 1.0) / 3600.0
+    metrics.set_gauge("state_saves_written_total", stats["saves_written"])
+    metrics.set_gauge("state_saves_skipped_total", stats["saves_skipped"])
+    metrics.set_gauge("state_bytes_written_total", stats["bytes_written"])
+    metrics.set_gauge("state_fsyncs_total", stats["fsyncs"])
+    metrics.set_gauge("state_bytes_written_per_hour", round(stats["bytes_written"] / hours, 1))
+    metrics.set_gauge("state_fsyncs_per_hour", round(stats["fsyncs"] / hours, 1))
+
+
+def _publish_event_log_metrics(metrics: MetricsRegistry, logger: EventLogger) -> None:
+    stats = logger.io_stats
+    metrics.set_gauge("event_log_events_total", stats["events_logged"])
+    metrics.set_gauge("event_log_appends_total", stats["appends"])
+    metrics.set_gauge("event_log_bytes_written_total", stats["bytes_written"])
+    metrics.set_gauge("event_log_events_dropped_total", stats["events_dropped"])
+    metrics.set_gauge("event_log_overflow_dropped_total", stats["events_overflow_dropped"])
+    metrics.set_gauge("event_log_spilled_total", stats["events_spilled"])
+    metrics.set_gauge("event_log_queue_blocked_total", stats["queue_blocked"])
+    metrics.set_gauge("event_log_queue_depth", stats["queue_depth"])
+
+
+def _publish_task_phase_metrics(metrics: MetricsRegistry, sm: StateManager, seen: Set[str]) -> None:
+    """Gauge ``tasks_by_phase{phase=...}``; phases that emptied out drop back to 0."""
+    counts: Dict[str, int] = {}
+    task_state = sm.state.get("taskState")
+    if isinstance(task_state, dict):
+        for entry in task_state.values():
+            phase = _to_text(entry.get("phase")) if isinstance(entry, dict) else ""
+            if phase:
+                counts[phase] = counts.get(phase, 0) + 1
+    seen.update(counts)
+    for phase in seen:
+        metrics.set_gauge("tasks_by_phase", counts.get(phase, 0), labels={"phase": phase})
+
+
+def _publish_lock_stats(
+    logger: EventLogger,
+    metrics: MetricsRegistry,
+    lock_stats: LockStats,
+    interval_sec: float,
+) -> None:
+    """One ``lock_stats`` event per lock used since the last report; cumulative totals as gauges."""
+    for name, entry in sorted(lock_stats.take_report().items()):
+        _safe_log_lock_stats(logger, name, entry, round(interval_sec, 3))
+    for name, entry in lock_stats.snapshot().items():
+        key = _SESSION_SANITIZER.sub("_", name)
+        metrics.set_gauge(f"lock_{key}_contended_total", entry["contended"])
+        metrics.set_gauge(f"lock_{key}_wait_ms_max", entry["wait_ms_max"])
+        metrics.set_gauge(f"lock_{key}_hold_ms_max", entry["hold_ms_max"])
+
+
+def _has_active_tasks(sm: StateManager) -> bool:
+    """True while some task is in a working phase (not done, not blocked)."""
+    task_state = sm.state.get("taskState")
+    if not isinstance(task_state, dict):
+        return False
+    for entry in task_state.values():
+        phase = _to_text(entry.get("phase")) if isinstance(entry, dict) else ""
+        if phase and phase != "done" and not phase.startswith("blocked"):
+            return True
+    return False
+
+
+def _escape_md(value: str) -> str:
     return value.replace("|", r"\|")
 
 
-def update_dashboard(work_dir: str, sm: StateManager, mode: str, poll_interval_sec: int) -> None:
+def update_dashboard(
+    work_dir: str,
+    sm: StateManager,
+    mode: str,
+    poll_interval_sec: int,
+    captures: Optional[List[PaneCapture]] = None,
+    metrics: Optional[MetricsRegistry] = None,
+    effective_poll_interval_sec: Optional[float] = None,
+) -> None:
     if not work_dir:
         return
     os.makedirs(work_dir, exist_ok=True)
@@ -1723,6 +2394,10 @@ def update_dashboard(work_dir: str, sm: StateManager, mode: str, poll_interval_s
         f"- Last Updated: {now}",
         f"- Mode: {mode}",
         f"- Poll Interval (sec): {poll_interval_sec}",
+    ]
+    if effective_poll_interval_sec is not None:
+        lines.append(f"- Effective Poll Interval (sec): {effective_poll_interval_sec:g}")
+    lines += [
         "",
         "| Task ID | Phase | Loop | Assigned Worker | Updated At |",
         "|---|---|---:|---|---|",
@@ -1741,10 +2416,340 @@ def update_dashboard(work_dir: str, sm: StateManager, mode: str, poll_interval_s
     else:
         lines.append("| - | - | - | - | - |")
 
+    if captures:
+        lines.extend(
+            [
+                "",
+                "## Pane Capture",
+                "| Worker | Pane | Latency (ms) | Status |",
+                "|---|---|---:|---|",
+            ]
+        )
+        for capture in captures:
+            status = "ok" if capture.text is not None else "failed"
+            lines.append(
+                f"| {_escape_md(capture.worker_id)} | {_escape_md(capture.pane_id)} | "
+                f"{capture.latency_sec * 1000:.0f} | {status} |"
+            )
+
+    retries = sm.get_pending_retries()
+    if retries:
+        lines.extend(
+            [
+                "",
+                "## Pending Retries",
+                "| Action | Task ID | Attempt | Due In (sec) | Last Error |",
+                "|---|---|---:|---:|---|",
+            ]
+        )
+        now_epoch = time.time()
+        ordered = sorted(
+            (entry for entry in retries.values() if isinstance(entry, dict)),
+            key=lambda entry: float(entry.get("due_at") or 0.0),
+        )
+        for entry in ordered:
+            action = entry.get("action") if isinstance(entry.get("action"), dict) else {}
+            due_in = max(0.0, float(entry.get("due_at") or 0.0) - now_epoch)
+            attempt = f"{_to_int(entry.get('attempt'), 0)}/{_to_int(entry.get('max_attempts'), 0)}"
+            lines.append(
+                f"| {_escape_md(_to_text(action.get('type')) or '-')} | "
+                f"{_escape_md(_to_text(action.get('task_id')) or '-')} | {attempt} | {due_in:.0f} | "
+                f"{_escape_md(' '.join(_to_text(entry.get('last_error')).split())[:120] or '-')} |"
+            )
+
+    values: Dict[str, Any] = {}
+    if metrics is not None:
+        values.update(metrics.counters())
+        values.update(metrics.gauges())
+    if values:
+        lines.extend(["", "## Metrics", "| Name | Value |", "|---|---:|"])
+        for name in sorted(values.keys()):
+            lines.append(f"| {_escape_md(name)} | {values[name]} |")
+
     with open(dashboard_path, "w", encoding="utf-8") as fh:
         fh.write("\n".join(lines) + "\n")
 
 
+@dataclass(frozen=True)
+class CycleContext:
+    repo_root: str
+    session_id: str
+    mode: str
+    panes: Dict[str, Any]
+    queue_dir: str
+    tmux_session: str
+    oyabun_pane: str
+    lock_dir: str
+    quality_gate_enabled: bool
+    max_rework_loops: int
+    executor: ActionExecutor
+    leases: ActionLocks
+    retry_policy: RetryPolicy
+    collects: CollectCoalescer
+    metrics: Optional[MetricsRegistry] = None
+    tracer: Tracer = NULL_TRACER
+
+
+def _count_signal(ctx: CycleContext, outcome: str) -> None:
+    if ctx.metrics is not None:
+        ctx.metrics.incr("signals_total", labels={"outcome": outcome})
+
+
+def _process_signal(
+    sm: StateManager,
+    logger: EventLogger,
+    ctx: CycleContext,
+    *,
+    signal_dict: Dict[str, Any],
+    pane_id: str,
+) -> bool:
+    """Validate, dedup and apply one signal; True when it reached the transition step."""
+    signal_for_validation = dict(signal_dict)
+    if not _to_text(signal_for_validation.get("pane_id")):
+        signal_for_validation["pane_id"] = pane_id
+
+    role = _to_text(signal_for_validation.get("role")).lower()
+    with ctx.tracer.span("signal.validate", role=role, pane_id=pane_id):
+        is_valid, errors = validate_signal(signal_for_validation, role)
+    if not is_valid:
+        task_id_for_error = _to_text(signal_for_validation.get("task_id"))
+        _safe_log_error(
+            logger,
+            task_id=task_id_for_error,
+            error_type="signal_validation_failed",
+            message="; ".join(errors) if errors else "unknown validation error",
+            role=role or "unknown",
+        )
+        _log(
+            "warn",
+            f"invalid signal from pane={pane_id} role={role or '(missing)'} errors={errors}",
+        )
+        _count_signal(ctx, "invalid")
+        return False
+
+    normalized_signal = normalize_timestamp(signal_for_validation)
+    normalized_signal["pane_id"] = _to_text(normalized_signal.get("pane_id")) or pane_id
+    normalized_signal["role"] = role
+
+    task_id = _to_text(normalized_signal.get("task_id"))
+    if not task_id:
+        _safe_log_error(
+            logger,
+            task_id="",
+            error_type="signal_missing_task_id",
+            message=f"missing task_id from pane {pane_id}",
+            role=role,
+        )
+        _count_signal(ctx, "invalid")
+        return False
+
+    ts_ms = _to_int(normalized_signal.get("ts_ms"), None)
+    timestamp_provided = ts_ms is not None and ts_ms > 0
+    if ts_ms is None or ts_ms < 0:
+        ts_ms = 0
+    normalized_signal["ts_ms"] = ts_ms
+
+    task_pane_key = f"{task_id}:{normalized_signal['pane_id']}"
+    if timestamp_provided and not sm.check_timestamp_guard(task_pane_key, ts_ms):
+        _log(
+            "info",
+            f"dropped signal by timestamp guard task={task_id} pane={pane_id} ts_ms={ts_ms}",
+        )
+        _count_signal(ctx, "stale")
+        return False
+
+    sig_hash = compute_sig_hash(normalized_signal)
+    if sm.is_duplicate_signal(sig_hash):
+        _safe_log_signal(logger, task_id, role, sig_hash, False)
+        _log("info", f"dropped duplicate signal task={task_id} pane={pane_id} sig_hash={sig_hash}")
+        _count_signal(ctx, "duplicate")
+        return False
+
+    task_state = sm.get_task_state(task_id)
+    if not _phase_is_consistent(task_state, normalized_signal):
+        if timestamp_provided:
+            sm.update_timestamp(task_pane_key, ts_ms)
+        sm.add_processed_signal(sig_hash)
+        _safe_log_signal(logger, task_id, role, sig_hash, False)
+        _log(
+            "info",
+            f"dropped signal by phase guard task={task_id} role={role} phase={_to_text((task_state or {}).get('phase'))}",
+        )
+        _count_signal(ctx, "phase_dropped")
+        return False
+
+    if ctx.mode == MODE_HYBRID and task_state is None:
+        signal_worker = _to_text(normalized_signal.get("worker_id")) or _worker_from_pane(
+            ctx.panes,
+            pane_id,
+        )
+        task_meta = _read_task_metadata(ctx.queue_dir, task_id, signal_worker)
+        task_routing_policy = _normalize_routing_policy(
+            task_meta.get("routing_policy"),
+            MODE_LEGACY,
+        )
+        if task_routing_policy == MODE_V2:
+            initial_worker = _to_text(task_meta.get("assigned_to")) or signal_worker
+            initial_phase = (
+                "design" if _to_bool(task_meta.get("needs_architect"), False) else "implement"
+            )
+            initial_cmd_id = (
+                _to_text(task_meta.get("parent_cmd_id"))
+                or _to_text(normalized_signal.get("cmd_id"))
+                or _derive_cmd_id(task_id)
+            )
+            if not initial_cmd_id:
+                initial_cmd_id = "unknown_cmd"
+            sm.update_task_state(
+                task_id,
+                phase=initial_phase,
+                loop_count=0,
+                assigned_worker=initial_worker,
+                cmd_id=initial_cmd_id,
+                routing_policy=task_routing_policy,
+            )
+            task_state = sm.get_task_state(task_id)
+        else:
+            if timestamp_provided:
+                sm.update_timestamp(task_pane_key, ts_ms)
+            sm.add_processed_signal(sig_hash)
+            _safe_log_signal(logger, task_id, role, sig_hash, False)
+            _log("info", f"hybrid mode ignored unregistered task signal: {task_id}")
+            _count_signal(ctx, "unregistered")
+            return False
+
+    if timestamp_provided:
+        sm.update_timestamp(task_pane_key, ts_ms)
+    sm.add_processed_signal(sig_hash)
+    _safe_log_signal(logger, task_id, role, sig_hash, True)
+    _count_signal(ctx, "accepted")
+
+    with ctx.tracer.span("transition", task_id=task_id, role=role, pane_id=pane_id):
+        actions = _apply_transition(
+            sm,
+            logger,
+            signal_dict=normalized_signal,
+            panes=ctx.panes,
+            mode=ctx.mode,
+            queue_dir=ctx.queue_dir,
+            quality_gate_enabled=ctx.quality_gate_enabled,
+            max_rework_loops=ctx.max_rework_loops,
+        )
+    if not actions:
+        _log(
+            "info",
+            f"no transition action for task={task_id} role={role} mission={_to_text(normalized_signal.get('mission'))}",
+        )
+        return True
+
+    with ctx.tracer.span("actions.submit", task_id=task_id, role=role):
+        _execute_actions(
+            sm,
+            logger,
+            actions=actions,
+            repo_root=ctx.repo_root,
+            session_id=ctx.session_id,
+            tmux_session=ctx.tmux_session,
+            oyabun_pane=ctx.oyabun_pane,
+            executor=ctx.executor,
+            leases=ctx.leases,
+            retry_policy=ctx.retry_policy,
+            collects=ctx.collects,
+        )
+    return True
+
+
+def _process_pane_text(
+    sm: StateManager,
+    logger: EventLogger,
+    ctx: CycleContext,
+    *,
+    pane_id: str,
+    pane_text: str,
+) -> None:
+    with ctx.tracer.span("signal.extract", pane_id=pane_id):
+        signal_dict = extract_last_json_object(pane_text)
+    if not isinstance(signal_dict, dict):
+        if "{" in pane_text and "}" in pane_text:
+            _log("warn", f"failed to parse JSON signal from pane={pane_id}")
+        return
+
+    _process_signal(sm, logger, ctx, signal_dict=signal_dict, pane_id=pane_id)
+
+
+def _drain_signal_inbox(
+    sm: StateManager,
+    logger: EventLogger,
+    ctx: CycleContext,
+    inbox: SignalInbox,
+) -> List[str]:
+    """Process every pending signal file, oldest first; returns the files to archive once state is saved.
+
+    Archiving before the save would lose a signal to a crash in between;
+    leaving the file in place only means it is processed (and deduplicated)
+    again on the next cycle.
+    """
+    consumed: List[str] = []
+    workers = ctx.panes.get("workers")
+    for path in inbox.pending():
+        payload, error = inbox.read(path)
+        if payload is None:
+            _log("warn", f"invalid signal file '{path}': {error}")
+            _safe_log_error(
+                logger,
+                task_id="",
+                error_type="signal_file_invalid",
+                message=f"{os.path.basename(path)}: {error}",
+                role="orchestrator",
+            )
+            inbox.archive(path, ok=False)
+            continue
+
+        pane_id = _to_text(payload.get("pane_id"))
+        worker_id = _to_text(payload.get("worker_id"))
+        if not pane_id and worker_id and isinstance(workers, dict):
+            pane_id = _to_text(workers.get(worker_id))
+        _process_signal(sm, logger, ctx, signal_dict=payload, pane_id=pane_id)
+        consumed.append(path)
+    return consumed
+
+
+def _wait_for_next_cycle(
+    cycle_watcher: Optional[DirectoryWatcher],
+    executor: ActionExecutor,
+    timeout_sec: float,
+    *,
+    not_before: float = 0.0,
+) -> None:
+    """Sleep until the next cycle: a watched change, a finished action, or ``timeout_sec``.
+
+    A watched change before ``not_before`` (a ``time.monotonic()`` value) only
+    moves the wakeup up to ``not_before``: pane streams change on every byte a
+    TUI prints, and must not drive cycles faster than the minimum poll interval.
+    """
+    deadline = time.monotonic() + timeout_sec
+    while not _STOP_REQUESTED:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or executor.wait(0):
+            return
+        in_flight = executor.in_flight()
+        if cycle_watcher is None:
+            if not in_flight:
+                time.sleep(remaining)
+                return
+            if executor.wait(remaining):
+                return
+            continue
+        # Both sources matter: poll the watcher in short slices while actions are running.
+        if cycle_watcher.wait(min(remaining, ACTION_RESULT_POLL_SEC) if in_flight else remaining):
+            if time.monotonic() >= not_before:
+                return
+            deadline = min(deadline, not_before)
+            cycle_watcher = None
+        elif not in_flight:
+            return
+
+
 def _handle_stop_signal(signum: int, _frame: Any) -> None:
     global _STOP_REQUESTED
     _STOP_REQUESTED = True
@@ -1753,102 +2758,295 @@ def _handle_stop_signal(signum: int, _frame: Any) -> None:
 
 def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Yamibaito orchestrator control plane")
-    parser.add_argument("--repo", required=True, help="Repository root path")
+    parser.add_argument("--repo", default=None, help="Repository root path")
     parser.add_argument("--session", default="", help="Session id for panes_<session>.json")
-    parser.add_argument("--mode", required=True, choices=VALID_MODES, help="Orchestrator mode")
+    parser.add_argument("--mode", default=None, choices=VALID_MODES, help="Orchestrator mode")
     parser.add_argument(
         "--poll-interval",
         type=int,
         default=None,
         help="Polling interval in seconds (default: config orchestrator.poll_interval_sec)",
     )
+    parser.add_argument(
+        "--signal-source",
+        choices=VALID_SIGNAL_SOURCES,
+        default=None,
+        help="Signal ingestion source (default: config orchestrator.signal_source or capture)",
+    )
     parser.add_argument(
         "--state-dir",
         default=None,
         help="State directory (default: <repo_root>/.yamibaito/runtime)",
     )
-    return parser.parse_args(argv)
-
-
-def main(argv: Optional[List[str]] = None) -> int:
-    args = _parse_args(argv)
-
-    repo_root = os.path.abspath(args.repo)
-    config = _load_runtime_config(repo_root)
+    supervisor = parser.add_mutually_exclusive_group()
+    supervisor.add_argument(
+        "--supervise",
+        action="store_true",
+        help="Run every session registered in the supervisor registry from this one process",
+    )
+    supervisor.add_argument(
+        "--attach",
+        action="store_true",
+        help="Register this session with the supervisor (starting it if needed) and unregister on exit",
+    )
+    parser.add_argument(
+        "--registry",
+        default=None,
+        help="Supervisor registry directory (default: $YB_SUPERVISOR_DIR or ~/.yamibaito/supervisor)",
+    )
+    args = parser.parse_args(argv)
+    if not args.supervise:
+        missing = [flag for flag, value in (("--repo", args.repo), ("--mode", args.mode)) if not value]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    return args
+
+
+class SessionRunner:
+    """One session's orchestrator loop state; ``run_cycle`` is one poll iteration.
+
+    A plain ``yb_orchestrator.py`` run drives one runner; the supervisor
+    drives many from one process, sharing the capture pool, runtime config
+    and tmux control connections between them.
+    """
+
+    def __init__(
+        self,
+        spec: SessionSpec,
+        config: Dict[str, Any],
+        *,
+        on_action_finished: Optional[Callable[[], None]] = None,
+    ):
+        self.spec = spec
+        self.repo_root = os.path.abspath(spec.repo_root)
+        self.session_id = _sanitize_session_id(spec.session_id)
+
+        configured_mode = _to_text(config.get("mode"))
+        self.mode = _to_text(spec.mode) or configured_mode or MODE_HYBRID
+        if configured_mode and configured_mode != self.mode:
+            _log(
+                "warn",
+                f"CLI mode '{self.mode}' differs from config orchestrator.mode '{configured_mode}'; using CLI mode",
+            )
 
-    configured_mode = _to_text(config.get("mode"))
-    mode = _to_text(args.mode)
-    if configured_mode and configured_mode != mode:
-        _log(
-            "warn",
-            f"CLI mode '{mode}' differs from config orchestrator.mode '{configured_mode}'; using CLI mode",
+        self.poll_interval_sec = _to_int(config.get("poll_interval_sec"), 5)
+        if spec.poll_interval_sec is not None:
+            if spec.poll_interval_sec > 0:
+                self.poll_interval_sec = spec.poll_interval_sec
+            else:
+                _log("warn", f"invalid --poll-interval '{spec.poll_interval_sec}'; using {self.poll_interval_sec}")
+
+        max_signal_history = _to_int(config.get("max_signal_history"), 2000)
+        if max_signal_history <= 0:
+            max_signal_history = 2000
+
+        self.quality_gate_enabled = _to_bool(config.get("quality_gate_enabled"), True)
+        self.max_rework_loops = _to_int(config.get("max_rework_loops"), 3)
+        self.capture_concurrency = _to_int(config.get("capture_concurrency"), DEFAULT_CAPTURE_CONCURRENCY)
+        self.signal_source = _to_text(spec.signal_source) or _to_text(config.get("signal_source")) or SIGNAL_SOURCE_CAPTURE
+        self.signal_inbox_enabled = _to_bool(config.get("signal_inbox"), True)
+
+        self.state_dir = _to_text(spec.state_dir) or os.path.join(self.repo_root, ".yamibaito", "runtime")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.lock_dir = os.path.join(self.state_dir, "orchestrator-locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+        self.state_backend = _to_text(config.get("state_backend")) or StateManager.BACKEND_JSON
+        self.metrics = MetricsRegistry()
+        self.lock_stats = LockStats(self.metrics)
+        self.sm = StateManager(
+            state_dir=self.state_dir,
+            max_signals=max_signal_history,
+            backend=self.state_backend,
+            lock_stats=self.lock_stats,
         )
 
-    if mode == MODE_LEGACY:
-        _log("info", "mode=legacy: orchestrator loop is disabled; exiting")
-        return 0
-
-    poll_interval_sec = _to_int(config.get("poll_interval_sec"), 5)
-    if args.poll_interval is not None:
-        if args.poll_interval > 0:
-            poll_interval_sec = args.poll_interval
-        else:
-            _log("warn", f"invalid --poll-interval '{args.poll_interval}'; using {poll_interval_sec}")
-
-    max_signal_history = _to_int(config.get("max_signal_history"), 2000)
-    if max_signal_history <= 0:
-        max_signal_history = 2000
-
-    quality_gate_enabled = _to_bool(config.get("quality_gate_enabled"), True)
-    max_rework_loops = _to_int(config.get("max_rework_loops"), 3)
-
-    session_id = _sanitize_session_id(_to_text(args.session))
-    state_dir = _to_text(args.state_dir) or os.path.join(repo_root, ".yamibaito", "runtime")
-    os.makedirs(state_dir, exist_ok=True)
-    lock_dir = os.path.join(state_dir, "orchestrator-locks")
-    os.makedirs(lock_dir, exist_ok=True)
-
-    sm = StateManager(state_dir=state_dir, max_signals=max_signal_history)
+        self.logger = EventLogger(
+            events_path=os.path.join(self.state_dir, EVENTS_FILENAME),
+            buffer_events=_to_int(config.get("event_log_buffer_events"), DEFAULT_EVENT_LOG_BUFFER_EVENTS),
+            buffer_max_age_sec=_to_int(
+                config.get("event_log_buffer_max_age_ms"), DEFAULT_EVENT_LOG_BUFFER_MAX_AGE_MS
+            )
+            / 1000.0,
+            background=_to_text(config.get("event_log_writer")) == EVENT_LOG_WRITER_THREAD,
+            queue_events=_to_int(config.get("event_log_queue_events"), DEFAULT_QUEUE_EVENTS),
+            overflow=_to_text(config.get("event_log_overflow")) or OVERFLOW_BLOCK,
+        )
+        self.action_concurrency = _to_int(config.get("action_concurrency"), DEFAULT_ACTION_CONCURRENCY)
+        self.executor = ActionExecutor(
+            max_concurrency=self.action_concurrency,
+            kind_limits=config.get("action_role_concurrency") or DEFAULT_ACTION_ROLE_CONCURRENCY,
+            on_finish=on_action_finished,
+        )
+        self.leases = ActionLocks(self.lock_dir, stats=self.lock_stats)
+        self.retry_policy = RetryPolicy(
+            max_attempts=_to_int(config.get("retry_max_attempts"), DEFAULT_RETRY_MAX_ATTEMPTS),
+            base_delay_sec=_to_int(config.get("retry_base_delay_sec"), DEFAULT_RETRY_BASE_DELAY_SEC),
+            max_delay_sec=_to_int(config.get("retry_max_delay_sec"), DEFAULT_RETRY_MAX_DELAY_SEC),
+        )
+        self.collects = CollectCoalescer(
+            window_sec=_to_int(config.get("collect_debounce_ms"), DEFAULT_COLLECT_DEBOUNCE_MS) / 1000.0
+        )
+        self.last_ctx: Optional[CycleContext] = None
+        self.started_monotonic = time.monotonic()
+        self.lock_stats_reported_at = self.started_monotonic
+        poll_min_sec = min(
+            config.get("poll_interval_min_ms", DEFAULT_POLL_INTERVAL_MIN_MS) / 1000.0,
+            self.poll_interval_sec,
+        )
+        self.poll_schedule = AdaptivePollInterval(
+            poll_min_sec,
+            max(config.get("poll_interval_max_sec", DEFAULT_POLL_INTERVAL_MAX_SEC), self.poll_interval_sec),
+            active_max_sec=self.poll_interval_sec,
+        )
 
-    logger = EventLogger(events_path=os.path.join(state_dir, "orchestrator-events.jsonl"))
+        self.pane_streams: Optional[PaneStreamReader] = None
+        self.cycle_watcher: Optional[DirectoryWatcher] = None
+        if self.signal_source == SIGNAL_SOURCE_PIPE:
+            self.pane_streams = PaneStreamReader(os.path.join(self.state_dir, PANE_STREAMS_DIRNAME))
+            self.cycle_watcher = DirectoryWatcher(self.pane_streams.stream_dir)
+            _log(
+                "info",
+                f"signal_source=pipe stream_dir={self.pane_streams.stream_dir} inotify={self.cycle_watcher.using_inotify}",
+            )
+        self.signal_inbox: Optional[SignalInbox] = None
+        self.inbox_pruned_at = float("-inf")
+
+        metrics_file = _to_text(config.get("metrics_file"))
+        self.metrics_path = os.path.join(self.state_dir, metrics_file) if metrics_file else ""
+        self.metrics_endpoint: Optional[MetricsEndpoint] = None
+        metrics_socket = _to_text(config.get("metrics_socket"))
+        if metrics_socket:
+            socket_path = os.path.join(self.state_dir, metrics_socket)
+            try:
+                self.metrics_endpoint = MetricsEndpoint(socket_path, self.metrics)
+            except OSError as exc:
+                _log("warn", f"metrics socket disabled: {socket_path}: {exc}")
+        self._task_phases_seen: Set[str] = set()
+        self.tracer = NULL_TRACER
+        if config.get("trace"):
+            self.tracer = Tracer(
+                os.path.join(self.state_dir, TRACE_FILENAME),
+                max_bytes=config.get("trace_max_mb", DEFAULT_TRACE_MAX_MB) * 1024 * 1024,
+            )
 
-    signal.signal(signal.SIGTERM, _handle_stop_signal)
-    signal.signal(signal.SIGINT, _handle_stop_signal)
+        self.last_work_dir = self.repo_root
+        self.last_captures: List[PaneCapture] = []
+        # pane_id -> fingerprint of the last capture fully processed and saved.
+        self.pane_fingerprints: Dict[str, Tuple[int, str]] = {}
+        # Set after a cycle that could not take the state lock or load the state.
+        self._retry_after_sec: Optional[float] = None
+        self.cycle_started_at = 0.0
+        self._pane_streams_checked = False
+        self._ready_marked = False
+
+    def describe(self) -> str:
+        return (
+            f"mode={self.mode} poll_interval={self.poll_interval_sec}s "
+            f"poll_interval_min={self.poll_schedule.min_sec:g}s poll_interval_max={self.poll_schedule.max_sec:g}s "
+            f"signal_source={self.signal_source} state_backend={self.state_backend} "
+            f"action_concurrency={self.action_concurrency} state_dir={self.state_dir} "
+            f"session='{self.session_id}'"
+        )
 
-    _log(
-        "info",
-        f"orchestrator started mode={mode} poll_interval={poll_interval_sec}s state_dir={state_dir} session='{session_id}'",
-    )
+    def capture_target(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """``(tmux_session, workers)`` to capture ahead of ``run_cycle``; None when panes come from streams."""
+        if self.pane_streams is not None:
+            return None
+        panes = load_panes(_resolve_panes_path(self.repo_root, self.session_id))
+        if not isinstance(panes, dict):
+            return None
+        tmux_session = _to_text(panes.get("session"))
+        workers = panes.get("workers")
+        if not tmux_session or not isinstance(workers, dict):
+            return None
+        return tmux_session, workers
+
+    def run_cycle(self, captures: Optional[List[PaneCapture]] = None) -> None:
+        """Load state, ingest pane output and signals, act, save.
+
+        ``captures`` are pane captures the caller already took (supervisor
+        mode); without them the worker panes are captured here.
+        """
+        self.cycle_started_at = time.monotonic()
+        with self.tracer.span("cycle", session=self.session_id):
+            self._run_cycle(captures)
+        if not self._ready_marked:
+            self._ready_marked = _atomic_write_text(
+                os.path.join(self.state_dir, READY_MARKER_FILENAME),
+                f"pid={os.getpid()} state_backend={self.state_backend}\n",
+            )
 
-    last_work_dir = repo_root
-    while not _STOP_REQUESTED:
-        state_lock_fd, state_lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_STATE_SAVE)
-        if state_lock_fd is None:
+    def _run_cycle(self, captures: Optional[List[PaneCapture]]) -> None:
+        sm, logger, metrics, tracer = self.sm, self.logger, self.metrics, self.tracer
+        executor, leases, retry_policy = self.executor, self.leases, self.retry_policy
+        self._retry_after_sec = None
+        cycle_started = time.monotonic()
+        cycle_fingerprints: Dict[str, Tuple[int, str]] = {}
+        inbox_consumed: List[str] = []
+        finished_before = metrics.counter("actions_finished_total")
+        accepted_before = metrics.counter("signals_total", labels={"outcome": "accepted"})
+        state_lock, state_lock_path = _acquire_process_lock(
+            self.lock_dir, PROCESS_LOCK_STATE_SAVE, stats=self.lock_stats
+        )
+        if state_lock is None:
             _log("warn", f"state cycle lock timeout: {state_lock_path}")
-            time.sleep(poll_interval_sec)
-            continue
+            self._retry_after_sec = float(self.poll_interval_sec)
+            return
         try:
             try:
-                sm.load()
+                with tracer.span("state.load"):
+                    sm.load()
             except Exception as exc:
                 _log("error", f"failed to load orchestrator state: {exc}")
-                _release_process_lock(state_lock_fd)
-                state_lock_fd = None
-                time.sleep(poll_interval_sec)
-                continue
-            _sync_state_metadata(sm, mode, poll_interval_sec)
+                self._retry_after_sec = float(self.poll_interval_sec)
+                return
+            _sync_state_metadata(sm, self.mode, self.poll_interval_sec)
             try:
-                panes_path = _resolve_panes_path(repo_root, session_id)
+                _apply_finished_actions(sm, logger, executor, leases, retry_policy, metrics, tracer)
+                panes_path = _resolve_panes_path(self.repo_root, self.session_id)
                 panes = load_panes(panes_path)
                 if not isinstance(panes, dict):
                     _log("warn", f"panes file is not a mapping: {panes_path}")
-                    continue
+                    return
 
                 tmux_session = _to_text(panes.get("session"))
                 oyabun_pane = _to_text(panes.get("oyabun"))
-                work_dir = _to_text(panes.get("work_dir")) or repo_root
-                queue_dir = _resolve_queue_dir(repo_root, work_dir, session_id, panes)
-                last_work_dir = work_dir
+                work_dir = _to_text(panes.get("work_dir")) or self.repo_root
+                queue_dir = _resolve_queue_dir(self.repo_root, work_dir, self.session_id, panes)
+                self.last_work_dir = work_dir
+
+                ctx = CycleContext(
+                    repo_root=self.repo_root,
+                    session_id=self.session_id,
+                    mode=self.mode,
+                    panes=panes,
+                    queue_dir=queue_dir,
+                    tmux_session=tmux_session,
+                    oyabun_pane=oyabun_pane,
+                    lock_dir=self.lock_dir,
+                    quality_gate_enabled=self.quality_gate_enabled,
+                    max_rework_loops=self.max_rework_loops,
+                    executor=executor,
+                    leases=leases,
+                    retry_policy=retry_policy,
+                    collects=self.collects,
+                    metrics=metrics,
+                    tracer=tracer,
+                )
+                self.last_ctx = ctx
+                _submit_due_retries(sm, logger, ctx)
+
+                if self.signal_inbox_enabled:
+                    inbox_dir = inbox_dir_for_queue(queue_dir)
+                    if self.signal_inbox is None or self.signal_inbox.inbox_dir != inbox_dir:
+                        self.signal_inbox = SignalInbox(inbox_dir)
+                        if self.cycle_watcher is None:
+                            self.cycle_watcher = DirectoryWatcher(inbox_dir)
+                        else:
+                            self.cycle_watcher.add_path(inbox_dir)
+                    with tracer.span("signal_inbox"):
+                        inbox_consumed = _drain_signal_inbox(sm, logger, ctx, self.signal_inbox)
 
                 workers = panes.get("workers")
                 if not isinstance(workers, dict):
@@ -1856,160 +3054,43 @@ def main(argv: Optional[List[str]] = None) -> int:
                 elif not tmux_session:
                     _log("warn", f"tmux session is missing in panes file: {panes_path}")
                 else:
-                    for worker_id in sorted(workers.keys()):
-                        pane_id = _to_text(workers.get(worker_id))
-                        if not pane_id:
-                            continue
-
-                        pane_text = _capture_pane_tail(tmux_session, pane_id)
-                        if pane_text is None:
-                            continue
-
-                        signal_dict = extract_last_json_object(pane_text)
-                        if not isinstance(signal_dict, dict):
-                            if "{" in pane_text and "}" in pane_text:
-                                _log("warn", f"failed to parse JSON signal from pane={pane_id}")
-                            continue
-
-                        signal_for_validation = dict(signal_dict)
-                        if not _to_text(signal_for_validation.get("pane_id")):
-                            signal_for_validation["pane_id"] = pane_id
-
-                        role = _to_text(signal_for_validation.get("role")).lower()
-                        is_valid, errors = validate_signal(signal_for_validation, role)
-                        if not is_valid:
-                            task_id_for_error = _to_text(signal_for_validation.get("task_id"))
-                            _safe_log_error(
-                                logger,
-                                task_id=task_id_for_error,
-                                error_type="signal_validation_failed",
-                                message="; ".join(errors) if errors else "unknown validation error",
-                                role=role or "unknown",
-                            )
-                            _log(
-                                "warn",
-                                f"invalid signal from pane={pane_id} role={role or '(missing)'} errors={errors}",
-                            )
-                            continue
-
-                        normalized_signal = normalize_timestamp(signal_for_validation)
-                        normalized_signal["pane_id"] = _to_text(normalized_signal.get("pane_id")) or pane_id
-                        normalized_signal["role"] = role
-
-                        task_id = _to_text(normalized_signal.get("task_id"))
-                        if not task_id:
-                            _safe_log_error(
-                                logger,
-                                task_id="",
-                                error_type="signal_missing_task_id",
-                                message=f"missing task_id from pane {pane_id}",
-                                role=role,
-                            )
-                            continue
-
-                        ts_ms = _to_int(normalized_signal.get("ts_ms"), None)
-                        timestamp_provided = ts_ms is not None and ts_ms > 0
-                        if ts_ms is None or ts_ms < 0:
-                            ts_ms = 0
-                        normalized_signal["ts_ms"] = ts_ms
-
-                        task_pane_key = f"{task_id}:{normalized_signal['pane_id']}"
-                        if timestamp_provided and not sm.check_timestamp_guard(task_pane_key, ts_ms):
-                            _log(
-                                "info",
-                                f"dropped signal by timestamp guard task={task_id} pane={pane_id} ts_ms={ts_ms}",
+                    if self.pane_streams is not None and not self._pane_streams_checked:
+                        self._pane_streams_checked = True
+                        self._check_pane_streams(workers)
+                    if self.pane_streams is not None:
+                        with tracer.span("capture", source=SIGNAL_SOURCE_PIPE):
+                            self.last_captures = _read_pane_streams(self.pane_streams, workers)
+                    elif captures is not None:
+                        self.last_captures = captures
+                    else:
+                        with tracer.span("capture", source=SIGNAL_SOURCE_CAPTURE):
+                            self.last_captures = _capture_worker_panes(
+                                tmux_session,
+                                workers,
+                                max_workers=self.capture_concurrency,
                             )
-                            continue
-
-                        sig_hash = compute_sig_hash(normalized_signal)
-                        if sm.is_duplicate_signal(sig_hash):
-                            _safe_log_signal(logger, task_id, role, sig_hash, False)
-                            _log("info", f"dropped duplicate signal task={task_id} pane={pane_id} sig_hash={sig_hash}")
-                            continue
-
-                        task_state = sm.get_task_state(task_id)
-                        if not _phase_is_consistent(task_state, normalized_signal):
-                            if timestamp_provided:
-                                sm.update_timestamp(task_pane_key, ts_ms)
-                            sm.add_processed_signal(sig_hash)
-                            _safe_log_signal(logger, task_id, role, sig_hash, False)
-                            _log(
-                                "info",
-                                f"dropped signal by phase guard task={task_id} role={role} phase={_to_text((task_state or {}).get('phase'))}",
+                    if self.pane_streams is None:
+                        for capture in self.last_captures:
+                            metrics.observe(
+                                "pane_capture_seconds", capture.latency_sec, labels={"worker": capture.worker_id}
                             )
+                            tracer.add_span("capture.pane", capture.latency_sec, pane_id=capture.pane_id)
+                    for capture in self.last_captures:
+                        pane_id = capture.pane_id
+                        pane_text = capture.text
+                        if pane_text is None:
                             continue
 
-                        if mode == MODE_HYBRID and task_state is None:
-                            signal_worker = _to_text(normalized_signal.get("worker_id")) or _worker_from_pane(
-                                panes,
-                                pane_id,
-                            )
-                            task_meta = _read_task_metadata(queue_dir, task_id, signal_worker)
-                            task_routing_policy = _normalize_routing_policy(
-                                task_meta.get("routing_policy"),
-                                MODE_LEGACY,
-                            )
-                            if task_routing_policy == MODE_V2:
-                                initial_worker = _to_text(task_meta.get("assigned_to")) or signal_worker
-                                initial_phase = (
-                                    "design" if _to_bool(task_meta.get("needs_architect"), False) else "implement"
-                                )
-                                initial_cmd_id = (
-                                    _to_text(task_meta.get("parent_cmd_id"))
-                                    or _to_text(normalized_signal.get("cmd_id"))
-                                    or _derive_cmd_id(task_id)
-                                )
-                                if not initial_cmd_id:
-                                    initial_cmd_id = "unknown_cmd"
-                                sm.update_task_state(
-                                    task_id,
-                                    phase=initial_phase,
-                                    loop_count=0,
-                                    assigned_worker=initial_worker,
-                                    cmd_id=initial_cmd_id,
-                                    routing_policy=task_routing_policy,
-                                )
-                                task_state = sm.get_task_state(task_id)
-                            else:
-                                if timestamp_provided:
-                                    sm.update_timestamp(task_pane_key, ts_ms)
-                                sm.add_processed_signal(sig_hash)
-                                _safe_log_signal(logger, task_id, role, sig_hash, False)
-                                _log("info", f"hybrid mode ignored unregistered task signal: {task_id}")
-                                continue
-
-                        if timestamp_provided:
-                            sm.update_timestamp(task_pane_key, ts_ms)
-                        sm.add_processed_signal(sig_hash)
-                        _safe_log_signal(logger, task_id, role, sig_hash, True)
-
-                        actions = _apply_transition(
-                            sm,
-                            logger,
-                            signal_dict=normalized_signal,
-                            panes=panes,
-                            mode=mode,
-                            queue_dir=queue_dir,
-                            quality_gate_enabled=quality_gate_enabled,
-                            max_rework_loops=max_rework_loops,
-                        )
-                        if not actions:
-                            _log(
-                                "info",
-                                f"no transition action for task={task_id} role={role} mission={_to_text(normalized_signal.get('mission'))}",
-                            )
+                        fingerprint = _pane_fingerprint(pane_text)
+                        if self.pane_fingerprints.get(pane_id) == fingerprint:
+                            metrics.incr("pane_unchanged_skips_total")
                             continue
-
-                        _execute_actions(
-                            sm,
-                            logger,
-                            actions=actions,
-                            repo_root=repo_root,
-                            session_id=session_id,
-                            tmux_session=tmux_session,
-                            oyabun_pane=oyabun_pane,
-                            lock_dir=lock_dir,
-                        )
+                        with tracer.span("pane", pane_id=pane_id):
+                            _process_pane_text(sm, logger, ctx, pane_id=pane_id, pane_text=pane_text)
+                        metrics.incr("pane_parses_total")
+                        cycle_fingerprints[pane_id] = fingerprint
+                with tracer.span("collect.flush"):
+                    _flush_collects(sm, logger, ctx, metrics=metrics)
             except Exception as exc:
                 _log("error", f"unexpected exception in main loop: {exc}")
                 _safe_log_error(
@@ -2019,40 +3100,449 @@ def main(argv: Optional[List[str]] = None) -> int:
                     message=str(exc),
                     role="orchestrator",
                 )
+                _safe_flush_events(logger)
             finally:
-                _sync_state_metadata(sm, mode, poll_interval_sec)
                 try:
-                    sm.save()
+                    _apply_finished_actions(sm, logger, executor, leases, retry_policy, metrics, tracer)
+                except Exception as exc:
+                    _log("error", f"failed to apply finished actions: {exc}")
+                _sync_state_metadata(sm, self.mode, self.poll_interval_sec)
+                bytes_before = sm.io_stats["bytes_written"]
+                save_started = time.monotonic()
+                try:
+                    with tracer.span("state.save"):
+                        saved = sm.save()
+                    if saved:
+                        metrics.observe("state_save_seconds", time.monotonic() - save_started)
+                        metrics.observe(
+                            "state_save_bytes",
+                            sm.io_stats["bytes_written"] - bytes_before,
+                            buckets=STATE_SAVE_BYTES_BUCKETS,
+                        )
+                    # Only trust a fingerprint once its dedup/timestamp records are on disk.
+                    self.pane_fingerprints.update(cycle_fingerprints)
+                    # Same for inbox files: archive them only after the state they produced is saved.
+                    if self.signal_inbox is not None:
+                        for path in inbox_consumed:
+                            self.signal_inbox.archive(path)
+                        if cycle_started - self.inbox_pruned_at >= SIGNAL_INBOX_PRUNE_INTERVAL_SEC:
+                            self.inbox_pruned_at = cycle_started
+                            self.signal_inbox.prune_processed()
                 except Exception as exc:
                     _log("error", f"failed to save orchestrator state: {exc}")
+                _publish_state_io_metrics(metrics, sm, self.started_monotonic)
+                _publish_task_phase_metrics(metrics, sm, self._task_phases_seen)
+                # A busy TUI changes its pane on every poll; only work the orchestrator did counts.
+                self.poll_schedule.update(
+                    activity=bool(
+                        metrics.counter("signals_total", labels={"outcome": "accepted"}) != accepted_before
+                        or executor.in_flight()
+                        or self.collects.pending()
+                        or metrics.counter("actions_finished_total") != finished_before
+                    ),
+                    active_tasks=_has_active_tasks(sm),
+                )
                 try:
-                    update_dashboard(last_work_dir, sm, mode, poll_interval_sec)
+                    with tracer.span("dashboard"):
+                        update_dashboard(
+                            self.last_work_dir,
+                            sm,
+                            self.mode,
+                            self.poll_interval_sec,
+                            self.last_captures,
+                            metrics,
+                            effective_poll_interval_sec=self.poll_schedule.interval,
+                        )
                 except Exception as exc:
                     _log("error", f"failed to update dashboard: {exc}")
         finally:
-            _release_process_lock(state_lock_fd)
+            _release_process_lock(state_lock)
+            now = time.monotonic()
+            if now - self.lock_stats_reported_at >= LOCK_STATS_REPORT_INTERVAL_SEC:
+                _publish_lock_stats(logger, metrics, self.lock_stats, now - self.lock_stats_reported_at)
+                self.lock_stats_reported_at = now
+            # One group-committed append per cycle, early-return paths included.
+            with tracer.span("events.flush"):
+                _safe_flush_events(logger)
+            _publish_event_log_metrics(metrics, logger)
+            metrics.observe("cycle_duration_seconds", time.monotonic() - cycle_started)
+            self._write_metrics_file()
+
+    def _write_metrics_file(self) -> None:
+        if not self.metrics_path:
+            return
+        try:
+            write_metrics_file(self.metrics_path, render_prometheus(self.metrics))
+        except OSError as exc:
+            _log("warn", f"failed to write metrics file {self.metrics_path}: {exc}")
+
+    def watch_not_before(self) -> float:
+        """Earliest ``time.monotonic()`` a watcher wakeup may start the next cycle."""
+        return self.cycle_started_at + self.poll_schedule.min_sec
+
+    def _check_pane_streams(self, workers: Dict[str, Any]) -> None:
+        """Fall back to capture-pane when no worker has a stream file (pipe-pane never attached)."""
+        missing = self.pane_streams.missing_streams(workers) if self.pane_streams is not None else []
+        if not missing:
+            return
+        if len(missing) < len(workers):
+            _log("warn", f"pane stream missing for {','.join(missing)}; those panes stay silent until it appears")
+            return
+        _log(
+            "warn",
+            f"signal_source=pipe but no pane streams in {self.pane_streams.stream_dir} "
+            "(set orchestrator.signal_source: pipe so yb start attaches pipe-pane); "
+            f"falling back to {SIGNAL_SOURCE_CAPTURE}",
+        )
+        self.pane_streams = None
+        self.signal_source = SIGNAL_SOURCE_CAPTURE
+
+    def next_wait_sec(self) -> float:
+        """Seconds until this session wants its next cycle (absent watcher/action wakeups)."""
+        if self._retry_after_sec is not None:
+            return self._retry_after_sec
+        wait_sec = self.poll_schedule.interval
+        for deadline_sec in (_next_retry_delay(self.sm), self.collects.seconds_until_due()):
+            if deadline_sec is not None:
+                wait_sec = min(wait_sec, deadline_sec)
+        return wait_sec
+
+    def shutdown(self) -> None:
+        """Flush pending collects, wait for running actions, save, and release every handle."""
+        executor, leases, sm, logger, metrics = self.executor, self.leases, self.sm, self.logger, self.metrics
+        _log("info", f"orchestrator shutting down in_flight_actions={executor.in_flight()}")
+        if self.cycle_watcher is not None:
+            self.cycle_watcher.close()
+        state_lock, state_lock_path = _acquire_process_lock(
+            self.lock_dir, PROCESS_LOCK_STATE_SAVE, stats=self.lock_stats
+        )
+        if state_lock is None:
+            _log("error", f"failed to acquire state cycle lock during shutdown: {state_lock_path}")
+            executor.shutdown(wait=True)
+        else:
+            try:
+                sm.load()
+                if self.last_ctx is not None:
+                    _flush_collects(sm, logger, self.last_ctx, force=True, metrics=metrics)
+                executor.shutdown(wait=True)
+                _apply_finished_actions(sm, logger, executor, leases, self.retry_policy, metrics, self.tracer)
+                _sync_state_metadata(sm, self.mode, self.poll_interval_sec)
+                sm.save()
+            except Exception as exc:
+                _log("error", f"failed to save state during shutdown: {exc}")
+            finally:
+                executor.shutdown(wait=True)
+                _release_process_lock(state_lock)
+        leases.close()
+        sm.close()
+        _publish_lock_stats(logger, metrics, self.lock_stats, time.monotonic() - self.lock_stats_reported_at)
+        _safe_flush_events(logger)
+        _publish_event_log_metrics(metrics, logger)
+        self._write_metrics_file()
+        self.tracer.flush()
+        if self.metrics_endpoint is not None:
+            self.metrics_endpoint.close()
+        try:
+            update_dashboard(
+                self.last_work_dir,
+                sm,
+                self.mode,
+                self.poll_interval_sec,
+                metrics=metrics,
+                effective_poll_interval_sec=self.poll_schedule.interval,
+            )
+        except Exception as exc:
+            _log("error", f"failed to update dashboard during shutdown: {exc}")
+        logger.close()
+        if self._ready_marked:
+            try:
+                os.unlink(os.path.join(self.state_dir, READY_MARKER_FILENAME))
+            except OSError:
+                pass
 
-        if _STOP_REQUESTED:
-            break
-        time.sleep(poll_interval_sec)
 
-    _log("info", "orchestrator shutting down")
-    state_lock_fd, state_lock_path = _acquire_process_lock(lock_dir, PROCESS_LOCK_STATE_SAVE)
-    if state_lock_fd is None:
-        _log("error", f"failed to acquire state cycle lock during shutdown: {state_lock_path}")
-    else:
+class _RuntimeConfigCache:
+    """``_load_runtime_config`` per repo, re-read only when config.yaml changes."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[str, Any]]] = {}
+
+    def get(self, repo_root: str) -> Dict[str, Any]:
+        path = os.path.join(repo_root, ".yamibaito", "config.yaml")
+        try:
+            st = os.stat(path)
+            signature: Optional[Tuple[int, int]] = (st.st_ino, st.st_mtime_ns)
+        except OSError:
+            signature = None
+        cached = self._entries.get(repo_root)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        config = _load_runtime_config(repo_root)
+        self._entries[repo_root] = (signature, config)
+        return config
+
+
+@dataclass
+class _SupervisedSession:
+    runner: SessionRunner
+    label: str
+    due_at: float = 0.0
+
+
+def _set_nonblocking_pipe() -> Tuple[int, int]:
+    read_fd, write_fd = os.pipe()
+    for fd in (read_fd, write_fd):
+        os.set_blocking(fd, False)
+    return read_fd, write_fd
+
+
+def _drain_fd(fd: int) -> None:
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def _run_supervisor(registry: SessionRegistry) -> int:
+    """Serve every registered session from this process until stopped or idle."""
+    supervisor_lock = FileLock(registry.lock_path, name="supervisor")
+    if not supervisor_lock.acquire(0):
+        _log("error", f"another supervisor already holds {registry.lock_path}")
+        return 1
+    os.ftruncate(supervisor_lock.fd, 0)
+    os.pwrite(supervisor_lock.fd, f"{os.getpid()}\n".encode("utf-8"), 0)
+
+    wake_read, wake_write = _set_nonblocking_pipe()
+    # Signals and finished actions of any session wake the shared select.
+    signal.set_wakeup_fd(wake_write, warn_on_full_buffer=False)
+
+    def wake() -> None:
+        try:
+            os.write(wake_write, b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    configs = _RuntimeConfigCache()
+    capture_pool = ThreadPoolExecutor(max_workers=SUPERVISOR_CAPTURE_THREADS, thread_name_prefix="yb-capture")
+    sessions: Dict[str, _SupervisedSession] = {}
+    failed: Dict[str, SessionSpec] = {}
+    registry_signature: Any = object()
+    registry_synced_at = 0.0
+    idle_since = time.monotonic()
+    _log("info", f"supervisor started registry={registry.root} pid={os.getpid()}")
+
+    try:
+        while not _STOP_REQUESTED:
+            signature = registry.signature()
+            # A killed attach process leaves the directory unchanged; rescan for gone owners too.
+            if signature != registry_signature or time.monotonic() - registry_synced_at >= SUPERVISOR_OWNER_CHECK_SEC:
+                registry_synced_at = time.monotonic()
+                _sync_supervised_sessions(registry, sessions, failed, configs, wake)
+                # Removing stale entries touches the directory; do not rescan for that.
+                registry_signature = registry.signature()
+
+            now = time.monotonic()
+            if sessions:
+                idle_since = now
+            elif now - idle_since >= SUPERVISOR_IDLE_EXIT_SEC:
+                _log("info", f"supervisor exiting: no sessions for {SUPERVISOR_IDLE_EXIT_SEC:.0f}s")
+                break
+
+            due = [entry for entry in sessions.values() if entry.due_at <= now]
+            # Capture every due session's panes in one concurrent batch before processing any of them.
+            pending: Dict[str, List[Future]] = {}
+            for entry in due:
+                _set_log_session(entry.label)
+                try:
+                    target = entry.runner.capture_target()
+                except Exception as exc:
+                    _log("warn", f"failed to read panes for capture: {exc}")
+                    target = None
+                if target is not None:
+                    pending[entry.label] = _submit_worker_pane_captures(capture_pool, *target)
+            for entry in due:
+                _set_log_session(entry.label)
+                futures = pending.get(entry.label)
+                try:
+                    entry.runner.run_cycle(_capture_results(futures) if futures is not None else None)
+                except Exception as exc:
+                    _log("error", f"session cycle failed: {exc}")
+                entry.due_at = time.monotonic() + entry.runner.next_wait_sec()
+            _set_log_session("")
+            if _STOP_REQUESTED:
+                break
+
+            now = time.monotonic()
+            timeout = SUPERVISOR_REGISTRY_RESCAN_SEC
+            for entry in sessions.values():
+                timeout = min(timeout, max(0.0, entry.due_at - now))
+            # A session already pulled forward to its debounce point stops listening until it runs.
+            watchers = {
+                id(entry.runner.cycle_watcher): entry
+                for entry in sessions.values()
+                if entry.runner.cycle_watcher is not None and entry.due_at > entry.runner.watch_not_before()
+            }
+            changed, ready = wait_any(
+                [entry.runner.cycle_watcher for entry in watchers.values()],
+                timeout,
+                extra_fds=[wake_read],
+            )
+            for watcher in changed:
+                entry = watchers[id(watcher)]
+                entry.due_at = min(entry.due_at, entry.runner.watch_not_before())
+            if ready:
+                _drain_fd(wake_read)
+                for entry in sessions.values():
+                    if entry.runner.executor.wait(0):
+                        entry.due_at = 0.0
+    finally:
+        _set_log_session("")
+        for key in list(sessions):
+            _stop_supervised_session(sessions.pop(key))
+        capture_pool.shutdown(wait=True)
+        signal.set_wakeup_fd(-1)
+        os.close(wake_read)
+        os.close(wake_write)
+        supervisor_lock.release()
+    return 0
+
+
+def _sync_supervised_sessions(
+    registry: SessionRegistry,
+    sessions: Dict[str, _SupervisedSession],
+    failed: Dict[str, SessionSpec],
+    configs: _RuntimeConfigCache,
+    wake: Callable[[], None],
+) -> None:
+    """Start runners for new registry entries and stop the ones whose entry is gone or changed."""
+    specs = registry.entries()
+    for key in list(sessions):
+        if specs.get(key) != sessions[key].runner.spec:
+            _stop_supervised_session(sessions.pop(key))
+    for key in list(failed):
+        if specs.get(key) != failed[key]:
+            failed.pop(key)
+    for key, spec in specs.items():
+        if key in sessions or key in failed:
+            continue
+        label = f"{os.path.basename(os.path.abspath(spec.repo_root))}:{spec.session_id or '-'}"
+        _set_log_session(label)
         try:
-            sm.load()
-            _sync_state_metadata(sm, mode, poll_interval_sec)
-            sm.save()
+            runner = SessionRunner(spec, configs.get(os.path.abspath(spec.repo_root)), on_action_finished=wake)
         except Exception as exc:
-            _log("error", f"failed to save state during shutdown: {exc}")
+            _log("error", f"failed to start session from registry entry '{key}': {exc}")
+            failed[key] = spec
+            continue
         finally:
-            _release_process_lock(state_lock_fd)
+            _set_log_session("")
+        if runner.mode == MODE_LEGACY:
+            _log("info", f"[{label}] mode=legacy: session is not supervised")
+            runner.shutdown()
+            failed[key] = spec
+            continue
+        sessions[key] = _SupervisedSession(runner=runner, label=label)
+        _log("info", f"[{label}] session started {runner.describe()}")
+
+
+def _stop_supervised_session(entry: _SupervisedSession) -> None:
+    _set_log_session(entry.label)
     try:
-        update_dashboard(last_work_dir, sm, mode, poll_interval_sec)
+        entry.runner.shutdown()
     except Exception as exc:
-        _log("error", f"failed to update dashboard during shutdown: {exc}")
+        _log("error", f"failed to stop session: {exc}")
+    finally:
+        _set_log_session("")
+
+
+def _supervisor_running(registry: SessionRegistry) -> bool:
+    return os.path.exists(registry.lock_path) and is_flock_held(registry.lock_path)
+
+
+def _ensure_supervisor(registry: SessionRegistry) -> None:
+    if _supervisor_running(registry):
+        return
+    with open(registry.log_path, "ab") as log_fh:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--supervise", "--registry", registry.root],
+            stdin=subprocess.DEVNULL,
+            stdout=log_fh,
+            stderr=log_fh,
+            start_new_session=True,
+        )
+    _log("info", f"started orchestrator supervisor; log: {registry.log_path}")
+
+
+def _attach_to_supervisor(spec: SessionSpec, registry: SessionRegistry) -> int:
+    """Hand the session to the supervisor and keep it registered while this process lives."""
+    key = registry.register(spec)
+    _log("info", f"session registered with supervisor key={key} registry={registry.root}")
+    wake_read, wake_write = _set_nonblocking_pipe()
+    signal.set_wakeup_fd(wake_write, warn_on_full_buffer=False)
+    try:
+        _ensure_supervisor(registry)
+        while not _STOP_REQUESTED:
+            select.select([wake_read], [], [], SUPERVISOR_ATTACH_CHECK_SEC)
+            _drain_fd(wake_read)
+            if _STOP_REQUESTED:
+                break
+            # Our entry may have been swept while a re-register raced a stale-entry check.
+            if not registry.owns(key):
+                registry.register(spec)
+            # Bring the supervisor back if it exited (idle timeout or crash) while we are attached.
+            if not _supervisor_running(registry):
+                _ensure_supervisor(registry)
+    finally:
+        # A newer attach for the same session may have replaced our entry; leave that one alone.
+        if registry.owns(key):
+            registry.unregister(key)
+        _log("info", f"session unregistered from supervisor key={key}")
+        signal.set_wakeup_fd(-1)
+        os.close(wake_read)
+        os.close(wake_write)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    signal.signal(signal.SIGTERM, _handle_stop_signal)
+    signal.signal(signal.SIGINT, _handle_stop_signal)
+
+    if args.supervise:
+        return _run_supervisor(SessionRegistry(args.registry))
+
+    repo_root = os.path.abspath(args.repo)
+    spec = SessionSpec(
+        repo_root=repo_root,
+        session_id=_sanitize_session_id(_to_text(args.session)),
+        mode=_to_text(args.mode),
+        state_dir=os.path.abspath(args.state_dir) if args.state_dir else "",
+        poll_interval_sec=args.poll_interval,
+        signal_source=_to_text(args.signal_source),
+    )
+    if spec.mode == MODE_LEGACY:
+        _log("info", "mode=legacy: orchestrator loop is disabled; exiting")
+        return 0
+
+    if args.attach:
+        # tmux kill-session hangs up the pane; unregister on that too.
+        signal.signal(signal.SIGHUP, _handle_stop_signal)
+        return _attach_to_supervisor(spec, SessionRegistry(args.registry))
+
+    runner = SessionRunner(spec, _load_runtime_config(repo_root))
+    _log("info", f"orchestrator started {runner.describe()}")
+    while not _STOP_REQUESTED:
+        runner.run_cycle()
+        if _STOP_REQUESTED:
+            break
+        _wait_for_next_cycle(
+            runner.cycle_watcher,
+            runner.executor,
+            runner.next_wait_sec(),
+            not_before=runner.watch_not_before(),
+        )
+    runner.shutdown()
     return 0
 
 
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Replay recorded transitions from ``orchestrator-events.jsonl`` through the state machine.
+
+Every ``transition`` event carries the normalized signal that caused it
+(``details.trigger_signal``).  The replay feeds those signals, in log order,
+to ``_apply_transition`` against a fresh in-memory ``StateManager``:
+
+* actions are returned and dropped (no dispatch, collect or notify);
+* event-log writes go to a recording sink, which is how the replayed
+  transitions are compared with the recorded ones;
+* the queue directory and the stored state are copied to a scratch
+  directory first, so nothing under ``.yamibaito`` is touched.
+
+A planner ``tasks_ready`` fans out into one transition per task, all with
+the same trigger signal; consecutive transitions sharing a signal are one
+replay step.  A task the replay has not seen yet (the log starts mid-history,
+or hybrid mode seeded it outside a transition) is seeded with the recorded
+``from_phase`` and counted.
+
+The result: per-role cost of ``_apply_transition`` (pure state-machine time,
+no I/O besides queue YAML reads), transitions that diverge from the log,
+and a task-by-task diff of the rebuilt ``taskState`` against the stored one.
+Exit status is 1 when anything diverges, so a recorded production trace
+doubles as a regression test for the transition logic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+import yb_orchestrator as orch  # noqa: E402
+from lib.panes import load_panes  # noqa: E402
+from lib.state_manager import StateManager  # noqa: E402
+from lib.tracing import format_summary, summarize_spans  # noqa: E402
+
+EVENTS_FILENAME = orch.EVENTS_FILENAME
+# Bookkeeping fields that legitimately differ between a live run and a replay.
+IGNORED_TASK_FIELDS = ("updated_at",)
+MAX_REPORTED = 20
+
+
+Transition = Tuple[str, str, str]
+
+
+@dataclass
+class ReplayStep:
+    """One recorded trigger signal and the transitions it produced."""
+
+    line: int
+    signal: Dict[str, Any]
+    transitions: List[Transition] = field(default_factory=list)
+
+
+@dataclass
+class ReplayResult:
+    steps: int = 0
+    transitions: int = 0
+    seeded_tasks: List[str] = field(default_factory=list)
+    divergences: List[Dict[str, Any]] = field(default_factory=list)
+    timings: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_sec: float = 0.0
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+class RecordingEventSink:
+    """``EventLogger`` stand-in: remembers transitions, drops everything else."""
+
+    def __init__(self) -> None:
+        self.transitions: List[Transition] = []
+
+    def log_transition(
+        self,
+        task_id: str,
+        from_phase: str,
+        to_phase: str,
+        role: str,
+        trigger_signal: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.transitions.append((task_id, from_phase, to_phase))
+
+    def log(self, event_type: str, **kwargs: Any) -> None:
+        pass
+
+    def log_signal_received(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_dispatch(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_error(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_escalation(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def log_lock_stats(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _signal_key(signal: Dict[str, Any]) -> str:
+    return json.dumps(signal, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def load_replay_steps(events_path: str) -> List[ReplayStep]:
+    """Group the log's ``transition`` events into replay steps, in file order."""
+    steps: List[ReplayStep] = []
+    last_key = ""
+    with open(events_path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict) or event.get("event_type") != "transition":
+                continue
+            details = event.get("details")
+            if not isinstance(details, dict):
+                continue
+            signal = details.get("trigger_signal")
+            if not isinstance(signal, dict):
+                continue
+            transition = (
+                orch._to_text(event.get("task_id")),
+                orch._to_text(details.get("from_phase")),
+                orch._to_text(details.get("to_phase")),
+            )
+            key = _signal_key(signal)
+            if steps and key == last_key:
+                steps[-1].transitions.append(transition)
+                continue
+            steps.append(ReplayStep(line=line_no, signal=signal, transitions=[transition]))
+            last_key = key
+    return steps
+
+
+def replay(
+    steps: List[ReplayStep],
+    *,
+    scratch_dir: str,
+    panes: Dict[str, Any],
+    mode: str,
+    queue_dir: str,
+    quality_gate_enabled: bool,
+    max_rework_loops: int,
+) -> ReplayResult:
+    """Run every step through ``_apply_transition`` on a fresh state in ``scratch_dir``."""
+    sm = StateManager(state_dir=scratch_dir)
+    sink = RecordingEventSink()
+    result = ReplayResult()
+    started = time.perf_counter()
+    for step in steps:
+        for task_id, from_phase, _ in step.transitions:
+            if from_phase in ("", "(none)") or sm.get_task_state(task_id) is not None:
+                continue
+            sm.update_task_state(
+                task_id,
+                phase=from_phase,
+                loop_count=orch._to_int(step.signal.get("loop_count"), 0),
+                assigned_worker=orch._to_text(step.signal.get("worker_id")),
+                cmd_id=orch._to_text(step.signal.get("cmd_id")) or orch._derive_cmd_id(task_id),
+            )
+            result.seeded_tasks.append(task_id)
+
+        del sink.transitions[:]
+        before = time.perf_counter()
+        orch._apply_transition(
+            sm,
+            sink,
+            signal_dict=dict(step.signal),
+            panes=panes,
+            mode=mode,
+            queue_dir=queue_dir,
+            quality_gate_enabled=quality_gate_enabled,
+            max_rework_loops=max_rework_loops,
+        )
+        elapsed = time.perf_counter() - before
+        result.steps += 1
+        result.transitions += len(sink.transitions)
+        result.timings.append(
+            {"name": orch._to_text(step.signal.get("role")) or "?", "ms": elapsed * 1000.0, "line": step.line}
+        )
+        if sink.transitions != step.transitions:
+            result.divergences.append(
+                {
+                    "line": step.line,
+                    "task_id": orch._to_text(step.signal.get("task_id")),
+                    "role": orch._to_text(step.signal.get("role")),
+                    "recorded": [list(t) for t in step.transitions],
+                    "replayed": [list(t) for t in sink.transitions],
+                }
+            )
+    result.elapsed_sec = time.perf_counter() - started
+    result.state = sm.state
+    return result
+
+
+def _comparable(entry: Any) -> Any:
+    if not isinstance(entry, dict):
+        return entry
+    return {key: value for key, value in entry.items() if key not in IGNORED_TASK_FIELDS}
+
+
+def diff_task_state(replayed: Dict[str, Any], stored: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-task field differences between two ``taskState`` maps (``updated_at`` ignored)."""
+    diffs: List[Dict[str, Any]] = []
+    for task_id in sorted(set(replayed) | set(stored)):
+        if task_id not in stored:
+            diffs.append({"task_id": task_id, "kind": "only_in_replay", "replayed": replayed[task_id]})
+            continue
+        if task_id not in replayed:
+            diffs.append({"task_id": task_id, "kind": "only_in_stored", "stored": stored[task_id]})
+            continue
+        left, right = _comparable(replayed[task_id]), _comparable(stored[task_id])
+        if left == right:
+            continue
+        if not isinstance(left, dict) or not isinstance(right, dict):
+            diffs.append({"task_id": task_id, "kind": "changed", "replayed": left, "stored": right})
+            continue
+        fields = {
+            key: {"replayed": left.get(key), "stored": right.get(key)}
+            for key in sorted(set(left) | set(right))
+            if left.get(key) != right.get(key)
+        }
+        diffs.append({"task_id": task_id, "kind": "changed", "fields": fields})
+    return diffs
+
+
+def load_stored_state(state_dir: str, backend: str, scratch_dir: str) -> Dict[str, Any]:
+    """Stored state read through a copy, so opening it (sqlite migration, locks) has no side effects."""
+    os.makedirs(scratch_dir, exist_ok=True)
+    for name in os.listdir(state_dir):
+        if name.startswith("orchestrator-state"):
+            source = os.path.join(state_dir, name)
+            if os.path.isfile(source):
+                shutil.copy2(source, os.path.join(scratch_dir, name))
+    return StateManager(state_dir=scratch_dir, backend=backend).state
+
+
+def _copy_queue_dir(queue_dir: str, scratch_dir: str) -> str:
+    target = os.path.join(scratch_dir, "queue")
+    if os.path.isdir(queue_dir):
+        shutil.copytree(queue_dir, target, symlinks=True)
+    else:
+        os.makedirs(os.path.join(target, "tasks"))
+    return target
+
+
+def _format_report(
+    result: ReplayResult,
+    events_path: str,
+    repeat: int,
+    state_path: str,
+    state_diffs: Optional[List[Dict[str, Any]]],
+) -> str:
+    rate = result.steps / result.elapsed_sec if result.elapsed_sec > 0 else 0.0
+    lines = [
+        f"replayed {result.steps} signals ({result.transitions} transitions) from {events_path}"
+        + (f" x{repeat}" if repeat > 1 else ""),
+        f"last pass: {result.elapsed_sec * 1000.0:.3f} ms, {rate:.0f} signals/s; "
+        f"seeded {len(result.seeded_tasks)} task(s) from recorded from_phase",
+        "",
+        "_apply_transition cost per signal, by role:",
+    ]
+    report = "\n".join(lines) + "\n" + format_summary(summarize_spans(iter(result.timings)))
+    out = [report.rstrip("\n"), "", f"transition divergences: {len(result.divergences)}"]
+    for divergence in result.divergences[:MAX_REPORTED]:
+        out.append(
+            f"  line {divergence['line']} task={divergence['task_id']} role={divergence['role']}: "
+            f"recorded {divergence['recorded']} replayed {divergence['replayed']}"
+        )
+    if state_diffs is None:
+        out.append(f"state diff: skipped (no stored state at {state_path})")
+    else:
+        out.append(f"state diff vs {state_path}: {len(state_diffs)} task(s) differ")
+        for diff in state_diffs[:MAX_REPORTED]:
+            if diff["kind"] == "changed" and "fields" in diff:
+                detail = ", ".join(
+                    f"{key}: {value['replayed']!r} (replay) != {value['stored']!r} (stored)"
+                    for key, value in diff["fields"].items()
+                )
+            else:
+                detail = diff["kind"]
+            out.append(f"  {diff['task_id']}: {detail}")
+    hidden = max(len(result.divergences), len(state_diffs or [])) - MAX_REPORTED
+    if hidden > 0:
+        out.append("  ... (use --json for the full list)")
+    return "\n".join(out) + "\n"
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay orchestrator event-log transitions through the state machine")
+    parser.add_argument("--repo", default=".", help="Repository root path")
+    parser.add_argument("--session", default="", help="Session id (selects panes_<session>.json / queue_<session>)")
+    parser.add_argument(
+        "--state-dir",
+        default="",
+        help="State directory (default: <repo_root>/.yamibaito/runtime)",
+    )
+    parser.add_argument("--events", default="", help=f"Event log to replay (default: <state_dir>/{EVENTS_FILENAME})")
+    parser.add_argument(
+        "--mode",
+        default="",
+        choices=("",) + tuple(orch.VALID_MODES),
+        help="Routing mode (default: the stored state's mode, then config.yaml)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Replay N times from scratch and time all passes")
+    parser.add_argument("--no-diff", action="store_true", help="Skip the diff against the stored state")
+    parser.add_argument("--profile", action="store_true", help="Print the top cProfile entries of the replay")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    repo_root = os.path.abspath(args.repo)
+    state_dir = os.path.abspath(args.state_dir) if args.state_dir else os.path.join(repo_root, ".yamibaito", "runtime")
+    events_path = args.events or os.path.join(state_dir, EVENTS_FILENAME)
+    if not os.path.isfile(events_path):
+        print(f"no event log: {events_path}", file=sys.stderr)
+        return 2
+
+    config = orch._load_runtime_config(repo_root)
+    panes = load_panes(orch._resolve_panes_path(repo_root, args.session))
+    if not isinstance(panes, dict):
+        panes = {}
+    work_dir = orch._to_text(panes.get("work_dir")) or repo_root
+    queue_dir = orch._resolve_queue_dir(repo_root, work_dir, args.session, panes)
+    steps = load_replay_steps(events_path)
+
+    scratch_root = tempfile.mkdtemp(prefix="yb_replay_")
+    try:
+        state_path = os.path.join(state_dir, StateManager.STATE_FILENAME)
+        stored: Optional[Dict[str, Any]] = None
+        if not args.no_diff and os.path.isdir(state_dir):
+            stored_state = load_stored_state(state_dir, config["state_backend"], os.path.join(scratch_root, "stored"))
+            if stored_state.get("taskState") or os.path.exists(state_path):
+                stored = stored_state
+        mode = args.mode or orch._to_text((stored or {}).get("mode")) or config["mode"] or orch.MODE_HYBRID
+
+        profiler = cProfile.Profile() if args.profile else None
+        result = ReplayResult()
+        timings: List[Dict[str, Any]] = []
+        for attempt in range(max(1, args.repeat)):
+            pass_dir = os.path.join(scratch_root, f"pass-{attempt}")
+            replay_queue_dir = _copy_queue_dir(queue_dir, pass_dir)
+            if profiler is not None:
+                profiler.enable()
+            result = replay(
+                steps,
+                scratch_dir=os.path.join(pass_dir, "state"),
+                panes=panes,
+                mode=mode,
+                queue_dir=replay_queue_dir,
+                quality_gate_enabled=config["quality_gate_enabled"],
+                max_rework_loops=config["max_rework_loops"],
+            )
+            if profiler is not None:
+                profiler.disable()
+            timings.extend(result.timings)
+        result.timings = timings
+
+        state_diffs = None
+        if stored is not None:
+            state_diffs = diff_task_state(result.state.get("taskState") or {}, stored.get("taskState") or {})
+    finally:
+        shutil.rmtree(scratch_root, ignore_errors=True)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "events": events_path,
+                    "mode": mode,
+                    "steps": result.steps,
+                    "transitions": result.transitions,
+                    "repeat": max(1, args.repeat),
+                    "elapsed_sec": round(result.elapsed_sec, 6),
+                    "seeded_tasks": result.seeded_tasks,
+                    "cost_by_role": summarize_spans(iter(result.timings)),
+                    "divergences": result.divergences,
+                    "state_diff": state_diffs,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        sys.stdout.write(_format_report(result, events_path, max(1, args.repeat), state_path, state_diffs))
+    if profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+        sys.stderr.write(stream.getvalue())
+    return 1 if result.divergences or state_diffs else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
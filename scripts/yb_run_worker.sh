@@ -82,6 +82,7 @@ if _orch_root:
 else:
     sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
 from agent_config import load_agent_config, build_launch_command
+from tmux_client import shared_client
 
 repo_root = os.environ["REPO_ROOT"]
 task_file = os.environ["TASK_FILE"]
@@ -117,12 +118,50 @@ config_path = os.path.join(repo_root, ".yamibaito", "config.yaml")
 role = "review" if phase == "review" else "worker"
 agent_cfg = load_agent_config(config_path, role)
 cmd = build_launch_command(agent_cfg, sandbox=sandbox)
+# Agents can drop structured signals here (e.g. via `yb signal`) instead of printing JSON.
+agent_env = dict(os.environ)
+agent_env["YB_SIGNAL_DIR"] = os.path.join(os.path.dirname(os.path.dirname(task_file)), "signals")
+
+
+def orchestrator_setting(path, key):
+    """Value of ``orchestrator.<key>`` in config.yaml (same lookup as yb_start.sh's awk)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return ""
+    in_block = False
+    for line in lines:
+        if re.match(r"^\s*orchestrator:\s*$", line):
+            in_block = True
+            continue
+        if in_block and re.match(r"^\S", line):
+            in_block = False
+        match = re.match(rf"^\s*{key}:\s*([^\s#]+)", line) if in_block else None
+        if match:
+            return match.group(1).strip("\"'").lower()
+    return ""
+
+
+# The orchestrator drains the inbox only outside legacy mode and unless signal_inbox is false.
+if orchestrator_setting(config_path, "mode") not in ("", "legacy") and orchestrator_setting(
+    config_path, "signal_inbox"
+) != "false":
+    yb_bin = os.path.join(_orch_root, "bin", "yb") if _orch_root else "yb"
+    content = content.rstrip("\n") + (
+        "\n\n"
+        "# --- orchestrator signal inbox ---\n"
+        "# After printing your final completion/error JSON object, also drop the same object\n"
+        "# into the orchestrator inbox (YB_SIGNAL_DIR is already set for you):\n"
+        f"#   {yb_bin} signal --json '<the same JSON object>'\n"
+    )
 proc = subprocess.Popen(
     cmd,
     stdin=subprocess.PIPE,
     stdout=sys.stdout,
     stderr=sys.stderr,
     cwd=work_dir,
+    env=agent_env,
     text=True,
 )
 proc.communicate(content)
@@ -140,8 +179,9 @@ try:
                 notify = "worker finished; please run: yb collect --repo " + repo_root
                 if session_id:
                     notify += " --session " + session_id
-                subprocess.run(["tmux", "send-keys", "-t", f"{session}:{waka}", notify], check=False)
-                subprocess.run(["tmux", "send-keys", "-t", f"{session}:{waka}", "Enter"], check=False)
+                tmux = shared_client(session)
+                tmux.send_keys(f"{session}:{waka}", notify)
+                tmux.send_keys(f"{session}:{waka}", "Enter")
 except FileNotFoundError:
     pass
 except json.JSONDecodeError:
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Drop a completion/error signal JSON into the orchestrator signal inbox."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from lib.panes import load_panes
+from lib.signal_inbox import drop_signal, inbox_dir_for_queue
+
+_SESSION_SANITIZER = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def _resolve_inbox_dir(args: argparse.Namespace) -> str:
+    explicit = args.signal_dir or os.environ.get("YB_SIGNAL_DIR", "")
+    if explicit:
+        return explicit
+
+    queue_dir = args.queue_dir or os.environ.get("YB_QUEUE_DIR", "")
+    if queue_dir:
+        return inbox_dir_for_queue(queue_dir)
+
+    repo_root = os.path.abspath(args.repo)
+    session_clean = _SESSION_SANITIZER.sub("_", args.session or "")
+    suffix = f"_{session_clean}" if session_clean else ""
+    panes_path = os.path.join(repo_root, ".yamibaito", f"panes{suffix}.json")
+    panes = load_panes(panes_path) if os.path.isfile(panes_path) else {}
+
+    queue_dir = str(panes.get("queue_dir") or "")
+    if not queue_dir:
+        work_dir = str(panes.get("work_dir") or "") or repo_root
+        queue_dir = os.path.join(work_dir, ".yamibaito", f"queue{suffix}")
+        if not os.path.isdir(queue_dir):
+            queue_dir = os.path.join(repo_root, ".yamibaito", f"queue{suffix}")
+    return inbox_dir_for_queue(queue_dir)
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drop a signal JSON into the orchestrator inbox")
+    parser.add_argument("--repo", default=".", help="Repository root path")
+    parser.add_argument("--session", default="", help="Session id for panes_<session>.json")
+    parser.add_argument("--queue-dir", default="", help="Queue directory (default: $YB_QUEUE_DIR or panes map)")
+    parser.add_argument("--signal-dir", default="", help="Inbox directory (default: $YB_SIGNAL_DIR)")
+    parser.add_argument("--json", default=None, help="Signal JSON object (default: read from stdin)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    raw = args.json if args.json is not None else sys.stdin.read()
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        print(f"invalid signal JSON: {exc}", file=sys.stderr)
+        return 2
+    if not isinstance(payload, dict):
+        print("signal JSON must be an object", file=sys.stderr)
+        return 2
+
+    try:
+        path = drop_signal(_resolve_inbox_dir(args), payload)
+    except OSError as exc:
+        print(f"failed to write signal file: {exc}", file=sys.stderr)
+        return 1
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
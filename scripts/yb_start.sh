@@ -65,6 +65,16 @@ orch_poll_interval_sec=$(awk '
   in_orchestrator && /^[^[:space:]]/ { in_orchestrator=0 }
   in_orchestrator && /^[[:space:]]*poll_interval_sec:[[:space:]]*/ { print $2; exit }
 ' "$config_file" | tr -d '"' | tr -d "'" || true)
+orch_signal_source=$(awk '
+  /^[[:space:]]*orchestrator:[[:space:]]*$/ { in_orchestrator=1; next }
+  in_orchestrator && /^[^[:space:]]/ { in_orchestrator=0 }
+  in_orchestrator && /^[[:space:]]*signal_source:[[:space:]]*/ { print $2; exit }
+' "$config_file" | tr -d '"' | tr -d "'" || true)
+orch_supervisor=$(awk '
+  /^[[:space:]]*orchestrator:[[:space:]]*$/ { in_orchestrator=1; next }
+  in_orchestrator && /^[^[:space:]]/ { in_orchestrator=0 }
+  in_orchestrator && /^[[:space:]]*supervisor:[[:space:]]*/ { print $2; exit }
+' "$config_file" | tr -d '"' | tr -d "'" || true)
 orch_mode="${orch_mode:-legacy}"
 case "$orch_mode" in
   legacy|hybrid|v2) ;;
@@ -74,6 +84,10 @@ orch_poll_interval_sec="${orch_poll_interval_sec:-5}"
 if ! [[ "$orch_poll_interval_sec" =~ ^[0-9]+$ ]]; then
   orch_poll_interval_sec=5
 fi
+case "$orch_signal_source" in
+  capture|pipe) ;;
+  *) orch_signal_source="capture" ;;
+esac
 
 # CLI binary preflight check
 for _check_role in oyabun waka worker; do
@@ -394,8 +408,36 @@ with open(path, "w", encoding="utf-8") as f:
 
   _orch_state_dir="$work_dir/.yamibaito/runtime"
   _orch_state_file="$_orch_state_dir/orchestrator-state.json"
+  # state_backend (json/journal/sqlite) に関係なく、最初の cycle 完了後に orchestrator が書く
+  _orch_ready_file="$_orch_state_dir/orchestrator.ready"
   mkdir -p "$_orch_state_dir"
-  rm -f "$_orch_state_file"
+  rm -f "$_orch_ready_file"
+  # state は新セッションごとに作り直す（pendingRetries も含めて破棄。引き継ぐのはプロセス再起動時のみ）
+  rm -f "$_orch_state_file" "$_orch_state_dir/orchestrator-state.journal" "$_orch_state_dir/orchestrator-state.journal.old"
+  rm -f "$_orch_state_dir/orchestrator-state.sqlite3" "$_orch_state_dir/orchestrator-state.sqlite3-wal" "$_orch_state_dir/orchestrator-state.sqlite3-shm"
+
+  # signal_source=pipe: 若衆ペインの出力を pane-streams/<worker_id>.log に追記させる
+  if [ "$orch_signal_source" = "pipe" ]; then
+    _stream_dir="$_orch_state_dir/pane-streams"
+    mkdir -p "$_stream_dir"
+    while read -r _stream_worker _stream_pane; do
+      [ -n "$_stream_worker" ] && [ -n "$_stream_pane" ] || continue
+      _stream_file="$_stream_dir/${_stream_worker}.log"
+      : > "$_stream_file"
+      printf -v _q_stream_file '%q' "$_stream_file"
+      tmux pipe-pane -t "$session_name:$_stream_pane" "cat >> $_q_stream_file"
+    done < <(PANE_MAP="$pane_map" python3 - <<'PY'
+import json
+import os
+
+with open(os.environ["PANE_MAP"], "r", encoding="utf-8") as f:
+    data = json.load(f)
+workers = data.get("workers") or {}
+for worker_id in sorted(workers):
+    print(worker_id, workers[worker_id])
+PY
+)
+  fi
 
   printf -v _q_orch_bin '%q' "$ORCH_ROOT/bin"
   printf -v _q_orch_session_id '%q' "$session_id"
@@ -407,20 +449,25 @@ with open(path, "w", encoding="utf-8") as f:
   printf -v _q_orch_poll_interval '%q' "$orch_poll_interval_sec"
   printf -v _q_orch_state_dir '%q' "$_orch_state_dir"
   printf -v _q_orch_script '%q' "$work_dir/scripts/yb_orchestrator.py"
-  _orch_cmd="export PATH=$_q_orch_bin:\$PATH && export YB_SESSION_ID=$_q_orch_session_id && export YB_PANES_PATH=$_q_orch_pane_map && export YB_QUEUE_DIR=$_q_orch_queue_dir && export YB_WORK_DIR=$_q_orch_work_dir && export YB_REPO_ROOT=$_q_orch_repo_root && cd $_q_orch_work_dir && python3 $_q_orch_script --repo $_q_orch_work_dir --session $_q_orch_session_id --mode $_q_orch_mode --poll-interval $_q_orch_poll_interval --state-dir $_q_orch_state_dir"
+  # supervisor: true の場合、このペインはセッションを共有 supervisor プロセスに登録するだけ
+  _orch_attach=""
+  if [ "$orch_supervisor" = "true" ]; then
+    _orch_attach=" --attach"
+  fi
+  _orch_cmd="export PATH=$_q_orch_bin:\$PATH && export YB_SESSION_ID=$_q_orch_session_id && export YB_PANES_PATH=$_q_orch_pane_map && export YB_QUEUE_DIR=$_q_orch_queue_dir && export YB_WORK_DIR=$_q_orch_work_dir && export YB_REPO_ROOT=$_q_orch_repo_root && cd $_q_orch_work_dir && python3 $_q_orch_script --repo $_q_orch_work_dir --session $_q_orch_session_id --mode $_q_orch_mode --poll-interval $_q_orch_poll_interval --state-dir $_q_orch_state_dir$_orch_attach"
   tmux send-keys -t "$session_name:$orchestrator_pane" "$_orch_cmd"
   tmux send-keys -t "$session_name:$orchestrator_pane" C-m
 
   _orch_ready=false
   for _ in $(seq 1 10); do
-    if [ -f "$_orch_state_file" ]; then
+    if [ -f "$_orch_ready_file" ]; then
       _orch_ready=true
       break
     fi
     sleep 1
   done
   if [ "$_orch_ready" != "true" ]; then
-    echo "WARNING: orchestrator readiness timeout (10s): $_orch_state_file" >&2
+    echo "WARNING: orchestrator readiness timeout (10s): $_orch_ready_file" >&2
   fi
 fi
 
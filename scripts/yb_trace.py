@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Summarize the orchestrator span trace (``orchestrator-trace.jsonl``)."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from lib.tracing import DEFAULT_BACKUPS, format_summary, load_spans, summarize_spans, trace_files
+
+TRACE_FILENAME = "orchestrator-trace.jsonl"
+
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_UNIT_SEC = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _parse_window(value: str) -> Optional[float]:
+    """Seconds for ``90``, ``30s``, ``15m``, ``2h``, ``1d``; None for ``all``."""
+    if value.strip().lower() == "all":
+        return None
+    match = _DURATION.match(value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}' (e.g. 30s, 15m, 2h, 1d, all)")
+    return float(match.group(1)) * _UNIT_SEC[match.group(2)]
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Orchestrator span trace tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summarize = sub.add_parser("summarize", help="Per-stage percentile breakdown over a time window")
+    summarize.add_argument("--repo", default=".", help="Repository root path")
+    summarize.add_argument(
+        "--state-dir",
+        default="",
+        help="State directory (default: <repo_root>/.yamibaito/runtime)",
+    )
+    summarize.add_argument("--file", default="", help=f"Trace file (default: <state_dir>/{TRACE_FILENAME})")
+    summarize.add_argument(
+        "--since",
+        type=_parse_window,
+        default=3600.0,
+        help="Only spans that started within this window before now (default: 1h; 'all' for everything)",
+    )
+    summarize.add_argument("--group-by", default="", help="Split stages by a span tag (role, pane_id, task_id)")
+    summarize.add_argument("--json", action="store_true", help="Print the summary rows as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    path = args.file
+    if not path:
+        state_dir = args.state_dir or os.path.join(os.path.abspath(args.repo), ".yamibaito", "runtime")
+        path = os.path.join(state_dir, TRACE_FILENAME)
+    paths = trace_files(path, DEFAULT_BACKUPS)
+    if not paths:
+        print(f"no trace file: {path} (set orchestrator.trace: true in config.yaml)", file=sys.stderr)
+        return 1
+
+    since_ts = time.time() - args.since if args.since is not None else None
+    rows = summarize_spans(load_spans(paths, since_ts=since_ts), group_by=args.group_by or None)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        sys.stdout.write(format_summary(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())